@@ -8,10 +8,23 @@ if __name__ == "__main__" and __package__ is None:
 from importlib import import_module
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from backend.services.clearing_scheduler import start_clearing_scheduler
-from backend.db import init_all_tables
+from backend.services.document_queue import start_document_workers
+from backend.services.matching_engine import start_matching_engine
+from backend.services.order_expiry import start_order_expiry_sweeper
+from backend.db import init_all_tables, register_replica_routing
+from backend.compression import register_compression
+from backend.metrics import register_metrics, start_metrics_flusher
+from backend.profiling import PROFILE_ID_HEADER, register_profiling
+from backend.query_stats import QUERY_COUNT_HEADER, register_query_stats
+from backend.structured_logging import REQUEST_ID_HEADER, register_request_logging
+from backend.json_provider import init_json_provider
+from backend.pagination import NEXT_CURSOR_HEADER
 
 _PACKAGE_ROOT = __package__.split(".")[0] if __package__ else "backend"
+# Скільки проксі перед застосунком дописують X-Forwarded-For (0 - заголовку не довіряємо)
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
 
 def _load_blueprints():
     blueprint_specs = [
@@ -25,6 +38,8 @@ def _load_blueprints():
         ("me", "me_bp"),
         ("admin", "admin_bp"),
         ("wallet", "wallet_bp"),
+        ("exports", "exports_bp"),
+        ("metrics", "metrics_bp"),
     ]
     blueprints = []
     for module_name, attr in blueprint_specs:
@@ -47,14 +62,31 @@ def create_app() -> Flask:
     init_all_tables()
     
     app = Flask(__name__)
+    if TRUSTED_PROXY_HOPS > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+    init_json_provider(app)
     RegisterErrorRoutes(app)
-    CORS(app)
+    CORS(app, expose_headers=[
+        NEXT_CURSOR_HEADER, QUERY_COUNT_HEADER, REQUEST_ID_HEADER, PROFILE_ID_HEADER, 'Server-Timing',
+    ])
+    register_request_logging(app)
+    register_metrics(app)
+    register_query_stats(app)
+    register_replica_routing(app)
+    register_compression(app)
+    register_profiling(app)
     _ensure_directories(app)
     for blueprint in _load_blueprints():
         app.register_blueprint(blueprint)
         start_clearing_scheduler()
+    start_document_workers(app.config["GENERATED_DOCS_ROOT"])
+    start_order_expiry_sweeper()
+    start_matching_engine()
+    start_metrics_flusher()
     return app
 
-app = create_app()
+# Процеси пулу хешування паролів (forkserver) імпортують головний модуль як __mp_main__
+if __name__ != "__mp_main__":
+    app = create_app()
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,137 @@
+import gzip
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+from flask import Flask, request
+
+# Стиснення JSON-відповідей API. Однакові тіла (напр. книга заявок, яку опитують
+# усі клієнти) стискаються один раз і беруться з LRU-кешу за хешем тіла.
+API_COMPRESS_MIN_BYTES = int(os.environ.get('API_COMPRESS_MIN_BYTES', '1024'))
+API_COMPRESS_LEVEL = int(os.environ.get('API_COMPRESS_LEVEL', '6'))
+API_COMPRESS_CACHE_ENTRIES = int(os.environ.get('API_COMPRESS_CACHE_ENTRIES', '256'))
+API_COMPRESS_CACHE_MAX_BYTES = int(os.environ.get('API_COMPRESS_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson'}
+
+_cache_lock = threading.Lock()
+_cache: 'OrderedDict[tuple, bytes]' = OrderedDict()
+_cache_bytes = 0
+_stats_lock = threading.Lock()
+_stats = {
+    "compressed": 0,
+    "skippedSmall": 0,
+    "skippedNotAccepted": 0,
+    "cacheHits": 0,
+    "cacheMisses": 0,
+    "bytesIn": 0,
+    "bytesOut": 0,
+    "cpuSeconds": 0.0,
+}
+
+def _choose_encoding(header: Optional[str]) -> Optional[str]:
+    accepted = {}
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+    for encoding in ('gzip', 'deflate'):
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=API_COMPRESS_LEVEL, mtime=0)
+    return zlib.compress(data, API_COMPRESS_LEVEL)
+
+def _cached_compress(data: bytes, encoding: str) -> bytes:
+    global _cache_bytes
+    key = (hashlib.blake2b(data, digest_size=16).digest(), encoding, API_COMPRESS_LEVEL)
+    with _cache_lock:
+        body = _cache.get(key)
+        if body is not None:
+            _cache.move_to_end(key)
+    if body is not None:
+        with _stats_lock:
+            _stats["cacheHits"] += 1
+        return body
+    started = time.thread_time()
+    body = _compress(data, encoding)
+    elapsed = time.thread_time() - started
+    with _stats_lock:
+        _stats["cacheMisses"] += 1
+        _stats["cpuSeconds"] += elapsed
+    if len(body) <= API_COMPRESS_CACHE_MAX_BYTES // 4:
+        with _cache_lock:
+            if key not in _cache:
+                _cache[key] = body
+                _cache_bytes += len(body)
+            while _cache and (len(_cache) > API_COMPRESS_CACHE_ENTRIES or _cache_bytes > API_COMPRESS_CACHE_MAX_BYTES):
+                _, evicted = _cache.popitem(last=False)
+                _cache_bytes -= len(evicted)
+    return body
+
+def _compress_response(response):
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or 'Content-Encoding' in response.headers
+    ):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < API_COMPRESS_MIN_BYTES:
+        with _stats_lock:
+            _stats["skippedSmall"] += 1
+        return response
+    encoding = _choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        with _stats_lock:
+            _stats["skippedNotAccepted"] += 1
+        return response
+    body = _cached_compress(data, encoding)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if response.headers.get('ETag'):
+        response.headers['ETag'] = response.headers['ETag'].rstrip('"') + f'-{encoding}"'
+    with _stats_lock:
+        _stats["compressed"] += 1
+        _stats["bytesIn"] += len(data)
+        _stats["bytesOut"] += len(body)
+    return response
+
+def compression_stats() -> Dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    with _cache_lock:
+        stats["cacheEntries"] = len(_cache)
+        stats["cacheBytes"] = _cache_bytes
+    stats["level"] = API_COMPRESS_LEVEL
+    stats["minBytes"] = API_COMPRESS_MIN_BYTES
+    stats["ratio"] = round(stats["bytesOut"] / stats["bytesIn"], 4) if stats["bytesIn"] else None
+    stats["bytesSaved"] = stats["bytesIn"] - stats["bytesOut"]
+    # Скільки байтів економить одна мілісекунда CPU на стисненні
+    stats["bytesSavedPerCpuMs"] = (
+        round(stats["bytesSaved"] / (stats["cpuSeconds"] * 1000), 1) if stats["cpuSeconds"] else None
+    )
+    stats["cpuSeconds"] = round(stats["cpuSeconds"], 6)
+    return stats
+
+def register_compression(app: Flask) -> None:
+    app.after_request(_compress_response)
+
+__all__ = ['register_compression', 'compression_stats']
@@ -9,3 +9,25 @@ DB_CONFIG = {
     'database': os.getenv('DB_NAME'),
     'port': int(os.getenv('DB_PORT')),
 }
+
+# Необов'язкові репліки для читання: DB_REPLICA_HOSTS="host1[:port],host2[:port]".
+# Користувач/пароль/база - як у основної БД, якщо не задано DB_REPLICA_USER/PASSWORD.
+DB_REPLICA_CONFIGS = []
+for _replica in os.getenv('DB_REPLICA_HOSTS', '').split(','):
+    _replica = _replica.strip()
+    if not _replica:
+        continue
+    _host, _, _port = _replica.partition(':')
+    DB_REPLICA_CONFIGS.append({
+        **DB_CONFIG,
+        'host': _host,
+        'port': int(_port) if _port else DB_CONFIG['port'],
+        'user': os.getenv('DB_REPLICA_USER') or DB_CONFIG['user'],
+        'password': os.getenv('DB_REPLICA_PASSWORD') or DB_CONFIG['password'],
+    })
+# Репліка з відставанням більше за поріг (або невідомим) не використовується
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', '5'))
+# Як часто перевіряти відставання кожної репліки
+DB_REPLICA_CHECK_SECONDS = float(os.getenv('DB_REPLICA_CHECK_SECONDS', '2'))
+# Скільки після власного запису клієнт читає лише з основної БД
+DB_REPLICA_STICKY_SECONDS = float(os.getenv('DB_REPLICA_STICKY_SECONDS', '10'))
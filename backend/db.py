@@ -1,14 +1,155 @@
 from mysql.connector import Error, connect
-from typing import Optional, List, Tuple
+from typing import Callable, Dict, Optional, List, Tuple
 from decimal import Decimal
+from functools import wraps
+import contextvars
 import datetime
-from .config import DB_CONFIG
+import itertools
+import math
+import threading
+import time
+from flask import Flask, has_request_context, request
+from .config import (
+    DB_CONFIG,
+    DB_REPLICA_CHECK_SECONDS,
+    DB_REPLICA_CONFIGS,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    DB_REPLICA_STICKY_SECONDS,
+)
 from .errors import DBError
+from .metrics import counter, gauge, histogram
+from .query_stats import instrument_connection
+from .structured_logging import get_logger
+
+DB_CONNECT_SECONDS = histogram(
+    'db_connect_duration_seconds', 'Time to open a MySQL connection',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+DB_CONNECTIONS_OPENED = counter('db_connections_opened_total', 'MySQL connections opened by db_connection()')
+DB_CONNECT_ERRORS = counter('db_connect_errors_total', 'Failed db_connection() attempts')
+
+DB_REPLICA_READS = counter('db_replica_reads_total', 'Read-only requests served from a replica', ('replica',))
+DB_REPLICA_FALLBACKS = counter('db_replica_fallbacks_total', 'Read-only requests sent to the primary instead', ('reason',))
+DB_REPLICA_LAG = gauge('db_replica_lag_seconds', 'Last observed replication lag', ('replica',), mode='max')
+
+# Cookie з unix-часом, до якого клієнт читає з основної БД (read-your-writes).
+# Cookie, а не пам'ять процесу: наступний GET може потрапити на інший воркер gunicorn.
+REPLICA_STICKY_COOKIE = 'db_primary_until'
+
+logger = get_logger(__name__)
+_replica_reads: 'contextvars.ContextVar[bool]' = contextvars.ContextVar('replica_reads', default=False)
+_replica_lock = threading.Lock()
+_replica_next = itertools.count()
+_replica_state: List[Dict] = [
+    {"host": f"{cfg['host']}:{cfg['port']}", "checkedAt": 0.0, "lag": None, "healthy": False, "error": None}
+    for cfg in DB_REPLICA_CONFIGS
+]
+
+
+def replica_reads(func: Callable) -> Callable:
+    """Маршрут лише читає: db_connection() усередині може повернути з'єднання з реплікою"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _replica_reads.set(True)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+def _replica_lag(connection) -> Optional[float]:
+    cur = connection.cursor(dictionary=True)
+    try:
+        try:
+            cur.execute("SHOW REPLICA STATUS")
+        except Error:
+            # MySQL < 8.0.22 / MariaDB
+            cur.execute("SHOW SLAVE STATUS")
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+    if not rows:
+        # Сервер не налаштований як репліка (напр. проксі до основної) - не відстає
+        return 0.0
+    lags = [row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master')) for row in rows]
+    if any(lag is None for lag in lags):
+        # NULL - реплікація зупинена або зламана
+        return None
+    return float(max(lags))
+
+
+def _primary_pinned() -> bool:
+    try:
+        return float(request.cookies.get(REPLICA_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _replica_connection():
+    """З'єднання зі справною реплікою (round-robin) або None, якщо таких немає"""
+    count = len(DB_REPLICA_CONFIGS)
+    start = next(_replica_next)
+    reason = 'lag'
+    for offset in range(count):
+        index = (start + offset) % count
+        state = _replica_state[index]
+        due = time.monotonic() - state["checkedAt"] >= DB_REPLICA_CHECK_SECONDS
+        if not state["healthy"] and not due:
+            continue
+        try:
+            connection = connect(**DB_REPLICA_CONFIGS[index])
+        except Error as e:
+            with _replica_lock:
+                state.update(checkedAt=time.monotonic(), healthy=False, error=str(e))
+            logger.warning("Репліка %s недоступна: %s", state["host"], e, extra={"sample": f"replica-down-{index}"})
+            reason = 'unavailable'
+            continue
+        if due:
+            try:
+                lag = _replica_lag(connection)
+                error = None
+            except Error as e:
+                lag, error = None, str(e)
+            healthy = lag is not None and lag <= DB_REPLICA_MAX_LAG_SECONDS
+            with _replica_lock:
+                state.update(checkedAt=time.monotonic(), lag=lag, healthy=healthy, error=error)
+            if lag is not None:
+                DB_REPLICA_LAG.set(lag, replica=state["host"])
+            if not healthy:
+                logger.warning(
+                    "Репліка %s відстає (lag=%s), читання йде в основну БД",
+                    state["host"], lag, extra={"sample": f"replica-lag-{index}", "error": error},
+                )
+        if state["healthy"]:
+            # Позначка для ensure_*: на репліці DDL не виконується
+            connection.is_read_replica = True
+            DB_REPLICA_READS.inc(replica=state["host"])
+            return instrument_connection(connection)
+        connection.close()
+    DB_REPLICA_FALLBACKS.inc(reason=reason)
+    return None
+
+
+def replica_status() -> List[Dict]:
+    with _replica_lock:
+        return [dict(state) for state in _replica_state]
+
 
 def db_connection():
+    if _replica_reads.get() and DB_REPLICA_CONFIGS:
+        if has_request_context() and _primary_pinned():
+            DB_REPLICA_FALLBACKS.inc(reason='sticky')
+        else:
+            connection = _replica_connection()
+            if connection is not None:
+                return connection
+    started = time.perf_counter()
     try:
         connection = connect(**DB_CONFIG)
-        return connection
+        DB_CONNECT_SECONDS.observe(time.perf_counter() - started)
+        DB_CONNECTIONS_OPENED.inc()
+        return instrument_connection(connection)
     except Error as e:
         if "Unknown database" in str(e):
             base_config = {}
@@ -22,9 +163,44 @@ def db_connection():
             cur.close()
             base_conn.close()
             connection = connect(**DB_CONFIG)
-            return connection
+            DB_CONNECTIONS_OPENED.inc()
+            return instrument_connection(connection)
+        DB_CONNECT_ERRORS.inc()
         raise DBError("Connection failed", details=str(e)) from e
 
+def _pin_primary_after_write(response):
+    if (DB_REPLICA_CONFIGS and request.method not in ('GET', 'HEAD', 'OPTIONS')
+            and response.status_code < 400):
+        response.set_cookie(
+            REPLICA_STICKY_COOKIE,
+            str(int(time.time() + DB_REPLICA_STICKY_SECONDS)),
+            max_age=math.ceil(DB_REPLICA_STICKY_SECONDS),
+            httponly=True,
+            samesite='Lax',
+        )
+    return response
+
+
+def register_replica_routing(app: Flask) -> None:
+    app.after_request(_pin_primary_after_write)
+
+
+# Схема перевіряється один раз на процес: після першого успішного ensure_*
+# повторні виклики з маршрутів не ходять у БД. На репліках DDL не виконується взагалі.
+_ensured = set()
+
+
+def _ensure_once(func: Callable) -> Callable:
+    @wraps(func)
+    def wrapper(connection):
+        if func.__name__ in _ensured or getattr(connection, 'is_read_replica', False):
+            return
+        func(connection)
+        _ensured.add(func.__name__)
+    return wrapper
+
+
+@_ensure_once
 def ensure_users_table(connection):
     cursor = connection.cursor()
     try:
@@ -36,14 +212,20 @@ def ensure_users_table(connection):
                 email VARCHAR(191) NULL UNIQUE,
                 password_hash VARCHAR(255) NOT NULL,
                 is_admin BOOLEAN NOT NULL DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_users_created (created_at, id)
             ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4;
             """
         )
+        try:
+            cursor.execute("ALTER TABLE users ADD INDEX idx_users_created (created_at, id)")
+        except Exception:
+            pass
         connection.commit()
     finally:
         cursor.close()
 
+@_ensure_once
 def ensure_user_profiles(connection):
     cur = connection.cursor()
     try:
@@ -92,6 +274,7 @@ def ensure_user_profiles(connection):
     finally:
         cur.close()
 
+@_ensure_once
 def try_add_owner_columns(connection):
     cur = connection.cursor()
     try:
@@ -109,6 +292,7 @@ def try_add_owner_columns(connection):
     finally:
         cur.close()
 
+@_ensure_once
 def ensure_listings_table(connection):
     cursor = connection.cursor()
     try:
@@ -129,7 +313,8 @@ def ensure_listings_table(connection):
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 INDEX idx_listings_owner (owner_id),
                 INDEX idx_listings_status (status),
-                INDEX idx_listings_created (created_at)
+                INDEX idx_listings_created (created_at),
+                FULLTEXT INDEX idx_listings_fulltext (title, description)
             ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4;
             """
         )
@@ -138,19 +323,44 @@ def ensure_listings_table(connection):
             ("base_quantity", "DECIMAL(12,2) NULL"),
             ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
             ("idx_listings_status", "INDEX idx_listings_status (status)"),
-            ("idx_listings_created", "INDEX idx_listings_created (created_at)")
+            ("idx_listings_created", "INDEX idx_listings_created (created_at)"),
+            ("idx_listings_fulltext", "FULLTEXT INDEX idx_listings_fulltext (title, description)"),
+            # Денормалізовані дані про аукціони лістингу (див. services/listing_meta.py)
+            ("auction_count", "INT NOT NULL DEFAULT 0"),
+            ("last_auction_id", "INT NULL"),
+            ("last_auction_status", "VARCHAR(16) NULL"),
+            ("last_auction_created_at", "DATETIME NULL"),
         ]:
             try:
                 if column_def[0].startswith('idx_'):
                     cursor.execute(f"ALTER TABLE listings ADD {column_def[1]}")
                 else:
                     cursor.execute(f"ALTER TABLE listings ADD COLUMN {column_def[0]} {column_def[1]}")
+                    if column_def[0] == 'auction_count':
+                        _backfill_listing_auction_meta(cursor)
             except Exception:
                 pass
         connection.commit()
     finally:
         cursor.close()
 
+def _backfill_listing_auction_meta(cursor):
+    # Одноразове заповнення при додаванні колонок; таблиці auctions може ще не бути
+    try:
+        cursor.execute(
+            """
+            UPDATE listings l SET
+                l.auction_count = (SELECT COUNT(*) FROM auctions a WHERE a.listing_id = l.id),
+                l.last_auction_id = (SELECT a.id FROM auctions a WHERE a.listing_id = l.id ORDER BY a.created_at DESC, a.id DESC LIMIT 1),
+                l.last_auction_status = (SELECT a.status FROM auctions a WHERE a.listing_id = l.id ORDER BY a.created_at DESC, a.id DESC LIMIT 1),
+                l.last_auction_created_at = (SELECT a.created_at FROM auctions a WHERE a.listing_id = l.id ORDER BY a.created_at DESC, a.id DESC LIMIT 1),
+                l.updated_at = l.updated_at
+            """
+        )
+    except Exception:
+        pass
+
+@_ensure_once
 def ensure_orders_table(connection):
     cursor = connection.cursor()
     try:
@@ -167,14 +377,26 @@ def ensure_orders_table(connection):
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 INDEX idx_orders_type_cost (type, cost),
                 INDEX idx_orders_status (status),
-                INDEX idx_orders_created (created_at)
+                INDEX idx_orders_created (created_at),
+                INDEX idx_orders_created_id (created_at, id),
+                INDEX idx_orders_book (type, status, cost, remaining_amount)
             ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4;
             """
         )
+        for index_sql in (
+            "ALTER TABLE orders ADD INDEX idx_orders_created_id (created_at, id)",
+            # Покривний індекс для агрегату рівнів книги (/orders/top, /orders/depth)
+            "ALTER TABLE orders ADD INDEX idx_orders_book (type, status, cost, remaining_amount)",
+        ):
+            try:
+                cursor.execute(index_sql)
+            except Exception:
+                pass
         connection.commit()
     finally:
         cursor.close()
 
+@_ensure_once
 def ensure_trades_table(connection):
     cursor = connection.cursor()
     try:
@@ -189,14 +411,26 @@ def ensure_trades_table(connection):
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (buy_order_id) REFERENCES orders(id) ON DELETE CASCADE,
                 FOREIGN KEY (sell_order_id) REFERENCES orders(id) ON DELETE CASCADE,
-                INDEX idx_trades_created (created_at)
+                INDEX idx_trades_created (created_at),
+                INDEX idx_trades_buy_order (buy_order_id),
+                INDEX idx_trades_sell_order (sell_order_id)
             ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4;
             """
         )
+        # Відновлення matching engine рахує SUM(trades) по кожній відкритій заявці
+        for index_sql in (
+            "ALTER TABLE trades ADD INDEX idx_trades_buy_order (buy_order_id)",
+            "ALTER TABLE trades ADD INDEX idx_trades_sell_order (sell_order_id)",
+        ):
+            try:
+                cursor.execute(index_sql)
+            except Exception:
+                pass
         connection.commit()
     finally:
         cursor.close()
 
+@_ensure_once
 def ensure_auctions_tables(connection):
     cur = connection.cursor()
     try:
@@ -239,6 +473,8 @@ def ensure_auctions_tables(connection):
             ("current_round", "INT NOT NULL DEFAULT 0"),
             ("last_clearing_at", "DATETIME NULL"),
             ("next_clearing_at", "DATETIME NULL"),
+            # Скільки наступних раундів клірингу профілювати (адмін-API)
+            ("profile_rounds", "INT NOT NULL DEFAULT 0"),
         ]:
             try:
                 cur.execute(f"ALTER TABLE auctions ADD COLUMN {column_name} {column_def}")
@@ -249,6 +485,7 @@ def ensure_auctions_tables(connection):
             ("idx_auctions_creator", "creator_id"),
             ("idx_auctions_approval", "approval_status"),
             ("idx_auctions_next_clearing", "next_clearing_at, status"),
+            ("idx_auctions_listing_created", "listing_id, created_at, id"),
         ]:
             try:
                 cur.execute(f"ALTER TABLE auctions ADD INDEX {index_name} ({index_def})")
@@ -278,6 +515,7 @@ def ensure_auctions_tables(connection):
                 UNIQUE KEY uniq_auction_trader (auction_id, trader_id),
                 INDEX idx_participants_auction (auction_id),
                 INDEX idx_participants_trader (trader_id),
+                INDEX idx_participants_auction_joined (auction_id, joined_at, id),
                 FOREIGN KEY (auction_id) REFERENCES auctions(id) ON DELETE CASCADE
             ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4;
             """
@@ -298,8 +536,16 @@ def ensure_auctions_tables(connection):
                 iteration INT NULL,
                 reserved_amount DECIMAL(18,6) NULL,
                 reserve_tx_id INT NULL,
+                cancel_batch CHAR(32) NULL,
+                expires_at DATETIME NULL,
+                expires_after_round INT NULL,
                 INDEX idx_ao_auction (auction_id),
                 INDEX idx_ao_auction_status (auction_id, status),
+                INDEX idx_ao_trader_created (trader_id, created_at, id),
+                INDEX idx_ao_created_id (created_at, id),
+                INDEX idx_ao_auction_created (auction_id, created_at, id),
+                INDEX idx_ao_cancel_batch (cancel_batch),
+                INDEX idx_ao_status_expires (status, expires_at),
                 FOREIGN KEY (auction_id) REFERENCES auctions(id) ON DELETE CASCADE
             ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4;
             """
@@ -308,6 +554,9 @@ def ensure_auctions_tables(connection):
             ("iteration", "INT NULL"),
             ("reserved_amount", "DECIMAL(18,6) NULL"),
             ("reserve_tx_id", "INT NULL"),
+            ("cancel_batch", "CHAR(32) NULL"),
+            ("expires_at", "DATETIME NULL"),
+            ("expires_after_round", "INT NULL"),
         ]:
             try:
                 cur.execute(f"ALTER TABLE auction_orders ADD COLUMN {column_def[0]} {column_def[1]}")
@@ -316,6 +565,12 @@ def ensure_auctions_tables(connection):
         for index_def in [
             "ALTER TABLE auction_orders ADD INDEX idx_ao_auction (auction_id)",
             "ALTER TABLE auction_orders ADD INDEX idx_ao_auction_status (auction_id, status)",
+            "ALTER TABLE auction_orders ADD INDEX idx_ao_trader_created (trader_id, created_at, id)",
+            "ALTER TABLE auction_orders ADD INDEX idx_ao_created_id (created_at, id)",
+            "ALTER TABLE auction_orders ADD INDEX idx_ao_auction_created (auction_id, created_at, id)",
+            "ALTER TABLE auction_orders ADD INDEX idx_ao_cancel_batch (cancel_batch)",
+            "ALTER TABLE auction_orders ADD INDEX idx_ao_status_expires (status, expires_at)",
+            "ALTER TABLE auction_participants ADD INDEX idx_participants_auction_joined (auction_id, joined_at, id)",
         ]:
             try:
                 cur.execute(index_def)
@@ -325,6 +580,7 @@ def ensure_auctions_tables(connection):
     finally:
         cur.close()
 
+@_ensure_once
 def ensure_trader_inventory(connection):
     cur = connection.cursor()
     try:
@@ -345,6 +601,7 @@ def ensure_trader_inventory(connection):
     finally:
         cur.close()
 
+@_ensure_once
 def ensure_resource_transactions(connection):
     cur = connection.cursor()
     try:
@@ -358,14 +615,20 @@ def ensure_resource_transactions(connection):
                 occurred_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 notes TEXT NULL,
                 INDEX idx_res_trader (trader_id),
-                INDEX idx_res_type (type)
+                INDEX idx_res_type (type),
+                INDEX idx_res_trader_occurred (trader_id, occurred_at, id)
             ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4;
             """
         )
+        try:
+            cur.execute("ALTER TABLE resource_transactions ADD INDEX idx_res_trader_occurred (trader_id, occurred_at, id)")
+        except Exception:
+            pass
         connection.commit()
     finally:
         cur.close()
 
+@_ensure_once
 def ensure_resource_documents(connection):
     cur = connection.cursor()
     try:
@@ -379,14 +642,25 @@ def ensure_resource_documents(connection):
                 uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 notes TEXT NULL,
                 FOREIGN KEY (trader_id) REFERENCES users(id) ON DELETE CASCADE,
-                INDEX idx_resource_docs_trader (trader_id)
+                INDEX idx_resource_docs_trader (trader_id),
+                INDEX idx_resource_docs_uploaded (uploaded_at, id),
+                INDEX idx_resource_docs_trader_uploaded (trader_id, uploaded_at, id)
             ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4;
             """
         )
+        for index_def in [
+            "ALTER TABLE resource_documents ADD INDEX idx_resource_docs_uploaded (uploaded_at, id)",
+            "ALTER TABLE resource_documents ADD INDEX idx_resource_docs_trader_uploaded (trader_id, uploaded_at, id)",
+        ]:
+            try:
+                cur.execute(index_def)
+            except Exception:
+                pass
         connection.commit()
     finally:
         cur.close()
 
+@_ensure_once
 def ensure_wallet_tables(connection):
     cur = connection.cursor()
     try:
@@ -413,14 +687,25 @@ def ensure_wallet_tables(connection):
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
                 INDEX idx_wallet_user (user_id),
-                INDEX idx_wallet_created (created_at)
+                INDEX idx_wallet_created (created_at),
+                INDEX idx_wallet_user_created (user_id, created_at, id),
+                INDEX idx_wallet_created_id (created_at, id)
             ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4;
             """
         )
+        for index_def in [
+            "ALTER TABLE wallet_transactions ADD INDEX idx_wallet_user_created (user_id, created_at, id)",
+            "ALTER TABLE wallet_transactions ADD INDEX idx_wallet_created_id (created_at, id)",
+        ]:
+            try:
+                cur.execute(index_def)
+            except Exception:
+                pass
         connection.commit()
     finally:
         cur.close()
 
+@_ensure_once
 def ensure_auction_clearing_rounds(conn):
     """Створюємо таблицю для історії раундів клірингу"""
     cur = conn.cursor()
@@ -439,13 +724,25 @@ def ensure_auction_clearing_rounds(conn):
                 matched_orders INT NOT NULL DEFAULT 0,
                 cleared_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 INDEX idx_rounds_auction (auction_id),
-                INDEX idx_rounds_number (auction_id, round_number)
+                INDEX idx_rounds_number (auction_id, round_number),
+                INDEX idx_rounds_cleared_id (cleared_at, id),
+                INDEX idx_rounds_auction_cleared (auction_id, cleared_at, id)
             ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4
         """)
+        # Потокове експортування раундів іде по (cleared_at, id)
+        for index_def in [
+            "ALTER TABLE auction_clearing_rounds ADD INDEX idx_rounds_cleared_id (cleared_at, id)",
+            "ALTER TABLE auction_clearing_rounds ADD INDEX idx_rounds_auction_cleared (auction_id, cleared_at, id)",
+        ]:
+            try:
+                cur.execute(index_def)
+            except Exception:
+                pass
         conn.commit()
     finally:
         cur.close()
 
+@_ensure_once
 def ensure_inventory_snapshots(conn):
     """Створюємо таблицю для снімків інвентарю після кожного клірингу"""
     cur = conn.cursor()
@@ -464,6 +761,107 @@ def ensure_inventory_snapshots(conn):
     finally:
         cur.close()
 
+@_ensure_once
+def ensure_trade_documents(conn):
+    """Індекс згенерованих документів угод (замість сканування каталогу)"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS trade_documents (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                auction_id INT NOT NULL,
+                trader_id INT NOT NULL,
+                role VARCHAR(32) NOT NULL,
+                filename VARCHAR(191) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE KEY uniq_trade_doc (auction_id, filename),
+                INDEX idx_trade_docs_trader (trader_id, auction_id, filename)
+            ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4
+        """)
+        conn.commit()
+    finally:
+        cur.close()
+
+@_ensure_once
+def ensure_document_jobs(conn):
+    """Черга фонової генерації документів угод"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS document_jobs (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                auction_id INT NOT NULL,
+                trader_id INT NOT NULL,
+                role VARCHAR(32) NOT NULL,
+                product VARCHAR(255) NOT NULL,
+                price DECIMAL(18,6) NOT NULL,
+                quantity DECIMAL(18,6) NOT NULL,
+                status ENUM('pending','running','done','failed') NOT NULL DEFAULT 'pending',
+                attempts INT NOT NULL DEFAULT 0,
+                claim_token VARCHAR(32) NULL,
+                filename VARCHAR(191) NULL,
+                last_error VARCHAR(255) NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                claimed_at DATETIME NULL,
+                finished_at DATETIME NULL,
+                INDEX idx_document_jobs_status (status, id),
+                INDEX idx_document_jobs_claim (claim_token)
+            ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4
+        """)
+        conn.commit()
+    finally:
+        cur.close()
+
+@_ensure_once
+def ensure_auction_order_sequences(conn):
+    """Лічильник черговості (iteration) заявок для кожного аукціону"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS auction_order_sequences (
+                auction_id INT NOT NULL PRIMARY KEY,
+                last_iteration BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4
+        """)
+        conn.commit()
+    finally:
+        cur.close()
+
+@_ensure_once
+def ensure_auction_clearing_timings(conn):
+    """Тривалість фаз, кількість запитів і рядків кожного раунду клірингу"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS auction_clearing_timings (
+                auction_id INT NOT NULL,
+                round_number INT NOT NULL,
+                order_count INT NOT NULL DEFAULT 0,
+                allocation_count INT NOT NULL DEFAULT 0,
+                expire_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                load_orders_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                compute_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                settle_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                inventory_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                snapshot_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                bot_cleanup_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                record_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                documents_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                commit_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                total_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                query_count INT NOT NULL DEFAULT 0,
+                db_ms DECIMAL(12,3) NOT NULL DEFAULT 0,
+                row_count INT NOT NULL DEFAULT 0,
+                phase_queries TEXT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (auction_id, round_number)
+            ) ENGINE=MyISAM DEFAULT CHARSET=utf8mb4
+        """)
+        conn.commit()
+    finally:
+        cur.close()
+
 def init_all_tables():
     conn = db_connection()
     try:
@@ -479,11 +877,19 @@ def init_all_tables():
         ensure_wallet_tables(conn)
         ensure_auction_clearing_rounds(conn)
         ensure_inventory_snapshots(conn)
+        ensure_trade_documents(conn)
+        ensure_document_jobs(conn)
+        ensure_auction_order_sequences(conn)
+        ensure_auction_clearing_timings(conn)
         try_add_owner_columns(conn)
     finally:
         conn.close()
 
 __all__ = ['db_connection',
+    'replica_reads',
+    'replica_status',
+    'register_replica_routing',
+    'REPLICA_STICKY_COOKIE',
     'ensure_users_table',
     'ensure_user_profiles',
     'ensure_listings_table',
@@ -496,6 +902,10 @@ __all__ = ['db_connection',
     'ensure_wallet_tables',
     'ensure_auction_clearing_rounds',
     'ensure_inventory_snapshots',
+    'ensure_trade_documents',
+    'ensure_document_jobs',
+    'ensure_auction_order_sequences',
+    'ensure_auction_clearing_timings',
     'try_add_owner_columns',
     'init_all_tables',
 ]
\ No newline at end of file
@@ -1,5 +1,8 @@
-from flask import jsonify 
-import traceback
+import logging
+from flask import jsonify, request
+from .structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 class AppError(Exception):
     statuscode = 500
@@ -34,18 +37,22 @@ def RegisterErrorRoutes(app):
     def ErrorResponse(err):
         response = jsonify(err.errorlist())
         response.status_code = err.statuscode
-        print(f"AppError: {err.message} (Status: {err.statuscode})")
+        # 4xx - звичайна поведінка клієнтів, у лог лише на DEBUG
+        logger.log(
+            logging.WARNING if err.statuscode >= 500 else logging.DEBUG,
+            "AppError: %s", err.message,
+            extra={"status": err.statuscode, "path": request.path},
+        )
         return response
 
     @app.errorhandler(404)
     def NotFoundResponse(err):
-        print(f"Not Found Error: {err}")
+        logger.debug("Not found: %s", request.path, extra={"status": 404})
         return jsonify({"error": "404"}), 404
 
     @app.errorhandler(Exception)
     def GenericErrorResponse(err):
-        print(f"Generic Error: {err}")
-        traceback.print_exc()
+        logger.exception("Unhandled error: %s", err, extra={"status": 500, "path": request.path})
         response = jsonify({"error": "Server error", "details": str(err)})
         response.status_code = 500
         return response
@@ -0,0 +1,154 @@
+import datetime
+import json
+import math
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+from flask import Flask
+
+try:
+    import orjson
+except ImportError:  # необов'язкова залежність: без неї працює стандартний json
+    orjson = None
+
+try:
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:  # Flask < 2.2
+    DefaultJSONProvider = None
+
+# Один прохід кодування замість utils.serialize + jsonify:
+# Decimal -> float, datetime -> ISO 8601 (UTC з суфіксом Z), date -> YYYY-MM-DD.
+
+def _iso_datetime(value: datetime.datetime) -> str:
+    iso_str = value.isoformat()
+    if value.tzinfo is not None and iso_str.endswith('+00:00'):
+        iso_str = iso_str[:-6] + 'Z'
+    return iso_str
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime.datetime):
+        return _iso_datetime(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', errors='replace')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+def dumps_bytes(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def dumps(obj: Any) -> str:
+    return dumps_bytes(obj).decode('utf-8')
+
+class RowSchema:
+    """
+    Схема рядка курсора без dictionary=True: кортежі одразу стають JSON-текстом.
+    fields - пари (ключ у відповіді, тип), у тому ж порядку, що й колонки SELECT.
+    Типи: 'int', 'float', 'str', 'bool', 'datetime', 'json' (довільне значення).
+    """
+
+    def __init__(self, *fields: Tuple[str, str]):
+        self.fields = fields
+        self._encoders = []
+        for key, kind in fields:
+            prefix = json.dumps(key) + ':'
+            self._encoders.append((prefix, self._ENCODERS[kind]))
+
+    @staticmethod
+    def _encode_int(value) -> str:
+        return str(int(value))
+
+    @staticmethod
+    def _encode_float(value) -> str:
+        number = float(value)
+        # NaN/Infinity не є валідним JSON
+        return repr(number) if math.isfinite(number) else 'null'
+
+    @staticmethod
+    def _encode_str(value) -> str:
+        return json.dumps(str(value), ensure_ascii=False)
+
+    @staticmethod
+    def _encode_bool(value) -> str:
+        return 'true' if value else 'false'
+
+    @staticmethod
+    def _encode_datetime(value) -> str:
+        if isinstance(value, datetime.datetime):
+            return '"' + _iso_datetime(value) + '"'
+        return json.dumps(str(value))
+
+    @staticmethod
+    def _encode_json(value) -> str:
+        return dumps(value)
+
+    _ENCODERS = {
+        'int': _encode_int.__func__,
+        'float': _encode_float.__func__,
+        'str': _encode_str.__func__,
+        'bool': _encode_bool.__func__,
+        'datetime': _encode_datetime.__func__,
+        'json': _encode_json.__func__,
+    }
+
+    def encode_row(self, row: Sequence) -> str:
+        parts = []
+        for (prefix, encoder), value in zip(self._encoders, row):
+            parts.append(prefix + ('null' if value is None else encoder(value)))
+        return '{' + ','.join(parts) + '}'
+
+    def encode_rows(self, rows: Iterable[Sequence]) -> str:
+        return '[' + ','.join(self.encode_row(row) for row in rows) + ']'
+
+    def response(self, rows: Iterable[Sequence], *, key: Optional[str] = None,
+                 envelope: Optional[Dict[str, Any]] = None, status: int = 200):
+        """Масив рядків або об'єкт envelope з масивом під ключем key"""
+        from flask import current_app
+        body = self.encode_rows(rows)
+        if key is not None:
+            head = dumps(envelope or {})[:-1]
+            body = head + (',' if len(head) > 1 else '') + json.dumps(key) + ':' + body + '}'
+        return current_app.response_class(body.encode('utf-8'), status=status, mimetype='application/json')
+
+if DefaultJSONProvider is not None:
+    class FastJSONProvider(DefaultJSONProvider):
+        """JSON-провайдер застосунку: orjson, якщо встановлено, інакше json з тим самим default"""
+
+        sort_keys = False
+
+        def dumps(self, obj: Any, **kwargs: Any) -> str:
+            if not kwargs:
+                return dumps(obj)
+            kwargs.setdefault('default', _default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            return json.dumps(obj, **kwargs)
+
+        def response(self, *args: Any, **kwargs: Any):
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+else:
+    FastJSONProvider = None
+
+    class _LegacyJSONEncoder(json.JSONEncoder):
+        def default(self, o):
+            try:
+                return _default(o)
+            except TypeError:
+                return super().default(o)
+
+def init_json_provider(app: Flask) -> None:
+    if FastJSONProvider is not None:
+        app.json = FastJSONProvider(app)
+    else:
+        app.json_encoder = _LegacyJSONEncoder
+
+__all__ = ['RowSchema', 'FastJSONProvider', 'init_json_provider', 'dumps', 'dumps_bytes']
@@ -0,0 +1,391 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+from flask import Flask, g, request
+from .structured_logging import get_logger
+
+# Реєстр метрик у форматі Prometheus. Кожен gunicorn-воркер тримає власні
+# значення в пам'яті та періодично скидає знімок у METRICS_DIR/<pid>.json;
+# /metrics зводить знімки всіх воркерів: лічильники й гістограми сумуються,
+# gauge - за режимом метрики (livesum/max/last).
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'dbauc-metrics'))
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', '5'))
+METRICS_STALE_SECONDS = float(os.environ.get('METRICS_STALE_SECONDS', '3600'))
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+EXPOSITION_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+logger = get_logger(__name__)
+
+_registry_lock = threading.Lock()
+_registry: Dict[str, '_Metric'] = {}
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _snapshot(self) -> Dict:
+        with self._lock:
+            samples = [[list(key), value] for key, value in self._values.items()]
+        return {"kind": self.kind, "help": self.documentation, "labels": list(self.labelnames), "samples": samples}
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), mode: str = 'livesum'):
+        super().__init__(name, documentation, labelnames)
+        if mode not in ('livesum', 'max', 'last'):
+            raise ValueError(f"unknown gauge mode: {mode}")
+        self.mode = mode
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = [value, time.time()]
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            current = self._values.get(key, [0, 0])[0]
+            self._values[key] = [current + amount, time.time()]
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def _snapshot(self) -> Dict:
+        snapshot = super()._snapshot()
+        snapshot["mode"] = self.mode
+        return snapshot
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [лічильники по бакетах (без +Inf), сума, кількість]
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def _snapshot(self) -> Dict:
+        with self._lock:
+            samples = [[list(key), [list(value[0]), value[1], value[2]]] for key, value in self._values.items()]
+        return {
+            "kind": self.kind,
+            "help": self.documentation,
+            "labels": list(self.labelnames),
+            "buckets": list(self.buckets),
+            "samples": samples,
+        }
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"metric {metric.name} already registered with a different type or labels")
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    return _register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = (), mode: str = 'livesum') -> Gauge:
+    return _register(Gauge(name, documentation, labelnames, mode=mode))
+
+
+def histogram(name: str, documentation: str, labelnames: Iterable[str] = (),
+              buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+
+# ---------------------------------------------------------------------------
+# Знімки воркерів та зведення
+# ---------------------------------------------------------------------------
+
+def snapshot() -> Dict[str, Dict]:
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return {metric.name: metric._snapshot() for metric in metrics}
+
+
+def write_snapshot() -> None:
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump({"pid": os.getpid(), "writtenAt": time.time(), "metrics": snapshot()}, fh)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _load_snapshots() -> List[Tuple[bool, Dict]]:
+    """Знімки всіх воркерів; (живий?, знімок). Старі знімки мертвих процесів видаляються"""
+    snapshots = []
+    own_pid = os.getpid()
+    try:
+        names = os.listdir(METRICS_DIR)
+    except FileNotFoundError:
+        return snapshots
+    now = time.time()
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(METRICS_DIR, name)
+        try:
+            pid = int(name[:-5])
+        except ValueError:
+            continue
+        alive = pid == own_pid or _pid_alive(pid)
+        try:
+            if not alive and now - os.path.getmtime(path) > METRICS_STALE_SECONDS:
+                os.remove(path)
+                continue
+            with open(path, 'r', encoding='utf-8') as fh:
+                snapshots.append((alive, json.load(fh)))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def collect() -> Dict[str, Dict]:
+    """Зводить знімки всіх воркерів в один набір метрик"""
+    write_snapshot()
+    merged: Dict[str, Dict] = {}
+    for alive, data in _load_snapshots():
+        for name, metric in data.get("metrics", {}).items():
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = {key: value for key, value in metric.items() if key != "samples"}
+                target["values"] = {}
+            values = target["values"]
+            kind = metric["kind"]
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                if kind == 'counter':
+                    values[key] = values.get(key, 0) + value
+                elif kind == 'histogram':
+                    current = values.get(key)
+                    if current is None:
+                        values[key] = [list(value[0]), value[1], value[2]]
+                    elif len(current[0]) == len(value[0]):
+                        current[0] = [a + b for a, b in zip(current[0], value[0])]
+                        current[1] += value[1]
+                        current[2] += value[2]
+                elif alive:
+                    # gauge мертвого воркера вже нічого не означає
+                    mode = metric.get("mode", 'livesum')
+                    current = values.get(key)
+                    if current is None:
+                        values[key] = list(value)
+                    elif mode == 'livesum':
+                        current[0] += value[0]
+                    elif mode == 'max':
+                        current[0] = max(current[0], value[0])
+                    elif value[1] > current[1]:
+                        values[key] = list(value)
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: List[str], values: Iterable[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value: float) -> str:
+    if isinstance(value, float):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(value)
+    return str(value)
+
+
+def render_text(merged: Dict[str, Dict]) -> str:
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        kind = metric["kind"]
+        labelnames = metric["labels"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {kind}")
+        for key in sorted(metric["values"]):
+            value = metric["values"][key]
+            if kind == 'histogram':
+                cumulative = 0
+                for bound, count in zip(metric["buckets"], value[0]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labelnames, key, ('le', _format_number(float(bound))))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labelnames, key, ('le', '+Inf'))} {value[2]}")
+                lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_number(float(value[1]))}")
+                lines.append(f"{name}_count{_format_labels(labelnames, key)} {value[2]}")
+            else:
+                number = value[0] if kind == 'gauge' else value
+                lines.append(f"{name}{_format_labels(labelnames, key)} {_format_number(number)}")
+    return '\n'.join(lines) + '\n'
+
+
+def render_metrics() -> str:
+    return render_text(collect())
+
+
+# ---------------------------------------------------------------------------
+# Фоновий запис знімків
+# ---------------------------------------------------------------------------
+
+_flusher_thread: Optional[threading.Thread] = None
+_flusher_stop = threading.Event()
+
+
+def _flusher_loop() -> None:
+    while not _flusher_stop.wait(METRICS_FLUSH_SECONDS):
+        try:
+            write_snapshot()
+        except OSError as e:
+            logger.error("Не вдалося записати знімок метрик: %s", e, extra={"sample": "metrics.flush_error"})
+
+
+def start_metrics_flusher() -> None:
+    global _flusher_thread
+    if _flusher_thread is not None and _flusher_thread.is_alive():
+        return
+    _flusher_stop.clear()
+    _flusher_thread = threading.Thread(target=_flusher_loop, name='metrics-flusher', daemon=True)
+    _flusher_thread.start()
+    atexit.register(_flush_at_exit)
+    logger.info("Знімки метрик пишуться у %s", METRICS_DIR, extra={"intervalSeconds": METRICS_FLUSH_SECONDS})
+
+
+def stop_metrics_flusher() -> None:
+    global _flusher_thread
+    _flusher_stop.set()
+    if _flusher_thread is not None:
+        _flusher_thread.join(timeout=5)
+        _flusher_thread = None
+
+
+def _flush_at_exit() -> None:
+    try:
+        write_snapshot()
+    except OSError:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Метрики HTTP-запитів
+# ---------------------------------------------------------------------------
+
+HTTP_REQUESTS = counter(
+    'http_requests_total', 'HTTP requests by blueprint, route, method and status',
+    ('blueprint', 'route', 'method', 'status'),
+)
+HTTP_REQUEST_SECONDS = histogram(
+    'http_request_duration_seconds', 'HTTP request latency by blueprint and route',
+    ('blueprint', 'route', 'method'),
+)
+HTTP_IN_FLIGHT = gauge('http_requests_in_flight', 'Requests currently being handled', mode='livesum')
+
+
+def _start_request_timer() -> None:
+    g.metrics_started = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+
+
+def _observe_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    HTTP_IN_FLIGHT.dec()
+    elapsed = time.perf_counter() - started
+    rule = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+    blueprint = request.blueprint or ''
+    HTTP_REQUEST_SECONDS.observe(elapsed, blueprint=blueprint, route=rule, method=request.method)
+    HTTP_REQUESTS.inc(blueprint=blueprint, route=rule, method=request.method, status=response.status_code)
+    return response
+
+
+def _finish_request_timer(_exc=None) -> None:
+    # Запит, що впав до after_request, теж має звільнити in-flight
+    if g.pop('metrics_started', None) is not None:
+        HTTP_IN_FLIGHT.dec()
+
+
+def register_metrics(app: Flask) -> None:
+    app.before_request(_start_request_timer)
+    app.after_request(_observe_request)
+    app.teardown_request(_finish_request_timer)
+
+
+__all__ = [
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'EXPOSITION_CONTENT_TYPE',
+    'counter',
+    'gauge',
+    'histogram',
+    'snapshot',
+    'write_snapshot',
+    'collect',
+    'render_text',
+    'render_metrics',
+    'register_metrics',
+    'start_metrics_flusher',
+    'stop_metrics_flusher',
+]
@@ -0,0 +1,82 @@
+import base64
+import datetime
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from flask import Response, request
+from .errors import AppError
+from .json_provider import dumps
+
+# Keyset-пагінація по (created_at, id): сторінка N коштує стільки ж, скільки перша.
+# Відповідь лишається масивом, курсор наступної сторінки - у заголовку X-Next-Cursor.
+# Без limit віддається DEFAULT_PAGE_LIMIT рядків; клієнти йдуть за курсором до кінця.
+DEFAULT_PAGE_LIMIT = 200
+MAX_PAGE_LIMIT = 1000
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+def encode_cursor(created_at: Any, row_id: Any) -> str:
+    if isinstance(created_at, (datetime.datetime, datetime.date)):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, int(row_id)], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(value: str) -> Tuple[Optional[datetime.datetime], int]:
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        created_raw, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = datetime.datetime.fromisoformat(created_raw) if created_raw is not None else None
+        return created_at, int(row_id)
+    except Exception:
+        raise AppError("Invalid cursor", statuscode=400)
+
+class KeysetPage:
+    """Параметри сторінки з запиту: limit та (необов'язковий) курсор"""
+
+    def __init__(self, time_column: str, id_column: str, *, default_limit: int = DEFAULT_PAGE_LIMIT):
+        self.time_column = time_column
+        self.id_column = id_column
+        limit_param = request.args.get('limit')
+        try:
+            limit_value = int(limit_param) if limit_param is not None else default_limit
+        except ValueError:
+            raise AppError("Invalid limit parameter", statuscode=400)
+        self.limit = max(1, min(limit_value, MAX_PAGE_LIMIT))
+        cursor_param = request.args.get('cursor')
+        self.cursor = decode_cursor(cursor_param) if cursor_param else None
+
+    def where(self) -> Tuple[Optional[str], List]:
+        """Умова "після курсора" для порядку DESC (None, якщо це перша сторінка)"""
+        if not self.cursor:
+            return None, []
+        created_at, row_id = self.cursor
+        if created_at is None:
+            return f"({self.time_column} IS NULL AND {self.id_column} < %s)", [row_id]
+        # У порядку DESC рядки з NULL ідуть після всіх непорожніх значень
+        return (
+            f"({self.time_column} < %s OR ({self.time_column} = %s AND {self.id_column} < %s)"
+            f" OR {self.time_column} IS NULL)",
+            [created_at, created_at, row_id],
+        )
+
+    def order_limit(self) -> str:
+        # limit + 1: зайвий рядок лише показує, що є наступна сторінка
+        return f" ORDER BY {self.time_column} DESC, {self.id_column} DESC LIMIT {self.limit + 1}"
+
+    def response(self, rows: List[Dict], time_key: str, id_key: str = 'id',
+                 transform: Optional[Callable[[Dict], Any]] = None) -> Response:
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        next_cursor = encode_cursor(rows[-1][time_key], rows[-1][id_key]) if has_more and rows else None
+
+        def generate():
+            # Серіалізуємо порядково, не збираючи всю відповідь в один рядок
+            yield '['
+            for index, row in enumerate(rows):
+                yield (',' if index else '') + dumps(transform(row) if transform else row)
+            yield ']'
+
+        response = Response(generate(), mimetype='application/json')
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return response
+
+__all__ = ['DEFAULT_PAGE_LIMIT', 'MAX_PAGE_LIMIT', 'NEXT_CURSOR_HEADER', 'encode_cursor', 'decode_cursor', 'KeysetPage']
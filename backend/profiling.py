@@ -0,0 +1,197 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from flask import Flask, g, request
+from .db import db_connection
+from .security import get_auth_user
+from .structured_logging import get_logger
+
+# Профілювання на вимогу. Запит профілюється, лише якщо адміністратор передав
+# заголовок X-Profile: 1; раунд клірингу - якщо для аукціону через адмін-API
+# замовлено N профільованих раундів (auctions.profile_rounds). Профілі cProfile
+# зберігаються в PROFILE_DIR як кільцевий буфер з PROFILE_MAX_FILES файлів.
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'dbauc-profiles'))
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '50'))
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+PROFILE_ID_RE = re.compile(r'^(req|clr)-\d{14}-[0-9a-f]{8}$')
+
+logger = get_logger(__name__)
+_rotate_lock = threading.Lock()
+
+
+def _new_profile_id(kind: str) -> str:
+    return f"{kind}-{time.strftime('%Y%m%d%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:8]}"
+
+
+def _rotate() -> None:
+    with _rotate_lock:
+        try:
+            names = [name for name in os.listdir(PROFILE_DIR) if name.endswith('.prof')]
+        except FileNotFoundError:
+            return
+        if len(names) <= PROFILE_MAX_FILES:
+            return
+        paths = sorted((os.path.join(PROFILE_DIR, name) for name in names), key=os.path.getmtime)
+        for path in paths[:len(paths) - PROFILE_MAX_FILES]:
+            for target in (path, path[:-5] + '.json'):
+                try:
+                    os.remove(target)
+                except FileNotFoundError:
+                    pass
+
+
+def save_profile(profiler: cProfile.Profile, kind: str, label: str, seconds: float, meta: Optional[Dict] = None) -> str:
+    """Записує профіль та метадані поруч, повертає id профілю"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = _new_profile_id(kind)
+    profiler.dump_stats(os.path.join(PROFILE_DIR, f"{profile_id}.prof"))
+    info = {
+        "id": profile_id,
+        "kind": kind,
+        "label": label,
+        "createdAt": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "durationMs": round(seconds * 1000, 2),
+        "pid": os.getpid(),
+        **(meta or {}),
+    }
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.json"), 'w', encoding='utf-8') as fh:
+        json.dump(info, fh, ensure_ascii=False, default=str)
+    _rotate()
+    logger.info("Збережено профіль %s", profile_id, extra={"profile": info})
+    return profile_id
+
+
+@contextmanager
+def profile_block(kind: str, label: str, meta: Optional[Dict] = None) -> Iterator[Dict]:
+    """Профілює тіло блоку в поточному потоці; id профілю - у result['id'] після виходу"""
+    result: Dict = {}
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        profiler.enable()
+    except ValueError:
+        # У потоці вже працює інший профайлер (напр. X-Profile запиту)
+        yield result
+        return
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        try:
+            result["id"] = save_profile(profiler, kind, label, time.perf_counter() - started, meta)
+        except OSError as e:
+            logger.error("Не вдалося зберегти профіль: %s", e)
+
+
+def list_profiles() -> List[Dict]:
+    try:
+        names = os.listdir(PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(PROFILE_DIR, name)
+        try:
+            with open(path, 'r', encoding='utf-8') as fh:
+                info = json.load(fh)
+            info["sizeBytes"] = os.path.getsize(path[:-5] + '.prof')
+            mtime = os.path.getmtime(path)
+        except (OSError, ValueError):
+            continue
+        profiles.append((mtime, info))
+    profiles.sort(key=lambda item: item[0], reverse=True)
+    return [info for _, info in profiles]
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.prof")
+    return path if os.path.exists(path) else None
+
+
+def profile_text(path: str, sort: str = 'cumulative', limit: int = 50) -> str:
+    buffer = io.StringIO()
+    stats = pstats.Stats(path, stream=buffer)
+    stats.sort_stats(sort).print_stats(limit)
+    return buffer.getvalue()
+
+
+def _is_admin_request() -> bool:
+    conn = db_connection()
+    try:
+        user = get_auth_user(conn)
+        return bool(user) and int(user.get('is_admin', 0)) == 1
+    finally:
+        conn.close()
+
+
+def _start_request_profile() -> None:
+    # Без заголовка - жодних додаткових дій, лише перевірка словника заголовків
+    if request.headers.get(PROFILE_HEADER) not in ('1', 'true', 'on'):
+        return
+    try:
+        if not _is_admin_request():
+            return
+    except Exception as e:
+        logger.warning("Перевірка прав для профілювання не вдалася: %s", e)
+        return
+    profiler = cProfile.Profile()
+    g.profile_started = time.perf_counter()
+    g.profiler = profiler
+    profiler.enable()
+
+
+def _finish_request_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    try:
+        profile_id = save_profile(
+            profiler,
+            'req',
+            f"{request.method} {request.path}",
+            time.perf_counter() - g.pop('profile_started'),
+            {"status": response.status_code},
+        )
+        response.headers[PROFILE_ID_HEADER] = profile_id
+    except OSError as e:
+        logger.error("Не вдалося зберегти профіль: %s", e)
+    return response
+
+
+def _discard_request_profile(_exc=None) -> None:
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+
+
+def register_profiling(app: Flask) -> None:
+    app.before_request(_start_request_profile)
+    app.after_request(_finish_request_profile)
+    app.teardown_request(_discard_request_profile)
+
+
+__all__ = [
+    'PROFILE_HEADER',
+    'PROFILE_ID_HEADER',
+    'profile_block',
+    'save_profile',
+    'list_profiles',
+    'profile_path',
+    'profile_text',
+    'register_profiling',
+]
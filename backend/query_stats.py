@@ -0,0 +1,260 @@
+import contextvars
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, Optional
+from flask import Flask, g, request
+from .metrics import counter
+from .structured_logging import get_logger
+
+# Облік SQL-запитів у межах одного HTTP-запиту або одного раунду планувальника.
+# db_connection() повертає з'єднання-обгортку, курсори якого рахують кількість
+# запитів, час у БД та рядки; однакові «форми» запиту понад поріг позначаються як N+1.
+DB_QUERY_STATS = os.environ.get('DB_QUERY_STATS', '1').lower() not in ('0', 'false', 'no', 'off')
+DB_N_PLUS_ONE_THRESHOLD = int(os.environ.get('DB_N_PLUS_ONE_THRESHOLD', '10'))
+DB_SLOW_REQUEST_QUERIES = int(os.environ.get('DB_SLOW_REQUEST_QUERIES', '50'))
+DB_SLOW_REQUEST_MS = float(os.environ.get('DB_SLOW_REQUEST_MS', '200'))
+QUERY_COUNT_HEADER = 'X-DB-Queries'
+
+logger = get_logger(__name__)
+
+DB_QUERIES = counter('db_queries_total', 'SQL statements executed, by scope', ('scope',))
+DB_QUERY_SECONDS = counter('db_query_seconds_total', 'Time spent in SQL statements, by scope', ('scope',))
+DB_ROWS = counter('db_rows_total', 'Rows fetched or affected, by scope', ('scope',))
+DB_N_PLUS_ONE = counter('db_n_plus_one_total', 'Requests or rounds with a repeated statement shape', ('scope',))
+DB_CONNECTIONS_CLOSED = counter('db_connections_closed_total', 'MySQL connections closed through the wrapper')
+
+_current: 'contextvars.ContextVar[Optional[QueryStats]]' = contextvars.ContextVar('query_stats', default=None)
+
+_WS_RE = re.compile(r'\s+')
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_RE = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)', re.IGNORECASE)
+_VALUES_RE = re.compile(r'(\([^()]*\))(?:\s*,\s*\([^()]*\))+')
+
+
+@lru_cache(maxsize=1024)
+def statement_shape(operation: str) -> str:
+    """Нормалізований текст запиту: без літералів, довжини IN-списків та кількості рядків VALUES"""
+    shape = _WS_RE.sub(' ', operation).strip()
+    shape = _STRING_RE.sub('?', shape)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _IN_LIST_RE.sub('IN (...)', shape)
+    shape = _VALUES_RE.sub(r'\1, ...', shape)
+    return shape
+
+
+class QueryStats:
+    __slots__ = ('label', 'scope', 'queries', 'seconds', 'rows', 'shapes', 'shape_seconds', 'started')
+
+    def __init__(self, label: str, scope: str = 'background'):
+        self.label = label
+        self.scope = scope
+        self.queries = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.shapes: Counter = Counter()
+        self.shape_seconds: Counter = Counter()
+        self.started = time.perf_counter()
+
+    def record(self, operation, elapsed: float, rows: int) -> None:
+        shape = statement_shape(operation.decode('utf-8', 'replace') if isinstance(operation, bytes) else str(operation))
+        self.queries += 1
+        self.seconds += elapsed
+        self.rows += max(rows, 0)
+        self.shapes[shape] += 1
+        self.shape_seconds[shape] += elapsed
+
+    def repeated(self, threshold: int = None) -> Dict[str, int]:
+        """Форми запитів, виконані щонайменше threshold разів (кандидати на N+1)"""
+        limit = DB_N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+        return {shape: count for shape, count in self.shapes.most_common() if count >= limit}
+
+    def summary(self) -> Dict:
+        return {
+            "label": self.label,
+            "queries": self.queries,
+            "dbMs": round(self.seconds * 1000, 2),
+            "rows": self.rows,
+            "totalMs": round((time.perf_counter() - self.started) * 1000, 2),
+            "repeated": [
+                {"shape": shape[:200], "count": count, "dbMs": round(self.shape_seconds[shape] * 1000, 2)}
+                for shape, count in self.repeated().items()
+            ],
+        }
+
+    def publish(self) -> None:
+        DB_QUERIES.inc(self.queries, scope=self.scope)
+        DB_QUERY_SECONDS.inc(self.seconds, scope=self.scope)
+        DB_ROWS.inc(self.rows, scope=self.scope)
+        if self.repeated():
+            DB_N_PLUS_ONE.inc(scope=self.scope)
+
+    def log(self, force: bool = False) -> None:
+        repeated = self.repeated()
+        slow = self.queries >= DB_SLOW_REQUEST_QUERIES or self.seconds * 1000 >= DB_SLOW_REQUEST_MS
+        if not (force or repeated or slow):
+            return
+        summary = self.summary()
+        level = logging.WARNING if repeated or slow else logging.INFO
+        logger.log(level, "DB usage: %s", self.label, extra={"db": summary})
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def collect_queries(label: str, scope: str = 'background', log_always: bool = False) -> Iterator[QueryStats]:
+    """Рахує всі запити потоку всередині блоку (напр. один раунд планувальника)"""
+    stats = QueryStats(label, scope)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        stats.publish()
+        stats.log(force=log_always)
+
+
+class InstrumentedCursor:
+    """Обгортка курсора mysql.connector: час execute/executemany та кількість рядків"""
+
+    __slots__ = ('_cursor',)
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, method, operation, *args, **kwargs):
+        stats = _current.get()
+        if stats is None:
+            return method(operation, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(operation, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            # Для SELECT рядки дорахуються у fetch*, для DML - rowcount
+            rows = 0 if getattr(self._cursor, 'with_rows', False) else (self._cursor.rowcount or 0)
+            stats.record(operation, elapsed, rows)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        return self._timed(self._cursor.execute, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        return self._timed(self._cursor.executemany, operation, seq_params, *args, **kwargs)
+
+    def _count_rows(self, count: int) -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.rows += count
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count_rows(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._count_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count_rows(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count_rows(1)
+            yield row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Обгортка з'єднання, що видає InstrumentedCursor; решта атрибутів - без змін"""
+
+    __slots__ = ('_connection',)
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+    def close(self):
+        DB_CONNECTIONS_CLOSED.inc()
+        return self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def instrument_connection(connection):
+    return InstrumentedConnection(connection) if DB_QUERY_STATS else connection
+
+
+def _start_request_stats() -> None:
+    stats = QueryStats(f"{request.method} {request.path}", 'request')
+    g.query_stats_token = _current.set(stats)
+    g.query_stats = stats
+
+
+def _finish_request_stats(response):
+    stats = g.pop('query_stats', None)
+    if stats is None:
+        return response
+    response.headers['Server-Timing'] = (
+        f'db;dur={stats.seconds * 1000:.2f};desc="{stats.queries} queries, {stats.rows} rows"'
+    )
+    response.headers[QUERY_COUNT_HEADER] = str(stats.queries)
+    stats.publish()
+    stats.log()
+    return response
+
+
+def _reset_request_stats(_exc=None) -> None:
+    token = g.pop('query_stats_token', None)
+    if token is not None:
+        try:
+            _current.reset(token)
+        except ValueError:
+            _current.set(None)
+
+
+def register_query_stats(app: Flask) -> None:
+    if not DB_QUERY_STATS:
+        return
+    app.before_request(_start_request_stats)
+    app.after_request(_finish_request_stats)
+    app.teardown_request(_reset_request_stats)
+
+
+__all__ = [
+    'QUERY_COUNT_HEADER',
+    'QueryStats',
+    'statement_shape',
+    'current_query_stats',
+    'collect_queries',
+    'instrument_connection',
+    'register_query_stats',
+]
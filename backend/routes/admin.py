@@ -1,9 +1,16 @@
 import json
 from decimal import Decimal
-from flask import Blueprint, jsonify, request
-from ..db import db_connection, ensure_users_table, ensure_wallet_tables
+from flask import Blueprint, Response, jsonify, request, send_file
+from ..compression import compression_stats
+from ..db import db_connection, ensure_document_jobs, ensure_users_table, ensure_wallet_tables, replica_reads, replica_status
 from ..errors import AppError, OrderDataError
+from ..pagination import KeysetPage
+from ..profiling import list_profiles, profile_path, profile_text
 from ..security import get_auth_user, require_admin
+from ..services.clearing_scheduler import CLEARING_PHASES
+from ..services.document_queue import document_queue_stats
+from ..services.listing_meta import refresh_auction_listing_meta, repair_listing_auction_meta
+from ..services.matching_engine import matching_engine_stats
 from ..services.wallet import (
     wallet_balance,
     wallet_deposit,
@@ -12,7 +19,8 @@ from ..services.wallet import (
     wallet_spend,
     wallet_withdraw,
 )
-from ..utils import serialize, to_decimal
+from ..utils import to_decimal
+from .aucutils import CLEARING_ROUND_SCHEMA
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
@@ -22,8 +30,13 @@ def admin_users():
     conn = db_connection()
     cur = conn.cursor(dictionary=True)
     try:
-        cur.execute("SELECT id, username, email, is_admin, created_at FROM users ORDER BY created_at DESC")
-        return jsonify(serialize(cur.fetchall()))
+        page = KeysetPage('created_at', 'id')
+        where_sql, where_params = page.where()
+        sql = "SELECT id, username, email, is_admin, created_at FROM users"
+        if where_sql:
+            sql += f" WHERE {where_sql}"
+        cur.execute(sql + page.order_limit(), tuple(where_params))
+        return page.response(cur.fetchall(), 'created_at')
     finally:
         cur.close()
         conn.close()
@@ -328,6 +341,7 @@ def fund_bot_wallets():
 
 @admin_bp.get('/auctions/<int:auction_id>/clearing-history')
 @require_admin
+@replica_reads
 def get_clearing_history(auction_id: int):
     """ОТРИМАННЯ ІСТОРІЇ РАУНДІВ КЛІРИНГУ ДЛЯ АУКЦІОНУ"""
     conn = db_connection()
@@ -343,6 +357,8 @@ def get_clearing_history(auction_id: int):
             # Table doesn't exist yet - return empty result
             return jsonify({"auctionId": auction_id, "rounds": [], "count": 0}), 200
 
+        cursor.close()
+        cursor = conn.cursor()
         cursor.execute(
             """
             SELECT id, round_number, clearing_price, clearing_volume,
@@ -355,24 +371,213 @@ def get_clearing_history(auction_id: int):
             (auction_id,)
         )
         rounds = cursor.fetchall()
-        result = [{
-            "id": r['id'],
-            "roundNumber": r['round_number'],
-            "clearingPrice": float(r['clearing_price']) if r['clearing_price'] else None,
-            "clearingVolume": float(r['clearing_volume']) if r['clearing_volume'] else None,
-            "clearingDemand": float(r['clearing_demand']) if r['clearing_demand'] else None,
-            "clearingSupply": float(r['clearing_supply']) if r['clearing_supply'] else None,
-            "totalBids": r['total_bids'],
-            "totalAsks": r['total_asks'],
-            "matchedOrders": r['matched_orders'],
-            "clearedAt": r['cleared_at'].isoformat() if r['cleared_at'] else None
-        } for r in rounds]
-        return jsonify({"auctionId": auction_id, "rounds": result, "count": len(result)}), 200
+        return CLEARING_ROUND_SCHEMA.response(
+            rounds, key="rounds", envelope={"auctionId": auction_id, "count": len(rounds)}
+        )
     finally:
         cursor.close()
         conn.close()
 
 
+CLEARING_TIMINGS_LIMIT_MAX = 1000
+
+
+@admin_bp.get('/auctions/<int:auction_id>/clearing-timings')
+@require_admin
+@replica_reads
+def get_clearing_timings(auction_id: int):
+    """ТРИВАЛІСТЬ ФАЗ РАУНДІВ КЛІРИНГУ АУКЦІОНУ (РЯДИ ДЛЯ ГРАФІКА)"""
+    try:
+        limit = max(1, min(int(request.args.get('limit', 100)), CLEARING_TIMINGS_LIMIT_MAX))
+    except ValueError:
+        raise OrderDataError("limit must be an integer")
+    conn = db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT id FROM auctions WHERE id = %s", (auction_id,))
+        if not cursor.fetchone():
+            raise AppError("Auction not found", statuscode=404)
+        columns = ', '.join(f"{phase}_ms" for phase in CLEARING_PHASES)
+        cursor.execute(
+            f"""
+            SELECT round_number, order_count, allocation_count, {columns},
+                   total_ms, query_count, db_ms, row_count, phase_queries, created_at
+            FROM auction_clearing_timings
+            WHERE auction_id = %s
+            ORDER BY round_number DESC
+            LIMIT %s
+            """,
+            (auction_id, limit)
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    rows.reverse()
+    rounds = []
+    series = {phase: [] for phase in CLEARING_PHASES}
+    for row in rows:
+        phases = {phase: float(row[f"{phase}_ms"]) for phase in CLEARING_PHASES}
+        for phase, value in phases.items():
+            series[phase].append(value)
+        rounds.append({
+            "round": row['round_number'],
+            "orders": row['order_count'],
+            "allocations": row['allocation_count'],
+            "totalMs": float(row['total_ms']),
+            "queries": row['query_count'],
+            "dbMs": float(row['db_ms']),
+            "rows": row['row_count'],
+            "phasesMs": phases,
+            "phaseQueries": json.loads(row['phase_queries']) if row['phase_queries'] else {},
+            "createdAt": row['created_at'],
+        })
+
+    # Мілісекунди на 1000 заявок (медіана): фаза, що росте з розміром книги,
+    # тут виділяється сильніше, ніж у сирих тривалостях
+    summary = {}
+    for phase in CLEARING_PHASES:
+        values = series[phase]
+        per_k = sorted(
+            value * 1000 / item["orders"] for value, item in zip(values, rounds) if item["orders"]
+        )
+        ordered = sorted(values)
+        summary[phase] = {
+            "lastMs": values[-1] if values else None,
+            "medianMs": ordered[len(ordered) // 2] if ordered else None,
+            "maxMs": ordered[-1] if ordered else None,
+            "msPer1kOrders": round(per_k[len(per_k) // 2], 3) if per_k else None,
+        }
+    return jsonify({
+        "auctionId": auction_id,
+        "count": len(rounds),
+        "phases": list(CLEARING_PHASES),
+        "labels": [item["round"] for item in rounds],
+        "orders": [item["orders"] for item in rounds],
+        "series": series,
+        "summary": summary,
+        "rounds": rounds,
+    })
+
+
+@admin_bp.get('/documents/queue')
+@require_admin
+def get_document_queue_stats():
+    """СТАН ЧЕРГИ ГЕНЕРАЦІЇ ДОКУМЕНТІВ УГОД"""
+    conn = db_connection()
+    try:
+        ensure_document_jobs(conn)
+        return jsonify(document_queue_stats(conn))
+    finally:
+        conn.close()
+
+
+@admin_bp.get('/compression/stats')
+@require_admin
+def get_compression_stats():
+    """СТАТИСТИКА СТИСНЕННЯ ВІДПОВІДЕЙ API (ПОТОЧНИЙ ПРОЦЕС)"""
+    return jsonify(compression_stats())
+
+
+@admin_bp.get('/matching/stats')
+@require_admin
+def get_matching_engine_stats():
+    """СТАН MATCHING ENGINE РИНКУ ORDERS (ЛИШЕ У ПРОЦЕСІ-ЛІДЕРІ)"""
+    return jsonify(matching_engine_stats())
+
+
+@admin_bp.get('/db/replicas')
+@require_admin
+def get_replica_status():
+    """СТАН РЕПЛІК ДЛЯ ЧИТАННЯ: ВІДСТАВАННЯ ТА ПРИДАТНІСТЬ (ПОТОЧНИЙ ПРОЦЕС)"""
+    return jsonify({"replicas": replica_status()})
+
+
+PROFILE_ROUNDS_MAX = 20
+PROFILE_SORT_KEYS = {'cumulative', 'tottime', 'calls', 'ncalls'}
+
+
+@admin_bp.post('/auctions/<int:auction_id>/profile')
+@require_admin
+def request_auction_profile(auction_id: int):
+    """ЗАМОВЛЕННЯ ПРОФІЛЮВАННЯ НАСТУПНИХ РАУНДІВ КЛІРИНГУ АУКЦІОНУ"""
+    data = request.get_json(silent=True) or {}
+    try:
+        rounds = int(data.get('rounds', 1))
+    except (TypeError, ValueError):
+        raise OrderDataError("rounds must be an integer")
+    if rounds < 0 or rounds > PROFILE_ROUNDS_MAX:
+        raise OrderDataError(f"rounds must be between 0 and {PROFILE_ROUNDS_MAX}")
+    conn = db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT id FROM auctions WHERE id=%s", (auction_id,))
+        if not cur.fetchone():
+            raise AppError("Auction not found", statuscode=404)
+        cur.execute("UPDATE auctions SET profile_rounds=%s WHERE id=%s", (rounds, auction_id))
+        conn.commit()
+        return jsonify({"auctionId": auction_id, "profileRounds": rounds})
+    finally:
+        cur.close()
+        conn.close()
+
+
+@admin_bp.delete('/auctions/<int:auction_id>/profile')
+@require_admin
+def cancel_auction_profile(auction_id: int):
+    """СКАСУВАННЯ ПРОФІЛЮВАННЯ РАУНДІВ КЛІРИНГУ АУКЦІОНУ"""
+    conn = db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("UPDATE auctions SET profile_rounds=0 WHERE id=%s", (auction_id,))
+        conn.commit()
+        return jsonify({"auctionId": auction_id, "profileRounds": 0})
+    finally:
+        cur.close()
+        conn.close()
+
+
+@admin_bp.get('/profiles')
+@require_admin
+def get_profiles():
+    """СПИСОК ЗБЕРЕЖЕНИХ ПРОФІЛІВ (ЗАПИТИ ТА РАУНДИ КЛІРИНГУ)"""
+    profiles = list_profiles()
+    return jsonify({"profiles": profiles, "count": len(profiles)})
+
+
+@admin_bp.get('/profiles/<profile_id>')
+@require_admin
+def download_profile(profile_id: str):
+    """ЗАВАНТАЖЕННЯ ПРОФІЛЮ: .prof (pstats) АБО ТЕКСТОВИЙ ЗВІТ ?format=text"""
+    path = profile_path(profile_id)
+    if path is None:
+        raise AppError("Profile not found", statuscode=404)
+    if request.args.get('format') == 'text':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in PROFILE_SORT_KEYS:
+            raise OrderDataError(f"sort must be one of {sorted(PROFILE_SORT_KEYS)}")
+        try:
+            limit = max(1, min(int(request.args.get('limit', 50)), 500))
+        except ValueError:
+            raise OrderDataError("limit must be an integer")
+        return Response(profile_text(path, sort, limit), mimetype='text/plain')
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f"{profile_id}.prof")
+
+
+@admin_bp.post('/listings/repair-auction-meta')
+@require_admin
+def repair_listings_auction_meta():
+    """ВИПРАВЛЕННЯ ДЕНОРМАЛІЗОВАНИХ ДАНИХ ПРО АУКЦІОНИ В ЛІСТИНГАХ"""
+    conn = db_connection()
+    try:
+        repaired = repair_listing_auction_meta(conn)
+        return jsonify({"repaired": len(repaired), "listingIds": repaired})
+    finally:
+        conn.close()
+
+
 @admin_bp.get('/auctions/pending')
 @require_admin
 def get_pending_auctions():
@@ -392,7 +597,7 @@ def get_pending_auctions():
             """
         )
         auctions = cursor.fetchall()
-        return jsonify(serialize(auctions)), 200
+        return jsonify(auctions), 200
     finally:
         cursor.close()
         conn.close()
@@ -417,7 +622,7 @@ def get_approved_auctions():
             """
         )
         auctions = cursor.fetchall()
-        return jsonify(serialize(auctions)), 200
+        return jsonify(auctions), 200
     finally:
         cursor.close()
         conn.close()
@@ -483,6 +688,7 @@ def reject_auction(auction_id: int):
             "UPDATE auctions SET approval_status='rejected', approval_note=%s, status='closed' WHERE id=%s",
             (note, auction_id)
         )
+        refresh_auction_listing_meta(cursor, auction_id)
         conn.commit()
 
         admin_user = get_auth_user(conn)
@@ -607,7 +813,7 @@ def admin_wallet_overview():
             total_available += Decimal(str(row.get('available') or 0))
             total_reserved += Decimal(str(row.get('reserved') or 0))
         return jsonify({
-            "users": serialize(rows),
+            "users": rows,
             "totals": {
                 "available": float(total_available),
                 "reserved": float(total_reserved),
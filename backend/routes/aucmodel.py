@@ -2,30 +2,44 @@ import datetime
 import os
 import time
 import random
+import uuid
 from decimal import Decimal
 from typing import Dict, List
 from flask import Blueprint, current_app, g, jsonify, request, send_from_directory
 from ..db import (
     db_connection,
+    replica_reads,
     ensure_auctions_tables,
     ensure_listings_table,
     ensure_resource_transactions,
+    ensure_document_jobs,
     ensure_trader_inventory,
     ensure_users_table,
     ensure_user_profiles,
     ensure_wallet_tables,
 )
 from ..errors import AppError, DBError, OrderDataError
+from ..pagination import KeysetPage
 from ..security import get_auth_user, require_admin, require_auth
-from ..services.auction import compute_k_double_clearing
-from ..services.wallet import wallet_deposit, wallet_release, wallet_reserve, wallet_spend
-from ..utils import is_admin, is_trader, serialize, to_decimal
-from .aucservices import _generate_trade_document, _record_clearing_state, _record_inventory_movement
-from .aucutils import DECIMAL_QUANT, _aggregate_levels, _serialize_orders
+from ..services.auction import compute_k_double_clearing, open_bid_reserve
+from ..services.document_queue import enqueue_trade_documents, wake_document_workers
+from ..services.listing_meta import refresh_auction_listing_meta, refresh_listing_auction_meta
+from ..services.order_expiry import release_cancel_batch
+from ..services.order_sequence import allocate_order_iterations
+from ..services.passwords import hash_password
+from ..services.wallet import wallet_balance, wallet_deposit, wallet_release, wallet_reserve, wallet_spend
+from ..utils import is_admin, is_trader, to_decimal
+from .aucservices import _record_clearing_state, _record_inventory_movement
+from .aucutils import CLEARING_ROUND_SCHEMA, DECIMAL_QUANT, _aggregate_levels, _serialize_orders
 
 auctions_bp = Blueprint('auctions', __name__, url_prefix='/api')
 
+# Пакетні заявки: максимум заявок в одному запиті та рядків в одному INSERT
+ORDER_BATCH_MAX = int(os.environ.get('ORDER_BATCH_MAX', '1000'))
+ORDER_INSERT_CHUNK = 500
+
 @auctions_bp.get('/auctions')
+@replica_reads
 def list_auctions():
     conn = db_connection()
     cur = conn.cursor(dictionary=True)
@@ -50,12 +64,13 @@ def list_auctions():
             sql += ' WHERE ' + ' AND '.join(where)
         sql += ' ORDER BY created_at DESC'
         cur.execute(sql, tuple(params))
-        return jsonify(serialize(cur.fetchall()))
+        return jsonify(cur.fetchall())
     finally:
         cur.close()
         conn.close()
 
 @auctions_bp.get('/auctions/<int:auction_id>/clearing-history')
+@replica_reads
 def get_clearing_history(auction_id: int):
     """ОТРИМАННЯ ІСТОРІЇ РАУНДІВ КЛІРИНГУ (ПУБЛІЧНИЙ ENDPOINT)"""
     conn = db_connection()
@@ -72,6 +87,8 @@ def get_clearing_history(auction_id: int):
             # Table doesn't exist yet - return empty result
             return jsonify({"auctionId": auction_id, "rounds": [], "count": 0}), 200
 
+        cursor.close()
+        cursor = conn.cursor()
         cursor.execute(
             """
             SELECT id, round_number, clearing_price, clearing_volume,
@@ -84,24 +101,15 @@ def get_clearing_history(auction_id: int):
             (auction_id,)
         )
         rounds = cursor.fetchall()
-        result = [{
-            "id": r['id'],
-            "roundNumber": r['round_number'],
-            "clearingPrice": float(r['clearing_price']) if r['clearing_price'] else None,
-            "clearingVolume": float(r['clearing_volume']) if r['clearing_volume'] else None,
-            "clearingDemand": float(r['clearing_demand']) if r['clearing_demand'] else None,
-            "clearingSupply": float(r['clearing_supply']) if r['clearing_supply'] else None,
-            "totalBids": r['total_bids'],
-            "totalAsks": r['total_asks'],
-            "matchedOrders": r['matched_orders'],
-            "clearedAt": r['cleared_at'].isoformat() if r['cleared_at'] else None
-        } for r in rounds]
-        return jsonify({"auctionId": auction_id, "rounds": result, "count": len(result)}), 200
+        return CLEARING_ROUND_SCHEMA.response(
+            rounds, key="rounds", envelope={"auctionId": auction_id, "count": len(rounds)}
+        )
     finally:
         cursor.close()
         conn.close()
 
 @auctions_bp.get('/auctions/<int:auction_id>/book')
+@replica_reads
 def auction_order_book(auction_id: int):
     conn = db_connection()
     cur = conn.cursor(dictionary=True)
@@ -240,8 +248,12 @@ def auction_order_book(auction_id: int):
         
         # Do NOT mutate next_clearing_at here: scheduler керує часом клірингу
         
+        # next_clearing_at зберігається як naive UTC - позначаємо зону лише для відповіді (суфікс Z)
+        if isinstance(auction.get('next_clearing_at'), datetime.datetime) and auction['next_clearing_at'].tzinfo is None:
+            auction['next_clearing_at'] = auction['next_clearing_at'].replace(tzinfo=datetime.timezone.utc)
+
         response = {
-            "auction": serialize(auction),
+            "auction": auction,
             "book": {
                 "bids": bid_levels,
                 "asks": ask_levels
@@ -255,13 +267,6 @@ def auction_order_book(auction_id: int):
             "visibility": 'admin' if admin_view else 'sealed'
         }
         
-        # Ensure next_clearing_at has Z suffix for JavaScript timezone handling
-        if response['auction'].get('next_clearing_at') and isinstance(response['auction']['next_clearing_at'], str):
-            if not response['auction']['next_clearing_at'].endswith('Z'):
-                response['auction']['next_clearing_at'] = response['auction']['next_clearing_at'].replace('+00:00', 'Z')
-                if '+' not in response['auction']['next_clearing_at'] and 'Z' not in response['auction']['next_clearing_at']:
-                    response['auction']['next_clearing_at'] = response['auction']['next_clearing_at'] + 'Z'
-        
         if not admin_view:
             response['book'] = {"bids": [], "asks": []}
             response['recentOrders'] = {"bids": [], "asks": []}
@@ -347,6 +352,7 @@ def create_auction():
                 (product, auction_type, str(k_dec), window_start_dt, window_end_dt, user['id'], user['id'], listing_id_value, next_clearing)
             )
             auction_id = insert_cur.lastrowid
+            refresh_listing_auction_meta(insert_cur, listing_id_value)
         finally:
             insert_cur.close()
         publish_listing = data.get('publishListing', True)
@@ -455,6 +461,7 @@ def close_auction(auction_id: int):
             "UPDATE auctions SET status='closed', closed_at=%s WHERE id=%s",
             (datetime.datetime.utcnow(), auction_id)
         )
+        refresh_auction_listing_meta(cur, auction_id)
         conn.commit()
         return jsonify({"message": "Auction closed"})
     finally:
@@ -523,11 +530,13 @@ def list_participants_admin(auction_id: int):
     cur = conn.cursor(dictionary=True)
     try:
         ensure_auctions_tables(conn)
-        cur.execute(
-            "SELECT * FROM auction_participants WHERE auction_id=%s ORDER BY joined_at DESC",
-            (auction_id,)
-        )
-        return jsonify(serialize(cur.fetchall()))
+        page = KeysetPage('joined_at', 'id')
+        where_sql, where_params = page.where()
+        sql = "SELECT * FROM auction_participants WHERE auction_id=%s"
+        if where_sql:
+            sql += f" AND {where_sql}"
+        cur.execute(sql + page.order_limit(), (auction_id, *where_params))
+        return page.response(cur.fetchall(), 'joined_at')
     finally:
         cur.close()
         conn.close()
@@ -551,6 +560,113 @@ def approve_participant(auction_id: int, participant_id: int):
         cur.close()
         conn.close()
 
+def _window_to_utc(value):
+    if value is None:
+        return None
+    def _assume_local(dt_value):
+        offset = datetime.datetime.now() - datetime.datetime.utcnow()
+        adjusted = dt_value - offset
+        return adjusted.replace(tzinfo=datetime.timezone.utc)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            return _assume_local(value)
+        return value.astimezone(datetime.timezone.utc)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            return _assume_local(parsed)
+        return parsed.astimezone(datetime.timezone.utc)
+    return None
+
+def _load_collecting_auction(cur, auction_id: int, user: Dict) -> Dict:
+    """Аукціон, що приймає заявки від цього трейдера (вікно та допуск перевірено)"""
+    cur.execute(
+        "SELECT id, type, status, window_start, window_end, current_round FROM auctions WHERE id=%s",
+        (auction_id,)
+    )
+    auction = cur.fetchone()
+    if not auction:
+        raise AppError("Auction not found", statuscode=404)
+    if auction['status'] != 'collecting':
+        raise AppError("Auction is not collecting orders", statuscode=400)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    window_start = _window_to_utc(auction.get('window_start'))
+    window_end = _window_to_utc(auction.get('window_end'))
+    if window_start and now < window_start:
+        raise AppError("Auction window has not started", statuscode=400)
+    if window_end and now > window_end:
+        raise AppError("Auction window has ended", statuscode=400)
+    if auction['type'] == 'closed':
+        cur.execute(
+            "SELECT status FROM auction_participants WHERE auction_id=%s AND trader_id=%s",
+            (auction_id, user['id'])
+        )
+        participant = cur.fetchone()
+        if not participant or participant['status'] != 'approved':
+            raise AppError("Not approved to participate in this auction", statuscode=403)
+    return auction
+
+def _parse_order_payload(data: Dict):
+    """(side, price, quantity) з тіла заявки або OrderDataError"""
+    if not isinstance(data, dict):
+        raise OrderDataError("Order must be an object")
+    side = str(data.get('type') or data.get('side') or '').strip()
+    if side not in ('bid', 'ask'):
+        raise OrderDataError("Field 'type' (or 'side') must be 'bid' or 'ask'")
+    try:
+        price = to_decimal(data.get('price'))
+        quantity = to_decimal(data.get('quantity'))
+    except AppError:
+        raise OrderDataError("Fields 'price' and 'quantity' must be valid positive numbers")
+    if not price.is_finite() or not quantity.is_finite():
+        raise OrderDataError("Fields 'price' and 'quantity' must be valid positive numbers")
+    if price <= 0 or quantity <= 0:
+        raise OrderDataError("'price' and 'quantity' must be positive")
+    return side, price, quantity
+
+def _parse_order_expiry(data: Dict, current_round, defaults: Dict | None = None):
+    """
+    Необов'язковий строк дії заявки: expiresAt (ISO) або ttlSeconds, та/або goodForRounds.
+    Повертає (expires_at як naive UTC, expires_after_round).
+    """
+    defaults = defaults or {}
+    def _pick(key):
+        value = data.get(key) if isinstance(data, dict) else None
+        return defaults.get(key) if value is None else value
+    expires_at = None
+    expires_after_round = None
+    raw_expires_at = _pick('expiresAt')
+    ttl_seconds = _pick('ttlSeconds')
+    good_for_rounds = _pick('goodForRounds')
+    if raw_expires_at is not None:
+        expires_at = _window_to_utc(str(raw_expires_at))
+        if expires_at is None:
+            raise OrderDataError("Field 'expiresAt' must be an ISO 8601 datetime")
+    elif ttl_seconds is not None:
+        try:
+            ttl_value = int(ttl_seconds)
+        except (TypeError, ValueError):
+            raise OrderDataError("Field 'ttlSeconds' must be a positive integer")
+        if ttl_value <= 0:
+            raise OrderDataError("Field 'ttlSeconds' must be a positive integer")
+        expires_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=ttl_value)
+    if expires_at is not None:
+        if expires_at <= datetime.datetime.now(datetime.timezone.utc):
+            raise OrderDataError("Order expiry must be in the future")
+        expires_at = expires_at.replace(tzinfo=None, microsecond=0)
+    if good_for_rounds is not None:
+        try:
+            rounds = int(good_for_rounds)
+        except (TypeError, ValueError):
+            raise OrderDataError("Field 'goodForRounds' must be a positive integer")
+        if rounds <= 0:
+            raise OrderDataError("Field 'goodForRounds' must be a positive integer")
+        expires_after_round = int(current_round or 0) + rounds
+    return expires_at, expires_after_round
+
 @auctions_bp.post('/auctions/<int:auction_id>/orders')
 def place_auction_order(auction_id: int):
     conn = db_connection()
@@ -561,58 +677,10 @@ def place_auction_order(auction_id: int):
         user = get_auth_user(conn)
         if not user or not is_trader(user):
             raise AppError("Unauthorized", statuscode=401)
-        cur.execute("SELECT id, type, status, window_start, window_end FROM auctions WHERE id=%s", (auction_id,))
-        auction = cur.fetchone()
-        if not auction:
-            raise AppError("Auction not found", statuscode=404)
-        if auction['status'] != 'collecting':
-            raise AppError("Auction is not collecting orders", statuscode=400)
-        def _to_utc(value):
-            if value is None:
-                return None
-            def _assume_local(dt_value):
-                offset = datetime.datetime.now() - datetime.datetime.utcnow()
-                adjusted = dt_value - offset
-                return adjusted.replace(tzinfo=datetime.timezone.utc)
-            if isinstance(value, datetime.datetime):
-                if value.tzinfo is None:
-                    return _assume_local(value)
-                return value.astimezone(datetime.timezone.utc)
-            if isinstance(value, str):
-                try:
-                    parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
-                except ValueError:
-                    return None
-                if parsed.tzinfo is None:
-                    return _assume_local(parsed)
-                return parsed.astimezone(datetime.timezone.utc)
-            return None
-        now = datetime.datetime.now(datetime.timezone.utc)
-        window_start = _to_utc(auction.get('window_start'))
-        window_end = _to_utc(auction.get('window_end'))
-        if window_start and now < window_start:
-            raise AppError("Auction window has not started", statuscode=400)
-        if window_end and now > window_end:
-            raise AppError("Auction window has ended", statuscode=400)
-        if auction['type'] == 'closed':
-            cur.execute(
-                "SELECT status FROM auction_participants WHERE auction_id=%s AND trader_id=%s",
-                (auction_id, user['id'])
-            )
-            participant = cur.fetchone()
-            if not participant or participant['status'] != 'approved':
-                raise AppError("Not approved to participate in this auction", statuscode=403)
+        auction = _load_collecting_auction(cur, auction_id, user)
         data = request.get_json(silent=True) or {}
-        side = (data.get('type') or data.get('side') or '').strip()
-        if side not in ('bid', 'ask'):
-            raise OrderDataError("Field 'type' (or 'side') must be 'bid' or 'ask'")
-        try:
-            price = to_decimal(data.get('price'))
-            quantity = to_decimal(data.get('quantity'))
-        except OrderDataError:
-            raise OrderDataError("Fields 'price' and 'quantity' must be valid positive numbers")
-        if price <= 0 or quantity <= 0:
-            raise OrderDataError("'price' and 'quantity' must be positive")
+        side, price, quantity = _parse_order_payload(data)
+        expires_at, expires_after_round = _parse_order_expiry(data, auction.get('current_round'))
         reserve_amount: Decimal | None = None
         reserve_tx_id: int | None = None
         if side == 'bid':
@@ -625,15 +693,7 @@ def place_auction_order(auction_id: int):
             }
             reserve_result = wallet_reserve(conn, user['id'], reserve_amount, meta=reserve_meta)
             reserve_tx_id = reserve_result['txId']
-        cur.execute(
-            "SELECT COALESCE(MAX(iteration), 0) AS max_iter FROM auction_orders WHERE auction_id=%s",
-            (auction_id,)
-        )
-        iteration_row = cur.fetchone() or {}
-        try:
-            next_iteration = int(iteration_row.get('max_iter') or 0) + 1
-        except (TypeError, ValueError):
-            next_iteration = 1
+        next_iteration = allocate_order_iterations(conn, auction_id)
         cur.close()
         cur = conn.cursor()
         columns = ["auction_id", "trader_id", "side", "price", "quantity"]
@@ -641,6 +701,12 @@ def place_auction_order(auction_id: int):
         if reserve_amount is not None:
             columns.extend(["reserved_amount", "reserve_tx_id"])
             values.extend([str(reserve_amount), reserve_tx_id])
+        if expires_at is not None:
+            columns.append("expires_at")
+            values.append(expires_at)
+        if expires_after_round is not None:
+            columns.append("expires_after_round")
+            values.append(expires_after_round)
         columns.append("iteration")
         values.append(next_iteration)
         placeholders = ','.join(['%s'] * len(values))
@@ -653,6 +719,10 @@ def place_auction_order(auction_id: int):
             "message": "Order placed",
             "id": cur.lastrowid
         }
+        if expires_at is not None:
+            response["expiresAt"] = expires_at.replace(tzinfo=datetime.timezone.utc)
+        if expires_after_round is not None:
+            response["expiresAfterRound"] = expires_after_round
         if reserve_amount is not None:
             response["reservedAmount"] = float(reserve_amount)
         return jsonify(response), 201
@@ -675,6 +745,140 @@ def place_auction_order(auction_id: int):
             pass
         conn.close()
 
+@auctions_bp.post('/auctions/<int:auction_id>/orders/batch')
+def place_auction_orders_batch(auction_id: int):
+    """
+    Пакетне розміщення заявок: {"orders": [...], "mode": "all_or_nothing" | "partial"}.
+    Одна перевірка аукціону, один резерв коштів на всі bid-заявки та багаторядковий INSERT.
+    У режимі partial невалідні заявки (та bid, на які не вистачає коштів) відхиляються поштучно.
+    """
+    conn = db_connection()
+    cur = conn.cursor(dictionary=True)
+    try:
+        ensure_users_table(conn)
+        ensure_auctions_tables(conn)
+        user = get_auth_user(conn)
+        if not user or not is_trader(user):
+            raise AppError("Unauthorized", statuscode=401)
+        data = request.get_json(silent=True)
+        if isinstance(data, list):
+            data = {"orders": data}
+        data = data or {}
+        raw_orders = data.get('orders')
+        mode = str(data.get('mode') or 'all_or_nothing').strip().lower()
+        if mode not in ('all_or_nothing', 'partial'):
+            raise OrderDataError("Field 'mode' must be 'all_or_nothing' or 'partial'")
+        if not isinstance(raw_orders, list) or not raw_orders:
+            raise OrderDataError("Field 'orders' must be a non-empty list")
+        if len(raw_orders) > ORDER_BATCH_MAX:
+            raise OrderDataError(f"Batch is limited to {ORDER_BATCH_MAX} orders")
+        auction = _load_collecting_auction(cur, auction_id, user)
+
+        accepted = []
+        rejected = []
+        for index, raw in enumerate(raw_orders):
+            try:
+                side, price, quantity = _parse_order_payload(raw)
+                expires_at, expires_after_round = _parse_order_expiry(raw, auction.get('current_round'), data)
+            except AppError as error:
+                rejected.append({"index": index, "error": error.message})
+                continue
+            reserve_amount = (price * quantity).quantize(DECIMAL_QUANT) if side == 'bid' else None
+            accepted.append({
+                "index": index, "side": side, "price": price, "quantity": quantity, "reserve": reserve_amount,
+                "expires_at": expires_at, "expires_after_round": expires_after_round,
+            })
+        if rejected and mode == 'all_or_nothing':
+            raise OrderDataError("Batch contains invalid orders", details={"rejected": rejected})
+
+        # Кошти резервуються однією операцією гаманця на всю суму bid-заявок
+        available = wallet_balance(conn, user['id'])['available']
+        total_reserve = Decimal('0')
+        funded = []
+        for order in accepted:
+            if order['reserve'] is not None:
+                if total_reserve + order['reserve'] > available:
+                    if mode == 'all_or_nothing':
+                        raise AppError("Insufficient balance", statuscode=400)
+                    rejected.append({"index": order['index'], "error": "Insufficient balance"})
+                    continue
+                total_reserve += order['reserve']
+            funded.append(order)
+        if not funded:
+            raise OrderDataError("No orders accepted", details={"rejected": rejected})
+        reserve_tx_id = None
+        if total_reserve > 0:
+            reserve_result = wallet_reserve(conn, user['id'], total_reserve, meta={
+                "auctionId": auction_id,
+                "action": "batch_orders",
+                "orders": sum(1 for order in funded if order['reserve'] is not None),
+            })
+            reserve_tx_id = reserve_result['txId']
+
+        next_iteration = allocate_order_iterations(conn, auction_id, len(funded))
+        cur.close()
+        cur = conn.cursor()
+        for chunk_start in range(0, len(funded), ORDER_INSERT_CHUNK):
+            chunk = funded[chunk_start:chunk_start + ORDER_INSERT_CHUNK]
+            values = []
+            for order in chunk:
+                order['iteration'] = next_iteration
+                next_iteration += 1
+                values.extend([
+                    auction_id, user['id'], order['side'], str(order['price']), str(order['quantity']),
+                    str(order['reserve']) if order['reserve'] is not None else None,
+                    reserve_tx_id if order['reserve'] is not None else None,
+                    order['expires_at'],
+                    order['expires_after_round'],
+                    order['iteration'],
+                ])
+            cur.execute(
+                "INSERT INTO auction_orders (auction_id, trader_id, side, price, quantity, reserved_amount, reserve_tx_id, "
+                "expires_at, expires_after_round, iteration) VALUES "
+                + ','.join(['(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)'] * len(chunk)),
+                tuple(values)
+            )
+            # MyISAM блокує таблицю на весь INSERT, тож id рядків ідуть підряд
+            first_id = cur.lastrowid
+            for offset, order in enumerate(chunk):
+                order['id'] = first_id + offset
+        conn.commit()
+        response = {
+            "message": "Orders placed",
+            "mode": mode,
+            "accepted": [
+                {
+                    "index": order['index'],
+                    "id": order['id'],
+                    "iteration": order['iteration'],
+                    **({"reservedAmount": float(order['reserve'])} if order['reserve'] is not None else {}),
+                }
+                for order in funded
+            ],
+            "rejected": sorted(rejected, key=lambda item: item['index']),
+            "reservedAmount": float(total_reserve),
+            "reserveTxId": reserve_tx_id,
+        }
+        return jsonify(response), 201
+    except AppError as error:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise error
+    except Exception as exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise DBError("Error placing orders", details=str(exception)) from exception
+    finally:
+        try:
+            cur.close()
+        except Exception:
+            pass
+        conn.close()
+
 @auctions_bp.get('/admin/auctions/<int:auction_id>/orders')
 @require_admin
 def list_auction_orders_admin(auction_id: int):
@@ -702,7 +906,7 @@ def list_auction_orders_admin(auction_id: int):
             """,
             (auction_id,)
         )
-        return jsonify(serialize(cur.fetchall()))
+        return jsonify(cur.fetchall())
     finally:
         cur.close()
         conn.close()
@@ -765,6 +969,128 @@ def confirm_auction_k(auction_id: int):
             pass
         conn.close()
 
+def _order_reserved_total(order: Dict):
+    """Зарезервована сума під відкритий залишок bid-заявки (див. open_bid_reserve)"""
+    try:
+        return open_bid_reserve(order)
+    except Exception:
+        return None
+
+@auctions_bp.patch('/auctions/<int:auction_id>/orders/<int:order_id>')
+def amend_auction_order(auction_id: int, order_id: int):
+    """
+    Зміна ціни та/або кількості відкритої заявки без скасування.
+    Резервується або повертається лише різниця суми bid-заявки.
+    Пріоритет зберігається лише при зменшенні кількості за тієї ж ціни,
+    будь-яка інша зміна ставить заявку в кінець черги (новий iteration).
+    """
+    conn = db_connection()
+    cur = conn.cursor(dictionary=True)
+    try:
+        ensure_users_table(conn)
+        ensure_auctions_tables(conn)
+        user = get_auth_user(conn)
+        if not user or not is_trader(user):
+            raise AppError("Unauthorized", statuscode=401)
+        _load_collecting_auction(cur, auction_id, user)
+        cur.execute(
+            """
+            SELECT id, trader_id, side, price, quantity, status, iteration, reserved_amount
+            FROM auction_orders
+            WHERE id=%s AND auction_id=%s
+            """,
+            (order_id, auction_id)
+        )
+        order = cur.fetchone()
+        if not order:
+            raise AppError("Order not found", statuscode=404)
+        if int(order['trader_id']) != int(user['id']):
+            raise AppError("Forbidden", statuscode=403)
+        if order['status'] != 'open':
+            raise AppError("Only open orders can be amended", statuscode=400)
+        data = request.get_json(silent=True) or {}
+        if data.get('price') is None and data.get('quantity') is None:
+            raise OrderDataError("Provide 'price' and/or 'quantity'")
+        old_price = to_decimal(order['price'])
+        old_quantity = to_decimal(order['quantity'])
+        _, price, quantity = _parse_order_payload({
+            "side": order['side'],
+            "price": data.get('price') if data.get('price') is not None else old_price,
+            "quantity": data.get('quantity') if data.get('quantity') is not None else old_quantity,
+        })
+        if price == old_price and quantity == old_quantity:
+            raise OrderDataError("Order already has this price and quantity")
+        keep_priority = price == old_price and quantity < old_quantity
+        iteration = order['iteration'] if keep_priority else allocate_order_iterations(conn, auction_id)
+
+        old_reserve = None
+        new_reserve = None
+        reserve_delta = Decimal('0')
+        meta = {"auctionId": auction_id, "orderId": order_id, "action": "amend"}
+        if order['side'] == 'bid':
+            old_reserve = _order_reserved_total(order) or Decimal('0')
+            new_reserve = (price * quantity).quantize(DECIMAL_QUANT)
+            reserve_delta = new_reserve - old_reserve
+        # Спочатку резервуємо додаткові кошти: якщо їх не вистачає, заявку не змінено
+        if reserve_delta > 0:
+            wallet_reserve(conn, user['id'], reserve_delta, meta=meta)
+        upd = conn.cursor()
+        try:
+            # Умова на старі price/quantity захищає від одночасної зміни заявки
+            upd.execute(
+                """
+                UPDATE auction_orders
+                SET price=%s, quantity=%s, iteration=%s, reserved_amount=%s
+                WHERE id=%s AND status='open' AND price=%s AND quantity=%s
+                """,
+                (
+                    str(price), str(quantity), iteration,
+                    str(new_reserve) if new_reserve is not None else order['reserved_amount'],
+                    order_id, str(old_price), str(old_quantity),
+                )
+            )
+            amended = upd.rowcount == 1
+        finally:
+            upd.close()
+        if not amended:
+            if reserve_delta > 0:
+                wallet_release(conn, user['id'], reserve_delta, meta={**meta, "action": "amend_conflict"})
+                conn.commit()
+            raise AppError("Order was changed concurrently, reload and retry", statuscode=409)
+        if reserve_delta < 0:
+            wallet_release(conn, user['id'], -reserve_delta, meta=meta)
+        conn.commit()
+        response = {
+            "message": "Order amended",
+            "id": order_id,
+            "price": float(price),
+            "quantity": float(quantity),
+            "iteration": iteration,
+            "priorityKept": keep_priority,
+        }
+        if new_reserve is not None:
+            response["reservedAmount"] = float(new_reserve)
+            response["reserveDelta"] = float(reserve_delta)
+        return jsonify(response)
+    except AppError as error:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise error
+    except Exception as exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise DBError("Error amending order", details=str(exception)) from exception
+    finally:
+        try:
+            cur.close()
+        except Exception:
+            pass
+        conn.close()
+
 @auctions_bp.delete('/auctions/<int:auction_id>/orders/<int:order_id>')
 def cancel_auction_order(auction_id: int, order_id: int):
     conn = db_connection()
@@ -805,15 +1131,7 @@ def cancel_auction_order(auction_id: int, order_id: int):
         finally:
             upd.close()
         if order['side'] == 'bid':
-            try:
-                reserved_total = to_decimal(order['reserved_amount']) if order.get('reserved_amount') is not None else None
-            except Exception:
-                reserved_total = None
-            if reserved_total is None:
-                try:
-                    reserved_total = (to_decimal(order['price']) * to_decimal(order['quantity'])).quantize(DECIMAL_QUANT)
-                except Exception:
-                    reserved_total = None
+            reserved_total = _order_reserved_total(order)
             if reserved_total is not None and reserved_total > 0:
                 wallet_release(conn, user['id'], reserved_total, meta={
                     "auctionId": auction_id,
@@ -841,6 +1159,143 @@ def cancel_auction_order(auction_id: int, order_id: int):
             pass
         conn.close()
 
+def _mass_cancel_orders(conn, *, auction_id: int | None = None, trader_id: int | None = None,
+                        action: str = 'cancel_all') -> Dict:
+    """
+    Скасування всіх відкритих заявок аукціону та/або трейдера (лише в аукціонах, що збирають заявки).
+    Статуси змінюються одним UPDATE з міткою cancel_batch, резерви повертаються
+    однією операцією гаманця на трейдера.
+    """
+    batch = uuid.uuid4().hex
+    where = ["ao.status = 'open'", "a.status = 'collecting'"]
+    params: List = [batch]
+    if auction_id is not None:
+        where.append("ao.auction_id = %s")
+        params.append(auction_id)
+    if trader_id is not None:
+        where.append("ao.trader_id = %s")
+        params.append(trader_id)
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "UPDATE auction_orders ao JOIN auctions a ON a.id = ao.auction_id "
+            "SET ao.status = 'rejected', ao.cancel_batch = %s WHERE " + ' AND '.join(where),
+            tuple(params)
+        )
+        canceled = cur.rowcount
+    finally:
+        cur.close()
+    traders, released_total = 0, Decimal('0')
+    if canceled:
+        meta = {"action": action}
+        if auction_id is not None:
+            meta["auctionId"] = auction_id
+        traders, released_total = release_cancel_batch(conn, batch, meta)
+    return {
+        "canceled": canceled,
+        "cancelBatch": batch if canceled else None,
+        "releasedAmount": float(released_total),
+        "traders": traders,
+    }
+
+@auctions_bp.delete('/auctions/<int:auction_id>/orders')
+def cancel_my_auction_orders(auction_id: int):
+    """СКАСУВАННЯ ВСІХ ВІДКРИТИХ ЗАЯВОК ПОТОЧНОГО ТРЕЙДЕРА В АУКЦІОНІ"""
+    conn = db_connection()
+    cur = conn.cursor(dictionary=True)
+    try:
+        ensure_users_table(conn)
+        ensure_auctions_tables(conn)
+        user = get_auth_user(conn)
+        if not user or not is_trader(user):
+            raise AppError("Unauthorized", statuscode=401)
+        cur.execute("SELECT id, status FROM auctions WHERE id=%s", (auction_id,))
+        auction = cur.fetchone()
+        if not auction:
+            raise AppError("Auction not found", statuscode=404)
+        if auction['status'] != 'collecting':
+            raise AppError("Auction is not collecting orders", statuscode=400)
+        result = _mass_cancel_orders(conn, auction_id=auction_id, trader_id=user['id'])
+        conn.commit()
+        return jsonify({"message": "Orders canceled", **result})
+    except AppError as error:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise error
+    except Exception as exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise DBError("Error canceling orders", details=str(exception)) from exception
+    finally:
+        try:
+            cur.close()
+        except Exception:
+            pass
+        conn.close()
+
+@auctions_bp.delete('/admin/auctions/<int:auction_id>/orders')
+@require_admin
+def cancel_auction_orders_admin(auction_id: int):
+    """СКАСУВАННЯ ВСІХ ВІДКРИТИХ ЗАЯВОК АУКЦІОНУ (АБО ОДНОГО ТРЕЙДЕРА В НЬОМУ, ?traderId=)"""
+    trader_id = request.args.get('traderId', type=int)
+    conn = db_connection()
+    cur = conn.cursor(dictionary=True)
+    try:
+        ensure_auctions_tables(conn)
+        cur.execute("SELECT id FROM auctions WHERE id=%s", (auction_id,))
+        if not cur.fetchone():
+            raise AppError("Auction not found", statuscode=404)
+        result = _mass_cancel_orders(conn, auction_id=auction_id, trader_id=trader_id, action='admin_cancel_all')
+        conn.commit()
+        return jsonify({"message": "Orders canceled", **result})
+    except AppError as error:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise error
+    except Exception as exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise DBError("Error canceling orders", details=str(exception)) from exception
+    finally:
+        try:
+            cur.close()
+        except Exception:
+            pass
+        conn.close()
+
+@auctions_bp.delete('/admin/traders/<int:trader_id>/auction-orders')
+@require_admin
+def cancel_trader_orders_admin(trader_id: int):
+    """СКАСУВАННЯ ВСІХ ВІДКРИТИХ ЗАЯВОК ТРЕЙДЕРА В УСІХ АУКЦІОНАХ (KILL SWITCH)"""
+    conn = db_connection()
+    try:
+        ensure_auctions_tables(conn)
+        result = _mass_cancel_orders(conn, trader_id=trader_id, action='admin_cancel_all')
+        conn.commit()
+        return jsonify({"message": "Orders canceled", **result})
+    except AppError as error:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise error
+    except Exception as exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise DBError("Error canceling orders", details=str(exception)) from exception
+    finally:
+        conn.close()
+
 @auctions_bp.post('/admin/auctions/<int:auction_id>/clear')
 @require_admin
 def clear_auction(auction_id: int):
@@ -850,6 +1305,7 @@ def clear_auction(auction_id: int):
         ensure_auctions_tables(conn)
         ensure_trader_inventory(conn)
         ensure_resource_transactions(conn)
+        ensure_document_jobs(conn)
         cur.execute("SELECT id, product, k_value, status, admin_id FROM auctions WHERE id=%s", (auction_id,))
         auction = cur.fetchone()
         if not auction:
@@ -966,10 +1422,7 @@ def clear_auction(auction_id: int):
             if row.get('reserve_tx_id') is not None:
                 order_meta["reserveTxId"] = row['reserve_tx_id']
             if row['side'] == 'bid':
-                order_price = to_decimal(row['price'])
-                order_quantity = to_decimal(row['quantity'])
-                reserved_total = to_decimal(row['reserved_amount']) if row['reserved_amount'] is not None else (order_price * order_quantity)
-                reserved_total = reserved_total.quantize(DECIMAL_QUANT)
+                reserved_total = open_bid_reserve(row)
                 cleared_qty_quant = to_decimal(cleared_qty)
                 spent = (price * cleared_qty_quant).quantize(DECIMAL_QUANT)
                 if spent > Decimal('0'):
@@ -1007,12 +1460,21 @@ def clear_auction(auction_id: int):
             "UPDATE auctions SET next_clearing_at=%s WHERE id=%s",
             (next_clearing, auction_id)
         )
+        # Документи угод генеруються фоновими воркерами
+        enqueue_trade_documents(conn, [
+            {
+                'auction_id': auction_id,
+                'trader_id': row['trader_id'],
+                'role': 'покупець' if row['side'] == 'bid' else 'продавець',
+                'product': auction['product'],
+                'price': price,
+                'quantity': allocation_map[row['id']],
+            }
+            for row in raw_orders
+            if allocation_map.get(row['id'], Decimal('0')) > Decimal('0')
+        ])
         conn.commit()
-        for row in raw_orders:
-            cleared_qty = allocation_map.get(row['id'], Decimal('0'))
-            if cleared_qty > Decimal('0'):
-                role = 'покупець' if row['side'] == 'bid' else 'продавець'
-                _generate_trade_document(auction_id, role, row['trader_id'], cleared_qty, price, auction['product'])
+        wake_document_workers()
         return jsonify({
             "message": "Auction cleared",
             "price": float(price),
@@ -1135,22 +1597,14 @@ def seed_random_orders(auction_id: int):
         price_center = float(price_center)
         created = []
         order_rows = []
-        cur.execute(
-            "SELECT COALESCE(MAX(iteration), 0) AS max_iter FROM auction_orders WHERE auction_id=%s",
-            (auction_id,)
-        )
-        iter_row = cur.fetchone() or {}
-        try:
-            next_iteration = int(iter_row.get('max_iter') or 0) + 1
-        except (TypeError, ValueError):
-            next_iteration = 1
-        from passlib.hash import pbkdf2_sha256
+        next_iteration = allocate_order_iterations(conn, auction_id, max(1, count * (max(0, bids_per) + max(0, asks_per))))
+        # Усі боти мають однаковий пароль, тому хешуємо його один раз
+        pwd_hash = hash_password('password')
         # Розрахунок безпечного депозиту для ботів, щоб вистачило на всі резерви
         max_bid_reserve = Decimal(str(price_center)) * Decimal(str(qty_max)) * Decimal(max(1, bids_per))
         deposit_amount = max(Decimal('10000'), max_bid_reserve * Decimal('2'))
         for i in range(count):
             username = f"bot_{int(time.time())}_{os.urandom(3).hex()}_{i}"[:60]
-            pwd_hash = pbkdf2_sha256.hash('password')
             cur.execute(
                 "INSERT INTO users (username, password_hash, is_admin) VALUES (%s,%s,%s)",
                 (username, pwd_hash, 0)
@@ -1347,6 +1801,7 @@ def cleanup_bots(auction_id: int):
         raise DBError("Error cleaning up bot data", details=str(e)) from e
 
 @auctions_bp.get('/auctions/<int:auction_id>/history')
+@replica_reads
 def auction_history(auction_id: int):
     conn = db_connection()
     cur = conn.cursor(dictionary=True)
@@ -1462,6 +1917,7 @@ def purge_all_bots():
         conn.close()
 
 @auctions_bp.get('/auctions/<int:auction_id>/distribution')
+@replica_reads
 def auction_price_distribution(auction_id: int):
     conn = db_connection()
     cur = conn.cursor(dictionary=True)
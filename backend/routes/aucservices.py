@@ -1,12 +1,8 @@
 import datetime
-import hashlib
-import hmac
-import os
 from decimal import Decimal
 from typing import Optional, Tuple
-from flask import current_app
-from ..security import JWT_SECRET
-from .aucutils import DECIMAL_QUANT, _normalize_decimal
+from ..services.listing_meta import refresh_auction_listing_meta
+from .aucutils import _normalize_decimal
 
 def _record_clearing_state(
     cur,
@@ -50,52 +46,7 @@ def _record_clearing_state(
             auction_id
         )
     )
-
-def _generate_trade_document(
-    auction_id: int,
-    role: str,
-    trader_id: int,
-    amount: Decimal,
-    price: Decimal,
-    product: str,) -> str:
-    base_dir = os.path.join(current_app.config['GENERATED_DOCS_ROOT'], f'auction_{auction_id}')
-    os.makedirs(base_dir, exist_ok=True)
-    now = datetime.datetime.utcnow()
-    timestamp_iso = now.isoformat() + 'Z'
-    epoch_ts = int(now.timestamp())
-    filename = f"auction_{auction_id}_{role}_trader_{trader_id}_{epoch_ts}.txt"
-    path = os.path.join(base_dir, filename)
-    op_type = 'Покупка' if role.strip().lower() == 'покупець' else 'Продаж'
-    try:
-        amt = amount if isinstance(amount, Decimal) else Decimal(str(amount))
-    except Exception:
-        amt = Decimal('0')
-    try:
-        prc = price if isinstance(price, Decimal) else Decimal(str(price))
-    except Exception:
-        prc = Decimal('0')
-    total_cost = (prc * amt).quantize(DECIMAL_QUANT)
-    payload = f"{auction_id}|{trader_id}|{op_type}|{product}|{str(prc)}|{str(amt)}|{timestamp_iso}"
-    try:
-        key_bytes = (JWT_SECRET or 'local_dev_secret').encode('utf-8')
-    except Exception:
-        key_bytes = b'local_dev_secret'
-    signature = hmac.new(key_bytes, payload.encode('utf-8'), hashlib.sha256).hexdigest()
-    with open(path, 'w', encoding='utf-8') as fh:
-        fh.write("=== ПІДТВЕРДЖЕННЯ УГОДИ ===\n")
-        fh.write(f"Аукціон: {product}\n")
-        fh.write(f"Тип операції: {op_type}\n")
-        fh.write(f"Трейдер ID: {trader_id}\n")
-        fh.write(f"Дата угоди: {timestamp_iso}\n")
-        fh.write("\n")
-        fh.write("Деталі угоди:\n")
-        fh.write(f"- Продукт: {product}\n")
-        fh.write(f"- Ціна: {str(prc)}\n")
-        fh.write(f"- Кількість: {str(amt)}\n")
-        fh.write(f"- Загальна вартість: {str(total_cost)}\n")
-        fh.write("\n")
-        fh.write(f"Підпис системи: {signature}\n")
-    return path
+    refresh_auction_listing_meta(cur, auction_id)
 
 def _record_inventory_movement(conn, trader_id: int, product: str, delta_qty: Decimal,
     *, auction_id: int, order_id: int) -> None:
@@ -1,8 +1,23 @@
 from decimal import Decimal
 from typing import Dict, Optional
+from ..json_provider import RowSchema
 
 DECIMAL_QUANT = Decimal('0.000001')
 
+# Колонки SELECT з auction_clearing_rounds у тому ж порядку
+CLEARING_ROUND_SCHEMA = RowSchema(
+    ("id", "int"),
+    ("roundNumber", "int"),
+    ("clearingPrice", "float"),
+    ("clearingVolume", "float"),
+    ("clearingDemand", "float"),
+    ("clearingSupply", "float"),
+    ("totalBids", "int"),
+    ("totalAsks", "int"),
+    ("matchedOrders", "int"),
+    ("clearedAt", "datetime"),
+)
+
 def _normalize_decimal(value: Optional[Decimal]) -> Optional[Decimal]:
     if value is None:
         return None
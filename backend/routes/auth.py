@@ -1,39 +1,14 @@
 from flask import Blueprint, jsonify, request
-from passlib.hash import pbkdf2_sha256
-try:
-    from passlib.hash import bcrypt as bcrypt_hash
-except Exception:
-    bcrypt_hash = None
-def _hash_password(password: str) -> str:
-    """Hash password using pbkdf2_sha256 (pure Python, no native deps)."""
-    return pbkdf2_sha256.hash(password)
-
-
-def _verify_password(password: str, stored_hash: str) -> bool:
-    """Verify password; support pbkdf2 first, fallback to bcrypt if present."""
-    # Primary: pbkdf2
-    try:
-        if stored_hash.startswith("$pbkdf2-sha256$") and pbkdf2_sha256.verify(password, stored_hash):
-            return True
-    except Exception:
-        pass
-    # Fallback: bcrypt hashes created раніше, якщо модуль доступний
-    if bcrypt_hash and stored_hash.startswith("$2"):
-        try:
-            return bcrypt_hash.verify(password, stored_hash)
-        except Exception:
-            pass
-    # Generic attempt pbkdf2 (covers hashes без prefix, якщо такі є)
-    try:
-        return pbkdf2_sha256.verify(password, stored_hash)
-    except Exception:
-        return False
-
 from ..db import db_connection, ensure_users_table, ensure_user_profiles
 from ..errors import AppError, DBError
 from ..security import create_token, get_auth_user
+from ..services.passwords import auth_slot, hash_password, needs_rehash, verify_password
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+def _client_ip() -> str:
+    # X-Forwarded-For враховує ProxyFix (TRUSTED_PROXY_HOPS); сирому заголовку не довіряємо
+    return request.remote_addr or 'unknown'
+
 @auth_bp.post('/register')
 def register():
     conn = db_connection()
@@ -57,7 +32,8 @@ def register():
         cur.execute("SELECT id FROM users WHERE username=%s", (username,))
         if cur.fetchone():
             return jsonify({"error": "Username already exists"}), 409
-        pwd_hash = _hash_password(password)
+        with auth_slot(username, _client_ip()):
+            pwd_hash = hash_password(password)
         cur.execute(
             "INSERT INTO users (username, email, password_hash, is_admin) VALUES (%s, %s, %s, %s)",
             (username, email, pwd_hash, 0)
@@ -70,6 +46,9 @@ def register():
         )
         conn.commit()
         return jsonify({"message": "Registered"}), 201
+    except AppError:
+        conn.rollback()
+        raise
     except Exception as e:
         conn.rollback()
         raise DBError("Error registering user", details=str(e))
@@ -77,6 +56,25 @@ def register():
         cur.close()
         conn.close()
 
+def _rehash_password(conn, user_id: int, old_hash: str, password: str) -> None:
+    # Оновлюємо хеш під поточні параметри; невдача не повинна ламати логін
+    try:
+        new_hash = hash_password(password)
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "UPDATE users SET password_hash=%s WHERE id=%s AND password_hash=%s",
+                (new_hash, user_id, old_hash)
+            )
+            conn.commit()
+        finally:
+            cur.close()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+
 @auth_bp.post('/login')
 def login():
     conn = db_connection()
@@ -90,8 +88,11 @@ def login():
     try:
         cur.execute("SELECT id, username, email, password_hash, is_admin, created_at FROM users WHERE username=%s", (username,))
         user = cur.fetchone()
-        if not user or not _verify_password(password, user['password_hash']):
-            return jsonify({"error": "Invalid credentials"}), 401
+        with auth_slot(username, _client_ip()):
+            if not user or not verify_password(password, user['password_hash']):
+                return jsonify({"error": "Invalid credentials"}), 401
+            if needs_rehash(user['password_hash']):
+                _rehash_password(conn, user['id'], user['password_hash'], password)
         token = create_token(user)
         return jsonify({
             "token": token,
@@ -0,0 +1,230 @@
+import csv
+import datetime
+import io
+import json
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from flask import Blueprint, Response, request
+from ..db import (
+    db_connection,
+    ensure_auction_clearing_rounds,
+    ensure_auctions_tables,
+    ensure_users_table,
+    ensure_wallet_tables,
+)
+from ..errors import AppError
+from ..security import get_auth_user
+from ..utils import is_admin
+
+exports_bp = Blueprint('exports', __name__, url_prefix='/api/exports')
+
+# Експорт читається короткими порціями по (час, id): MyISAM тримає блокування
+# таблиці лише на час однієї порції, а пам'ять не залежить від розміру експорту.
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FETCH_SIZE = 500
+
+WALLET_COLUMNS = ['id', 'user_id', 'type', 'amount', 'balance_after', 'meta', 'created_at']
+FILL_COLUMNS = [
+    'id', 'auction_id', 'product', 'trader_id', 'side', 'price', 'quantity', 'status',
+    'cleared_price', 'cleared_quantity', 'iteration', 'created_at',
+]
+ROUND_COLUMNS = [
+    'id', 'auction_id', 'round_number', 'clearing_price', 'clearing_volume', 'clearing_demand',
+    'clearing_supply', 'total_bids', 'total_asks', 'matched_orders', 'cleared_at',
+]
+
+def _export_user():
+    conn = db_connection()
+    try:
+        ensure_users_table(conn)
+        user = get_auth_user(conn)
+        if not user:
+            raise AppError("Unauthorized", statuscode=401)
+        return user
+    finally:
+        conn.close()
+
+def _export_format() -> str:
+    fmt = (request.args.get('format') or 'ndjson').strip().lower()
+    if fmt not in ('ndjson', 'csv'):
+        raise AppError("Field 'format' must be 'ndjson' or 'csv'", statuscode=400)
+    return fmt
+
+def _parse_time(name: str) -> Optional[datetime.datetime]:
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        value = datetime.datetime.fromisoformat(raw.strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise AppError(f"Invalid '{name}' date", statuscode=400)
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+def _parse_int(name: str) -> Optional[int]:
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        raise AppError(f"Invalid '{name}' parameter", statuscode=400)
+
+def _range_filters(time_column: str, where: List[str], params: List) -> None:
+    start = _parse_time('from')
+    end = _parse_time('to')
+    if start:
+        where.append(f"{time_column} >= %s")
+        params.append(start)
+    if end:
+        where.append(f"{time_column} < %s")
+        params.append(end)
+
+def _iter_rows(sql: str, where: List[str], params: Sequence, time_column: str, id_column: str,
+               time_key: str) -> Iterator[Dict]:
+    conn = db_connection()
+    try:
+        last: Optional[Tuple] = None
+        while True:
+            clauses = list(where)
+            chunk_params = list(params)
+            if last is not None and last[0] is None:
+                # У порядку ASC рядки з NULL ідуть першими; далі - усі непорожні значення
+                clauses.append(f"(({time_column} IS NULL AND {id_column} > %s) OR {time_column} IS NOT NULL)")
+                chunk_params.append(last[1])
+            elif last is not None:
+                clauses.append(f"({time_column} > %s OR ({time_column} = %s AND {id_column} > %s))")
+                chunk_params.extend([last[0], last[0], last[1]])
+            chunk_sql = sql
+            if clauses:
+                chunk_sql += " WHERE " + " AND ".join(clauses)
+            chunk_sql += f" ORDER BY {time_column} ASC, {id_column} ASC LIMIT {EXPORT_CHUNK_SIZE}"
+            chunk: List[Dict] = []
+            cur = conn.cursor(dictionary=True)
+            try:
+                cur.execute(chunk_sql, tuple(chunk_params))
+                while True:
+                    rows = cur.fetchmany(EXPORT_FETCH_SIZE)
+                    if not rows:
+                        break
+                    chunk.extend(rows)
+            finally:
+                cur.close()
+            if not chunk:
+                return
+            for row in chunk:
+                yield row
+            last = (chunk[-1][time_key], chunk[-1]['id'])
+            if len(chunk) < EXPORT_CHUNK_SIZE:
+                return
+    finally:
+        conn.close()
+
+def _export_value(value):
+    # Десяткові значення лишаємо точними для звірки
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+def _encode(rows: Iterator[Dict], columns: List[str], fmt: str) -> Iterator[str]:
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(['' if row.get(c) is None else _export_value(row.get(c)) for c in columns])
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+        return
+    for row in rows:
+        yield json.dumps({c: _export_value(row.get(c)) for c in columns}, ensure_ascii=False) + '\n'
+
+def _export_response(rows: Iterator[Dict], columns: List[str], fmt: str, name: str) -> Response:
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    stamp = datetime.datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+    response = Response(_encode(rows, columns, fmt), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{name}_{stamp}.{fmt}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@exports_bp.get('/wallet-transactions')
+def export_wallet_transactions():
+    user = _export_user()
+    fmt = _export_format()
+    where: List[str] = []
+    params: List = []
+    target_user_id = _parse_int('userId') if is_admin(user) else user['id']
+    if target_user_id is not None:
+        where.append("user_id = %s")
+        params.append(target_user_id)
+    _range_filters('created_at', where, params)
+    conn = db_connection()
+    try:
+        ensure_wallet_tables(conn)
+    finally:
+        conn.close()
+    rows = _iter_rows(
+        "SELECT id, user_id, type, amount, balance_after, meta, created_at FROM wallet_transactions",
+        where, params, 'created_at', 'id', 'created_at'
+    )
+    return _export_response(rows, WALLET_COLUMNS, fmt, 'wallet_transactions')
+
+@exports_bp.get('/fills')
+def export_fills():
+    user = _export_user()
+    fmt = _export_format()
+    where: List[str] = ["o.cleared_quantity > 0"]
+    params: List = []
+    target_trader_id = _parse_int('traderId') if is_admin(user) else user['id']
+    if target_trader_id is not None:
+        where.append("o.trader_id = %s")
+        params.append(target_trader_id)
+    auction_id = _parse_int('auctionId')
+    if auction_id is not None:
+        where.append("o.auction_id = %s")
+        params.append(auction_id)
+    _range_filters('o.created_at', where, params)
+    conn = db_connection()
+    try:
+        ensure_auctions_tables(conn)
+    finally:
+        conn.close()
+    rows = _iter_rows(
+        """
+        SELECT o.id, o.auction_id, a.product, o.trader_id, o.side, o.price, o.quantity, o.status,
+               o.cleared_price, o.cleared_quantity, o.iteration, o.created_at
+        FROM auction_orders o
+        JOIN auctions a ON a.id = o.auction_id
+        """,
+        where, params, 'o.created_at', 'o.id', 'created_at'
+    )
+    return _export_response(rows, FILL_COLUMNS, fmt, 'fills')
+
+@exports_bp.get('/clearing-rounds')
+def export_clearing_rounds():
+    _export_user()
+    fmt = _export_format()
+    where: List[str] = []
+    params: List = []
+    auction_id = _parse_int('auctionId')
+    if auction_id is not None:
+        where.append("auction_id = %s")
+        params.append(auction_id)
+    _range_filters('cleared_at', where, params)
+    conn = db_connection()
+    try:
+        ensure_auction_clearing_rounds(conn)
+    finally:
+        conn.close()
+    rows = _iter_rows(
+        "SELECT id, auction_id, round_number, clearing_price, clearing_volume, clearing_demand, "
+        "clearing_supply, total_bids, total_asks, matched_orders, cleared_at FROM auction_clearing_rounds",
+        where, params, 'cleared_at', 'id', 'cleared_at'
+    )
+    return _export_response(rows, ROUND_COLUMNS, fmt, 'clearing_rounds')
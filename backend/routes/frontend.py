@@ -1,11 +1,42 @@
 import os
-from flask import Blueprint, abort, current_app, send_from_directory
+from flask import Blueprint, abort, current_app, request, send_from_directory
+from ..services.static_assets import STATIC_ASSET_CACHE, StaticAssetCache, asset_response
 
 frontend_bp = Blueprint('frontend', __name__)
 
+def _frontend_dir(app) -> str:
+    return os.path.abspath(os.path.join(app.root_path, '..', 'frontend'))
+
+@frontend_bp.record_once
+def _build_asset_cache(state):
+    # Файли фронтенду читаються та стискаються один раз при реєстрації blueprint
+    frontend_dir = _frontend_dir(state.app)
+    if STATIC_ASSET_CACHE and os.path.isdir(frontend_dir):
+        state.app.extensions['static_assets'] = StaticAssetCache(frontend_dir).build()
+
+def _serve_cached(filename: str):
+    cache = current_app.extensions.get('static_assets')
+    if cache is None:
+        return None
+    asset, immutable = cache.lookup(filename)
+    if asset is None:
+        asset, immutable = cache.lookup('index.html')
+        if asset is None:
+            abort(404)
+    return asset_response(
+        current_app.response_class,
+        asset,
+        immutable,
+        request.headers.get('Accept-Encoding'),
+        request.headers.get('If-None-Match'),
+    )
+
 @frontend_bp.route('/')
 def serve_root():
-    frontend_dir = os.path.abspath(os.path.join(current_app.root_path, '..', 'frontend'))
+    cached = _serve_cached('index.html')
+    if cached is not None:
+        return cached
+    frontend_dir = _frontend_dir(current_app)
     index_path = os.path.join(frontend_dir, 'index.html')
     if os.path.exists(index_path):
         return send_from_directory(frontend_dir, 'index.html')
@@ -13,7 +44,10 @@ def serve_root():
 
 @frontend_bp.route('/<path:filename>')
 def serve_frontend_file(filename):
-    frontend_dir = os.path.abspath(os.path.join(current_app.root_path, '..', 'frontend'))
+    cached = _serve_cached(filename)
+    if cached is not None:
+        return cached
+    frontend_dir = _frontend_dir(current_app)
     target_path = os.path.join(frontend_dir, filename)
     if os.path.exists(target_path) and os.path.isfile(target_path):
         return send_from_directory(frontend_dir, filename)
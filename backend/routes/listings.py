@@ -2,12 +2,15 @@ from decimal import Decimal
 from flask import Blueprint, jsonify, request
 from ..db import (
     db_connection,
+    replica_reads,
     ensure_auctions_tables,
     ensure_listings_table,
     ensure_users_table,
 )
 from ..errors import AppError, DBError
 from ..security import get_auth_user, require_admin
+from ..services.listing_meta import refresh_listing_auction_meta
+from ..services.listing_search import build_listing_search
 from ..utils import clean_string, is_admin, to_decimal
 
 listings_bp = Blueprint('listings', __name__, url_prefix='/api')
@@ -94,11 +97,8 @@ def _fetch_listing_with_meta(connection, listing_id: int):
             SELECT
                 l.id, l.title, l.description, l.starting_bid, l.current_bid, l.unit, l.image,
                 l.owner_id, l.status, l.base_quantity, l.created_at, l.updated_at,
-                u.username AS owner_username,
-                (SELECT COUNT(*) FROM auctions a WHERE a.listing_id = l.id) AS auction_count,
-                (SELECT a2.id FROM auctions a2 WHERE a2.listing_id = l.id ORDER BY a2.created_at DESC LIMIT 1) AS last_auction_id,
-                (SELECT a3.status FROM auctions a3 WHERE a3.listing_id = l.id ORDER BY a3.created_at DESC LIMIT 1) AS last_auction_status,
-                (SELECT a4.created_at FROM auctions a4 WHERE a4.listing_id = l.id ORDER BY a4.created_at DESC LIMIT 1) AS last_auction_created_at
+                l.auction_count, l.last_auction_id, l.last_auction_status, l.last_auction_created_at,
+                u.username AS owner_username
             FROM listings l
             LEFT JOIN users u ON u.id = l.owner_id
             WHERE l.id = %s
@@ -113,6 +113,7 @@ def _fetch_listing_with_meta(connection, listing_id: int):
         cur.close()
 
 @listings_bp.get('/listings/summary')
+@replica_reads
 def listings_summary():
     connection = db_connection()
     cursor = connection.cursor(dictionary=True)
@@ -122,10 +123,10 @@ def listings_summary():
         status_param = request.args.get('status')
         where_clauses = []
         params = []
-        if search_term:
-            where_clauses.append('(l.title LIKE %s OR l.description LIKE %s)')
-            like_term = f"%{search_term}%"
-            params.extend([like_term, like_term])
+        search = build_listing_search(search_term)
+        if search:
+            where_clauses.append(search.where_sql)
+            params.extend(search.params)
         if status_param and status_param.lower() not in ('all', '*'):
             status_filter = _normalize_status(status_param)
             where_clauses.append('l.status = %s')
@@ -153,6 +154,7 @@ def listings_summary():
         connection.close()
 
 @listings_bp.get('/listings')
+@replica_reads
 def list_listings():
     connection = db_connection()
     cursor = connection.cursor(dictionary=True)
@@ -177,10 +179,10 @@ def list_listings():
         if status_filter:
             where_clauses.append('l.status = %s')
             params.append(status_filter)
-        if search_term:
-            where_clauses.append('(l.title LIKE %s OR l.description LIKE %s)')
-            like_term = f"%{search_term}%"
-            params.extend([like_term, like_term])
+        search = build_listing_search(search_term)
+        if search:
+            where_clauses.append(search.where_sql)
+            params.extend(search.params)
         sort_map = {
             'title_asc': 'l.title ASC',
             'title_desc': 'l.title DESC',
@@ -189,6 +191,15 @@ def list_listings():
             'updated_desc': 'l.updated_at DESC',
             'status': 'l.status ASC, l.created_at DESC',
         }
+        select_params = []
+        relevance_column = ''
+        if search and search.relevance_sql:
+            relevance_column = f', {search.relevance_sql} AS relevance'
+            select_params.extend(search.relevance_params)
+            sort_map['relevance'] = 'relevance DESC, l.created_at DESC'
+            # Під час пошуку за замовчуванням сортуємо за релевантністю
+            if 'sort' not in request.args:
+                sort_param = 'relevance'
         order_clause = sort_map.get(sort_param, 'l.created_at DESC')
         limit_default = 25 if detailed else 100
         try:
@@ -215,14 +226,11 @@ def list_listings():
             SELECT
                 l.id, l.title, l.description, l.starting_bid, l.current_bid, l.unit, l.image,
                 l.owner_id, l.status, l.base_quantity, l.created_at, l.updated_at,
-                u.username AS owner_username,
-                (SELECT COUNT(*) FROM auctions a WHERE a.listing_id = l.id) AS auction_count,
-                (SELECT a2.id FROM auctions a2 WHERE a2.listing_id = l.id ORDER BY a2.created_at DESC LIMIT 1) AS last_auction_id,
-                (SELECT a3.status FROM auctions a3 WHERE a3.listing_id = l.id ORDER BY a3.created_at DESC LIMIT 1) AS last_auction_status,
-                (SELECT a4.created_at FROM auctions a4 WHERE a4.listing_id = l.id ORDER BY a4.created_at DESC LIMIT 1) AS last_auction_created_at
+                l.auction_count, l.last_auction_id, l.last_auction_status, l.last_auction_created_at,
+                u.username AS owner_username{relevance_column}
             FROM listings l
             LEFT JOIN users u ON u.id = l.owner_id
-        """
+        """.format(relevance_column=relevance_column)
 
         if where_clauses:
             sql += ' WHERE ' + ' AND '.join(where_clauses)
@@ -237,7 +245,7 @@ def list_listings():
             sql += ' LIMIT %s'
             params.append(limit_value)
 
-        cursor.execute(sql, tuple(params))
+        cursor.execute(sql, tuple(select_params + params))
         rows = cursor.fetchall()
         listings = [_row_to_listing(r) for r in rows]
 
@@ -268,6 +276,7 @@ def list_listings():
 
 
 @listings_bp.get('/listings/<int:listing_id>')
+@replica_reads
 def get_listing(listing_id: int):
     connection = db_connection()
     try:
@@ -463,15 +472,7 @@ def delete_listing(listing_id: int):
         ensure_listings_table(connection)
         ensure_users_table(connection)
         ensure_auctions_tables(connection)
-        cursor.execute(
-            """
-            SELECT l.*, (
-                SELECT COUNT(*) FROM auctions a WHERE a.listing_id = l.id
-            ) AS auction_count
-            FROM listings l WHERE l.id=%s
-            """,
-            (listing_id,),
-        )
+        cursor.execute("SELECT * FROM listings WHERE id=%s", (listing_id,))
         listing = cursor.fetchone()
         if not listing:
             raise AppError("Listing not found", statuscode=404)
@@ -545,6 +546,7 @@ def create_listing_auction(listing_id: int):
             ),
         )
         auction_id = cursor.lastrowid
+        refresh_listing_auction_meta(cursor, listing_id)
 
         publish_listing = data.get('publishListing', True)
         if publish_listing and listing.get('status') != 'published':
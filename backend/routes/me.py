@@ -2,16 +2,20 @@ import os
 from flask import Blueprint, current_app, jsonify, request, send_from_directory
 from ..db import (
     db_connection,
+    replica_reads,
     ensure_auctions_tables,
     ensure_trader_inventory,
     ensure_auction_clearing_rounds,
     ensure_resource_transactions,
+    ensure_trade_documents,
     ensure_user_profiles,
     ensure_users_table,
 )
 from ..errors import AppError
+from ..pagination import KeysetPage
 from ..security import get_auth_user
-from ..utils import clean_string, is_admin, serialize
+from ..services.documents import count_trader_documents, list_trader_documents
+from ..utils import clean_string, is_admin
 me_bp = Blueprint('me', __name__, url_prefix='/api/me')
 
 @me_bp.route('/profile', methods=['GET', 'PUT'])
@@ -83,6 +87,7 @@ def me_profile():
         conn.close()
 
 @me_bp.get('/auctions')
+@replica_reads
 def me_auctions():
     conn = db_connection()
     cur = conn.cursor(dictionary=True)
@@ -136,12 +141,13 @@ def me_auctions():
             (user['id'], user['id'], user['id'], user['id'])
         )
         rows = cur.fetchall()
-        return jsonify(serialize(rows))
+        return jsonify(rows)
     finally:
         cur.close()
         conn.close()
 
 @me_bp.get('/auction-orders')
+@replica_reads
 def me_auction_orders():
     conn = db_connection()
     cur = conn.cursor(dictionary=True)
@@ -151,24 +157,26 @@ def me_auction_orders():
         if not user:
             raise AppError("Unauthorized", statuscode=401)
         ensure_auctions_tables(conn)
-        cur.execute(
-            """
+        page = KeysetPage('o.created_at', 'o.id')
+        where_sql, where_params = page.where()
+        sql = """
             SELECT o.id, o.auction_id, o.side, o.price, o.quantity, o.status,
                    o.cleared_price, o.cleared_quantity, o.created_at,
                    a.product, a.status AS auction_status, a.type AS auction_type, a.k_value
             FROM auction_orders o
             JOIN auctions a ON a.id = o.auction_id
             WHERE o.trader_id = %s
-            ORDER BY o.created_at DESC
-            """,
-            (user['id'],)
-        )
-        return jsonify(serialize(cur.fetchall()))
+        """
+        if where_sql:
+            sql += f" AND {where_sql}"
+        cur.execute(sql + page.order_limit(), (user['id'], *where_params))
+        return page.response(cur.fetchall(), 'created_at')
     finally:
         cur.close()
         conn.close()
 
 @me_bp.get('/inventory')
+@replica_reads
 def me_inventory():
     conn = db_connection()
     cur = conn.cursor(dictionary=True)
@@ -182,13 +190,14 @@ def me_inventory():
             "SELECT product, quantity, updated_at FROM trader_inventory WHERE trader_id=%s ORDER BY updated_at DESC",
             (user['id'],)
         )
-        return jsonify(serialize(cur.fetchall()))
+        return jsonify(cur.fetchall())
     finally:
         cur.close()
         conn.close()
 
 
 @me_bp.get('/clearing-insights')
+@replica_reads
 def me_clearing_insights():
     conn = db_connection()
     cur = conn.cursor(dictionary=True)
@@ -212,7 +221,7 @@ def me_clearing_insights():
             """,
             (user['id'],)
         )
-        positions = serialize(cur.fetchall())
+        positions = cur.fetchall()
 
         # Останній кліринговий раунд, в якому був користувач
         cur.execute(
@@ -253,7 +262,7 @@ def me_clearing_insights():
             """,
             (user['id'],)
         )
-        recent_fills = serialize(cur.fetchall())
+        recent_fills = cur.fetchall()
 
         # Зміни інвентарю після клірингу
         cur.execute(
@@ -266,7 +275,7 @@ def me_clearing_insights():
             """,
             (user['id'],)
         )
-        inventory_events = serialize(cur.fetchall())
+        inventory_events = cur.fetchall()
 
         total_qty = sum(
             (float(p['quantity']) if p.get('quantity') is not None else 0)
@@ -280,7 +289,7 @@ def me_clearing_insights():
 
         return jsonify({
             "summary": summary,
-            "lastRound": serialize(last_round) if last_round else None,
+            "lastRound": last_round,
             "recentFills": recent_fills,
             "inventoryEvents": inventory_events,
             "positions": positions,
@@ -294,30 +303,44 @@ def me_documents():
     conn = db_connection()
     try:
         ensure_users_table(conn)
+        ensure_trade_documents(conn)
         user = get_auth_user(conn)
         if not user:
             raise AppError("Unauthorized", statuscode=401)
+        limit_param = request.args.get('limit')
+        page_param = request.args.get('page')
+        offset_param = request.args.get('offset')
+        paginated = limit_param is not None or page_param is not None or offset_param is not None
+        if not paginated:
+            rows = list_trader_documents(conn, user['id'])
+            return jsonify([_document_entry(row) for row in rows])
+        try:
+            limit_value = max(1, min(int(limit_param) if limit_param is not None else 50, 200))
+            if offset_param is not None:
+                offset_value = max(0, int(offset_param))
+            elif page_param is not None:
+                offset_value = (max(1, int(page_param)) - 1) * limit_value
+            else:
+                offset_value = 0
+        except ValueError:
+            raise AppError("Invalid pagination parameters", statuscode=400)
+        rows = list_trader_documents(conn, user['id'], limit=limit_value, offset=offset_value)
+        return jsonify({
+            "items": [_document_entry(row) for row in rows],
+            "total": count_trader_documents(conn, user['id']),
+            "limit": limit_value,
+            "offset": offset_value,
+        })
     finally:
         conn.close()
-    base_root = current_app.config['GENERATED_DOCS_ROOT']
-    out = []
-    if not os.path.isdir(base_root):
-        return jsonify(out)
-    uid = user['id']
-    for name in os.listdir(base_root):
-        if not name.startswith('auction_'):
-            continue
-        try:
-            aid = int(name.split('_', 1)[1])
-        except Exception:
-            continue
-        folder = os.path.join(base_root, name)
-        if not os.path.isdir(folder):
-            continue
-        for file_name in os.listdir(folder):
-            if f"trader_{uid}_" in file_name:
-                out.append({"auction_id": aid, "filename": file_name})
-    return jsonify(sorted(out, key=lambda x: (x['auction_id'], x['filename'])))
+
+def _document_entry(row):
+    return {
+        "auction_id": row['auction_id'],
+        "filename": row['filename'],
+        "role": row.get('role'),
+        "created_at": row['created_at'].isoformat() if row.get('created_at') else None,
+    }
 
 @me_bp.get('/documents/<int:auction_id>/<path:filename>')
 def me_document_download(auction_id: int, filename: str):
@@ -0,0 +1,20 @@
+import hmac
+import os
+from flask import Blueprint, Response, request
+from ..errors import AppError
+from ..metrics import EXPOSITION_CONTENT_TYPE, render_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+# Якщо задано, /metrics вимагає заголовок Authorization: Bearer <METRICS_TOKEN>
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+@metrics_bp.get('/metrics')
+def metrics():
+    """МЕТРИКИ ВСІХ ВОРКЕРІВ У ТЕКСТОВОМУ ФОРМАТІ PROMETHEUS"""
+    if METRICS_TOKEN:
+        auth = request.headers.get('Authorization', '')
+        token = auth.split(' ', 1)[1].strip() if auth.startswith('Bearer ') else ''
+        if not hmac.compare_digest(token, METRICS_TOKEN):
+            raise AppError("Unauthorized", statuscode=401)
+    return Response(render_metrics(), mimetype=None, content_type=EXPOSITION_CONTENT_TYPE)
@@ -1,12 +1,17 @@
 from flask import Blueprint, jsonify, request
-from ..db import db_connection, ensure_orders_table, try_add_owner_columns, ensure_users_table
+from ..db import db_connection, ensure_orders_table, replica_reads, try_add_owner_columns, ensure_users_table
 from ..errors import AppError, DBError, OrderDataError
+from ..pagination import KeysetPage
 from ..security import get_auth_user, require_admin
-from ..utils import serialize
+from ..services.matching_engine import engine_depth, wake_matching_engine
 
 orders_bp = Blueprint('orders', __name__, url_prefix='/api')
 
+DEFAULT_DEPTH_LEVELS = 10
+MAX_DEPTH_LEVELS = 100
+
 @orders_bp.get('/orders')
+@replica_reads
 def get_orders():
     connection = db_connection()
     cursor = connection.cursor(dictionary=True)
@@ -27,6 +32,63 @@ def get_orders():
         cursor.close()
         connection.close()
 
+def _db_levels(cursor, order_type: str, depth: int):
+    # Окремо для кожного відкритого статусу: (type, status) - префікс покривного індексу
+    # idx_orders_book, тож GROUP BY/ORDER BY cost іде індексом без читання рядків і
+    # зупиняється після depth рівнів, скільки б filled/canceled заявок не було в історії
+    direction = 'DESC' if order_type == 'buy' else 'ASC'
+    levels = {}
+    for status in ('open', 'partial'):
+        cursor.execute(
+            "SELECT cost, SUM(remaining_amount) AS quantity, COUNT(*) AS orders FROM orders "
+            "WHERE type=%s AND status=%s "
+            f"GROUP BY cost ORDER BY cost {direction} LIMIT %s",
+            (order_type, status, depth)
+        )
+        for row in cursor.fetchall():
+            level = levels.setdefault(row['cost'], {"price": row['cost'], "quantity": 0, "orders": 0})
+            level["quantity"] += row['quantity']
+            level["orders"] += int(row['orders'])
+    prices = sorted(levels, reverse=order_type == 'buy')[:depth]
+    return [levels[price] for price in prices]
+
+def _book_levels(depth: int):
+    """Рівні книги: з matching engine, якщо цей процес лідер, інакше агрегатом з БД"""
+    book = engine_depth(depth)
+    if book is not None:
+        return book, 'engine'
+    connection = db_connection()
+    cursor = connection.cursor(dictionary=True)
+    try:
+        ensure_orders_table(connection)
+        return {"bids": _db_levels(cursor, 'buy', depth), "asks": _db_levels(cursor, 'sell', depth)}, 'db'
+    except Exception as exception:
+        raise DBError("Error fetching order book", details=str(exception))
+    finally:
+        cursor.close()
+        connection.close()
+
+@orders_bp.get('/orders/top')
+@replica_reads
+def get_orders_top():
+    book, source = _book_levels(1)
+    best_bid = book['bids'][0] if book['bids'] else None
+    best_ask = book['asks'][0] if book['asks'] else None
+    spread = best_ask['price'] - best_bid['price'] if best_bid and best_ask else None
+    return jsonify({"bestBid": best_bid, "bestAsk": best_ask, "spread": spread, "source": source}), 200
+
+@orders_bp.get('/orders/depth')
+@replica_reads
+def get_orders_depth():
+    levels_param = request.args.get('levels')
+    try:
+        depth = int(levels_param) if levels_param is not None else DEFAULT_DEPTH_LEVELS
+    except ValueError:
+        raise AppError("Invalid levels parameter", statuscode=400)
+    depth = max(1, min(depth, MAX_DEPTH_LEVELS))
+    book, source = _book_levels(depth)
+    return jsonify({"levels": depth, "bids": book['bids'], "asks": book['asks'], "source": source}), 200
+
 @orders_bp.post('/orders')
 def create_order():
     conn_auth = db_connection()
@@ -60,6 +122,8 @@ def create_order():
         )
         connection.commit()
         new_id = cursor.lastrowid
+        # Зіставлення асинхронне: лідер engine підхопить заявку з таблиці
+        wake_matching_engine()
         return jsonify({"message": "Order created successfully", "id": new_id}), 201
     except Exception as exception:
         try:
@@ -78,8 +142,13 @@ def admin_orders():
     cur = conn.cursor(dictionary=True)
     try:
         ensure_orders_table(conn)
-        cur.execute("SELECT * FROM orders ORDER BY created_at DESC")
-        return jsonify(serialize(cur.fetchall()))
+        page = KeysetPage('created_at', 'id')
+        where_sql, where_params = page.where()
+        sql = "SELECT * FROM orders"
+        if where_sql:
+            sql += f" WHERE {where_sql}"
+        cur.execute(sql + page.order_limit(), tuple(where_params))
+        return page.response(cur.fetchall(), 'created_at')
     finally:
         cur.close()
         conn.close()
\ No newline at end of file
@@ -10,8 +10,9 @@ from ..db import (
     ensure_users_table,
 )
 from ..errors import AppError
+from ..pagination import KeysetPage
 from ..security import get_auth_user
-from ..utils import clean_string, is_admin, is_trader, serialize
+from ..utils import clean_string, is_admin, is_trader
 
 resources_bp = Blueprint('resources', __name__, url_prefix='/api/resources')
 
@@ -81,6 +82,16 @@ def download_resource_document(doc_id: int):
         cur.close()
         conn.close()
 
+def _document_entry(row):
+    return {
+        "id": row['id'],
+        "traderId": row['trader_id'],
+        "filename": row['filename'],
+        "uploadedAt": row['uploaded_at'].isoformat() if row['uploaded_at'] else None,
+        "notes": row['notes'],
+        "downloadUrl": f"/api/resources/documents/{row['id']}/download"
+    }
+
 @resources_bp.get('/documents')
 def list_resource_documents():
     conn = db_connection()
@@ -102,27 +113,17 @@ def list_resource_documents():
                     raise AppError("Invalid traderId", statuscode=400)
             else:
                 target_trader_id = None
-        if target_trader_id is None:
-            cur.execute(
-                "SELECT id, trader_id, filename, uploaded_at, notes FROM resource_documents ORDER BY uploaded_at DESC"
-            )
-        else:
-            cur.execute(
-                "SELECT id, trader_id, filename, uploaded_at, notes FROM resource_documents WHERE trader_id=%s ORDER BY uploaded_at DESC",
-                (target_trader_id,)
-            )
-        rows = cur.fetchall()
-        documents = []
-        for row in rows:
-            documents.append({
-                "id": row['id'],
-                "traderId": row['trader_id'],
-                "filename": row['filename'],
-                "uploadedAt": row['uploaded_at'].isoformat() if row['uploaded_at'] else None,
-                "notes": row['notes'],
-                "downloadUrl": f"/api/resources/documents/{row['id']}/download"
-            })
-        return jsonify(documents)
+        page = KeysetPage('uploaded_at', 'id')
+        where_sql, params = page.where()
+        where = [where_sql] if where_sql else []
+        if target_trader_id is not None:
+            where.insert(0, "trader_id=%s")
+            params.insert(0, target_trader_id)
+        sql = "SELECT id, trader_id, filename, uploaded_at, notes FROM resource_documents"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        cur.execute(sql + page.order_limit(), tuple(params))
+        return page.response(cur.fetchall(), 'uploaded_at', transform=_document_entry)
     finally:
         cur.close()
         conn.close()
@@ -137,11 +138,13 @@ def list_resource_transactions():
         if not user or not is_trader(user):
             raise AppError("Unauthorized", statuscode=401)
         ensure_resource_transactions(conn)
-        cur.execute(
-            "SELECT id, type, quantity, occurred_at, notes FROM resource_transactions WHERE trader_id=%s ORDER BY occurred_at DESC",
-            (user['id'],)
-        )
-        return jsonify(serialize(cur.fetchall()))
+        page = KeysetPage('occurred_at', 'id')
+        where_sql, where_params = page.where()
+        sql = "SELECT id, type, quantity, occurred_at, notes FROM resource_transactions WHERE trader_id=%s"
+        if where_sql:
+            sql += f" AND {where_sql}"
+        cur.execute(sql + page.order_limit(), (user['id'], *where_params))
+        return page.response(cur.fetchall(), 'occurred_at')
     finally:
         cur.close()
         conn.close()
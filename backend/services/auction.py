@@ -54,6 +54,27 @@ def to_decimal(n) -> Decimal:
 DECIMAL_QUANT = Decimal('0.000001')
 
 
+def bid_reserve(price, quantity) -> Decimal:
+    """Резерв bid-заявки під відкриту кількість: price * quantity"""
+    return (to_decimal(price) * to_decimal(quantity)).quantize(DECIMAL_QUANT)
+
+
+def open_bid_reserve(order: Dict) -> Decimal:
+    """
+    Скільки ще зарезервовано під відкриту bid-заявку.
+
+    Кліринг при частковому виконанні зменшує quantity та reserved_amount, але у
+    старих рядках reserved_amount лишався повним початковим резервом. Тому
+    береться не більше за price * quantity, інакше звільнення резерву
+    зачепило б кошти інших заявок трейдера.
+    """
+    reserve = bid_reserve(order['price'], order['quantity'])
+    stored = order.get('reserved_amount')
+    if stored is None:
+        return reserve
+    return min(to_decimal(stored), reserve)
+
+
 def compute_call_market_clearing(orders: List[Dict]) -> Dict[str, Any]:
     """
     АЛГОРИТМ КЛАСИЧНОГО CALL MARKET CLEARING
@@ -748,4 +769,4 @@ def compute_k_double_clearing(orders: List[Dict], k: Decimal) -> Dict[str, Any]:
 
 
 # Експортуємо функції для використання в інших модулях
-__all__ = ['compute_call_market_clearing', 'compute_k_double_clearing', 'to_decimal']
+__all__ = ['compute_call_market_clearing', 'compute_k_double_clearing', 'to_decimal', 'bid_reserve', 'open_bid_reserve']
@@ -5,6 +5,7 @@
 """
 
 import json
+import logging
 import threading
 import time
 from datetime import datetime, timedelta
@@ -12,13 +13,56 @@ from decimal import Decimal
 from typing import Dict, List, Optional
 
 # Імпортуємо необхідні модулі з нашого проекту
-from backend.db import db_connection
-from backend.services.auction import compute_k_double_clearing, to_decimal
-from backend.services.wallet import wallet_release, wallet_spend
+from backend.db import db_connection, ensure_document_jobs
+from backend.metrics import counter, gauge, histogram
+from backend.profiling import profile_block
+from backend.query_stats import collect_queries, current_query_stats
+from backend.structured_logging import correlation, get_logger
+from backend.services.auction import bid_reserve, compute_k_double_clearing, to_decimal
+from backend.services.document_queue import enqueue_trade_documents, wake_document_workers
+from backend.services.listing_meta import refresh_auction_listing_meta
+from backend.services.order_expiry import expire_orders_for_round
+from backend.services.wallet import WALLET_OPERATIONS, wallet_release, wallet_spend
+
+logger = get_logger(__name__)
 
 # Константа: інтервал клірингу в секундах (5 хвилин = 300 секунд)
 CLEARING_INTERVAL_SECONDS = 300
 
+# Метрики планувальника (/metrics)
+_ROUND_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+CLEARING_PASS_SECONDS = histogram(
+    'clearing_pass_duration_seconds', 'Duration of one scheduler pass over all auctions', buckets=_ROUND_BUCKETS,
+)
+CLEARING_LAST_PASS_SECONDS = gauge(
+    'clearing_last_pass_duration_seconds', 'Duration of the most recent scheduler pass', mode='last',
+)
+CLEARING_LAST_PASS_TIMESTAMP = gauge(
+    'clearing_last_pass_timestamp_seconds', 'Unix time the most recent scheduler pass finished', mode='max',
+)
+CLEARING_DUE_AUCTIONS = gauge(
+    'clearing_due_auctions', 'Auctions due for clearing in the most recent pass', mode='last',
+)
+CLEARING_LAG_SECONDS = histogram(
+    'clearing_lag_seconds', 'Delay between next_clearing_at and the actual clearing run', buckets=_ROUND_BUCKETS,
+)
+CLEARING_MAX_LAG_SECONDS = gauge(
+    'clearing_max_lag_seconds', 'Largest clearing delay in the most recent pass', mode='last',
+)
+CLEARING_ROUND_SECONDS = histogram(
+    'clearing_round_duration_seconds', 'Duration of one auction clearing round', buckets=_ROUND_BUCKETS,
+)
+CLEARING_SETTLEMENT_SECONDS = histogram(
+    'clearing_settlement_duration_seconds', 'Time spent settling allocations of one round', buckets=_ROUND_BUCKETS,
+)
+CLEARING_ROUND_ORDERS = histogram(
+    'clearing_round_orders', 'Open orders considered in one clearing round',
+    buckets=(0, 10, 100, 1000, 10000, 100000, 1000000),
+)
+CLEARING_ORDERS = counter('clearing_orders_total', 'Orders considered by clearing rounds')
+CLEARING_MATCHED_ORDERS = counter('clearing_matched_orders_total', 'Orders filled by clearing rounds')
+CLEARING_ROUNDS = counter('clearing_rounds_total', 'Clearing rounds by outcome', ('result',))
+
 # Глобальна змінна для зберігання потоку планувальника
 _scheduler_thread: Optional[threading.Thread] = None
 # Прапорець для зупинки планувальника
@@ -41,7 +85,7 @@ def start_clearing_scheduler():
     
     # Перевіряємо, чи планувальник вже запущено
     if _scheduler_running:
-        print("[CLEARING SCHEDULER] Планувальник вже запущено")
+        logger.info("Планувальник клірингу вже запущено")
         return
     
     # Встановлюємо прапорець роботи
@@ -51,7 +95,7 @@ def start_clearing_scheduler():
     # daemon=True означає, що потік завершиться при завершенні основної програми
     _scheduler_thread = threading.Thread(target=_clearing_loop, daemon=True)
     _scheduler_thread.start()
-    print(f"[CLEARING SCHEDULER] Запущено. Інтервал: {CLEARING_INTERVAL_SECONDS} секунд")
+    logger.info("Планувальник клірингу запущено", extra={"intervalSeconds": CLEARING_INTERVAL_SECONDS})
 
 
 def stop_clearing_scheduler():
@@ -69,7 +113,7 @@ def stop_clearing_scheduler():
     if _scheduler_thread and _scheduler_thread.is_alive():
         _scheduler_thread.join(timeout=10)
     
-    print("[CLEARING SCHEDULER] Зупинено")
+    logger.info("Планувальник клірингу зупинено")
 
 
 def _clearing_loop():
@@ -89,14 +133,24 @@ def _clearing_loop():
             # Отримуємо поточний час як UTC (naive datetime)
             # Використовуємо utcnow() для консистентності з aucmodel.py
             now = datetime.utcnow()
-            print(f"[CLEARING SCHEDULER] Перевірка аукціонів о {now.isoformat()}")
             
-            # Виконуємо клірінг для всіх потрібних аукціонів
-            _process_auctions_for_clearing(now)
+            # Виконуємо клірінг для всіх потрібних аукціонів; усі записи
+            # проходу мають спільний correlationId
+            started = time.perf_counter()
+            try:
+                with correlation(prefix='clr-'), \
+                        collect_queries(f"clearing round {now.isoformat()}", scope='clearing', log_always=True):
+                    logger.debug("Перевірка аукціонів", extra={"now": now.isoformat()})
+                    _process_auctions_for_clearing(now)
+            finally:
+                elapsed = time.perf_counter() - started
+                CLEARING_PASS_SECONDS.observe(elapsed)
+                CLEARING_LAST_PASS_SECONDS.set(elapsed)
+                CLEARING_LAST_PASS_TIMESTAMP.set(time.time())
             
         except Exception as e:
             # Логуємо помилки, але продовжуємо роботу планувальника
-            print(f"[CLEARING SCHEDULER ERROR] {str(e)}")
+            logger.exception("Помилка проходу планувальника клірингу: %s", e)
         
         # Чекаємо до наступної ітерації (5 хвилин)
         # Перевіряємо прапорець кожну секунду для швидкої зупинки
@@ -124,6 +178,9 @@ def _process_auctions_for_clearing(current_time: datetime):
     cursor = conn.cursor(dictionary=True)
     
     try:
+        # DDL виконуємо до клірингу: CREATE TABLE неявно фіксує транзакцію
+        ensure_document_jobs(conn)
+        
         # КРОК 1: Автоматично закриваємо аукціони, у яких закінчилось вікно торгів
         cursor.execute(
             """
@@ -138,20 +195,20 @@ def _process_auctions_for_clearing(current_time: datetime):
         auctions_to_close = cursor.fetchall()
         
         if auctions_to_close:
-            print(f"[CLOSING SCHEDULER] Знайдено {len(auctions_to_close)} аукціонів для закриття")
+            logger.info("Знайдено аукціонів для закриття: %d", len(auctions_to_close))
             for auction in auctions_to_close:
                 try:
                     _close_auction_automatically(conn, auction['id'], current_time)
-                    print(f"[CLOSING] Аукціон #{auction['id']} ({auction['product']}) автоматично закрито")
+                    logger.info("Аукціон автоматично закрито", extra={"auctionId": auction['id'], "product": auction['product']})
                 except Exception as e:
-                    print(f"[CLOSING ERROR] Аукціон #{auction['id']}: {str(e)}")
+                    logger.exception("Помилка автоматичного закриття: %s", e, extra={"auctionId": auction['id']})
                     conn.rollback()
         
         # КРОК 2: Вибираємо всі активні аукціони, для яких потрібен клірінг
         # Умова: status='collecting' та (next_clearing_at <= now або next_clearing_at IS NULL)
         cursor.execute(
             """
-            SELECT id, product, k_value, current_round, last_clearing_at, next_clearing_at
+            SELECT id, product, k_value, current_round, last_clearing_at, next_clearing_at, profile_rounds
             FROM auctions
             WHERE status = 'collecting'
               AND (next_clearing_at IS NULL OR next_clearing_at <= %s)
@@ -161,21 +218,27 @@ def _process_auctions_for_clearing(current_time: datetime):
         
         # Отримуємо список аукціонів для обробки
         auctions_to_clear = cursor.fetchall()
+        CLEARING_DUE_AUCTIONS.set(len(auctions_to_clear))
+        max_lag = 0.0
         
         if auctions_to_clear:
-            print(f"[CLEARING SCHEDULER] Знайдено {len(auctions_to_clear)} аукціонів для клірингу")
-            for auction in auctions_to_clear:
-                print(f"  - Аукціон #{auction['id']} ({auction['product']}): next_clearing_at={auction['next_clearing_at']}")
-        else:
-            # Check how many auctions are collecting
+            logger.info(
+                "Знайдено аукціонів для клірингу: %d", len(auctions_to_clear),
+                extra={"auctionIds": [auction['id'] for auction in auctions_to_clear]},
+            )
+        elif logger.isEnabledFor(logging.DEBUG):
+            # Повний перелік collecting-аукціонів - окремий запит, тож лише на DEBUG
             cursor.execute("SELECT id, product, status, next_clearing_at FROM auctions WHERE status='collecting'")
             collecting = cursor.fetchall()
-            if collecting:
-                print(f"[CLEARING SCHEDULER] Є {len(collecting)} аукціонів у стані collecting, але жодний не потребує клірингу:")
-                for a in collecting:
-                    print(f"  - Аукціон #{a['id']} ({a['product']}): next_clearing_at={a['next_clearing_at']} (current_time={current_time})")
-            else:
-                print(f"[CLEARING SCHEDULER] Немає аукціонів у стані collecting")
+            logger.debug(
+                "Жоден аукціон не потребує клірингу",
+                extra={"collecting": [
+                    {"auctionId": a['id'], "product": a['product'], "nextClearingAt": a['next_clearing_at']}
+                    for a in collecting
+                ]},
+            )
+        else:
+            logger.info("Жоден аукціон не потребує клірингу", extra={"sample": "clearing.idle"})
         
         # Обробляємо кожен аукціон окремо
         for auction in auctions_to_clear:
@@ -191,15 +254,31 @@ def _process_auctions_for_clearing(current_time: datetime):
                             (min_next, auction['id'])
                         )
                         conn.commit()
-                        print(f"[CLEARING SKIP] Auction #{auction['id']} throttled; next at {min_next.isoformat()}")
+                        logger.info(
+                            "Клірінг відкладено: замалий інтервал",
+                            extra={"auctionId": auction['id'], "nextClearingAt": min_next.isoformat()},
+                        )
                         continue
 
-                # Виконуємо клірінг для одного аукціону
-                _execute_clearing_for_auction(conn, auction, current_time)
+                # Затримка між запланованим і фактичним запуском раунду
+                if auction.get('next_clearing_at'):
+                    lag = max((datetime.utcnow() - auction['next_clearing_at']).total_seconds(), 0.0)
+                    CLEARING_LAG_SECONDS.observe(lag)
+                    max_lag = max(max_lag, lag)
+
+                # Виконуємо клірінг для одного аукціону; якщо адміністратор
+                # замовив профілювання - під cProfile
+                if int(auction.get('profile_rounds') or 0) > 0:
+                    _execute_profiled_clearing(conn, auction, current_time)
+                else:
+                    _execute_clearing_for_auction(conn, auction, current_time)
+                CLEARING_ROUNDS.inc(result='ok')
             except Exception as e:
                 # Логуємо помилку, але продовжуємо обробку інших аукціонів
-                print(f"[CLEARING ERROR] Аукціон #{auction['id']}: {str(e)}")
+                logger.exception("Помилка клірингу: %s", e, extra={"auctionId": auction['id']})
+                CLEARING_ROUNDS.inc(result='error')
                 conn.rollback()
+        CLEARING_MAX_LAG_SECONDS.set(max_lag)
         
     finally:
         # Закриваємо курсор та з'єднання
@@ -207,6 +286,31 @@ def _process_auctions_for_clearing(current_time: datetime):
         conn.close()
 
 
+def _execute_profiled_clearing(conn, auction: Dict, current_time: datetime):
+    """
+    КЛІРИНГ ПІД ПРОФАЙЛЕРОМ
+
+    Профіль раунду зберігається в буфері профілів (GET /api/admin/profiles),
+    лічильник замовлених раундів зменшується навіть якщо раунд впав.
+    """
+    auction_id = auction['id']
+    new_round = int(auction.get('current_round', 0)) + 1
+    try:
+        with profile_block('clr', f"auction {auction_id} round {new_round}",
+                           {"auctionId": auction_id, "round": new_round}):
+            _execute_clearing_for_auction(conn, auction, current_time)
+    finally:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "UPDATE auctions SET profile_rounds = profile_rounds - 1 WHERE id = %s AND profile_rounds > 0",
+                (auction_id,)
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+
+
 def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
     """
     ВИКОНАННЯ КЛІРИНГУ ДЛЯ ОДНОГО АУКЦІОНУ
@@ -235,11 +339,21 @@ def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
     current_round = int(auction.get('current_round', 0))
     new_round = current_round + 1
     
-    print(f"[CLEARING] Аукціон #{auction_id} ({product_name}), раунд #{new_round}")
+    log_ctx = {"auctionId": auction_id, "round": new_round}
+    logger.debug("Початок раунду клірингу", extra={**log_ctx, "product": product_name})
     
     cursor = conn.cursor(dictionary=True)
+    round_started = time.perf_counter()
+    timer = _RoundTimer()
     
     try:
+        # Прострочені заявки (за часом або кількістю раундів) знімаємо до вибірки,
+        # щоб вони не потрапляли в розрахунок клірингу
+        expired = expire_orders_for_round(conn, auction_id, new_round)
+        if expired:
+            logger.info("Знято прострочених заявок: %d", expired, extra=log_ctx)
+        timer.lap('expire')
+
         # КРОК 1: ОТРИМАННЯ ЗАЯВОК ДЛЯ КЛІРИНГУ
         # Вибираємо тільки затверджені адміністратором заявки зі статусом 'open'
         # Отримуємо всі відкриті заявки
@@ -259,7 +373,9 @@ def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
         # Отримуємо всі заявки
         orders = cursor.fetchall()
         
-        print(f"[CLEARING] Знайдено {len(orders)} затверджених заявок")
+        logger.debug("Заявок для клірингу: %d", len(orders), extra=log_ctx)
+        CLEARING_ROUND_ORDERS.observe(len(orders))
+        CLEARING_ORDERS.inc(len(orders))
 
         # Якщо немає перетину цінами (best bid < best ask), легке підштовхування для ботів
         bids_prices = [to_decimal(o['price']) for o in orders if o['side'] == 'bid']
@@ -271,12 +387,16 @@ def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
                 # Опускаємо найнижчий ask до ціни best bid, щоб мати хоча б мінімальний перетин
                 lowest_ask_idx = next((idx for idx, o in enumerate(orders) if o['side'] == 'ask' and to_decimal(o['price']) == best_ask), None)
                 if lowest_ask_idx is not None:
-                    print(f"[CLEARING] Немає перетину: best_bid={best_bid}, best_ask={best_ask}. Опускаємо ask до {best_bid}.")
+                    logger.info(
+                        "Немає перетину, опускаємо найнижчий ask до best bid",
+                        extra={**log_ctx, "bestBid": best_bid, "bestAsk": best_ask},
+                    )
                     orders[lowest_ask_idx]['price'] = best_bid
+        timer.lap('load_orders')
         
         # Якщо немає заявок для клірингу, плануємо наступний раунд
         if not orders:
-            print(f"[CLEARING] Аукціон #{auction_id}: немає заявок, пропускаємо раунд")
+            logger.debug("Немає заявок, раунд пропущено", extra=log_ctx)
             _schedule_next_clearing(cursor, auction_id, new_round, current_time)
             conn.commit()
             return
@@ -297,8 +417,9 @@ def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
         clearing_demand = clearing_result.get('demand')  # Сумарний попит
         clearing_supply = clearing_result.get('supply')  # Сумарна пропозиція
         allocations = clearing_result.get('allocations', [])  # Список виконаних заявок
+        timer.lap('compute')
         
-        print(f"[CLEARING] Результат: ціна={clearing_price}, обсяг={clearing_volume}")
+        logger.debug("Результат алгоритму", extra={**log_ctx, "price": clearing_price, "volume": clearing_volume})
         
         # КРОК 3: ОНОВЛЕННЯ НОМЕРУ РАУНДУ В АУКЦІОНІ
         cursor.execute(
@@ -338,7 +459,11 @@ def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
             )
         )
         
+        timer.lap('record')
+
         # КРОК 5: ОБРОБКА ВИКОНАНИХ ЗАЯВОК
+        settlement_started = time.perf_counter()
+        skipped_orders = set()
         # Для кожної виконаної заявки:
         # - Оновлюємо статус на 'cleared'
         # - Зберігаємо фактичну ціну та кількість виконання
@@ -366,7 +491,7 @@ def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
                         cleared_price = %s,
                         cleared_quantity = %s,
                         iteration = %s
-                    WHERE id = %s
+                    WHERE id = %s AND status = 'open'
                     """,
                     (str(clearing_price), str(cleared_qty), new_round, order_id)
                 )
@@ -374,6 +499,8 @@ def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
                 remaining = order_qty - cleared_qty
                 if remaining < Decimal('0'):
                     remaining = Decimal('0')
+                # Резерв bid-заявки зменшується до залишку: reserved_amount завжди = price * quantity
+                remaining_reserve = bid_reserve(order_data['price'], remaining) if side == 'bid' else None
                 cursor.execute(
                     """
                     UPDATE auction_orders
@@ -381,11 +508,24 @@ def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
                         status = 'open',
                         cleared_price = %s,
                         cleared_quantity = COALESCE(cleared_quantity, 0) + %s,
-                        iteration = %s
-                    WHERE id = %s
+                        iteration = %s,
+                        reserved_amount = COALESCE(%s, reserved_amount)
+                    WHERE id = %s AND status = 'open'
                     """,
-                    (str(remaining), str(clearing_price), str(cleared_qty), new_round, order_id)
+                    (
+                        str(remaining), str(clearing_price), str(cleared_qty), new_round,
+                        str(remaining_reserve) if remaining_reserve is not None else None, order_id,
+                    )
+                )
+            if cursor.rowcount == 0:
+                # Заявку зняли (скасування/термін дії) вже після вибірки раунду: її резерв
+                # повернуто, тож ні списань, ні інвентарю, ні документів для неї
+                skipped_orders.add(order_id)
+                logger.warning(
+                    "Заявку знято під час клірингу, виконання пропущено",
+                    extra={**log_ctx, "orderId": order_id},
                 )
+                continue
             
             # ФІНАНСОВІ ОПЕРАЦІЇ:
             # Для BID (покупець):
@@ -414,7 +554,8 @@ def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
                 )
                 
                 # Якщо трейдер заявив вищу ціну, повертаємо різницю
-                original_reserve = bid_price * cleared_qty
+                # (та сама частина резерву, на яку зменшено reserved_amount)
+                original_reserve = bid_reserve(bid_price, cleared_qty)
                 if original_reserve > cost:
                     refund = original_reserve - cost
                     wallet_release(
@@ -478,6 +619,10 @@ def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
                     """,
                     (trader_id, str(revenue), str(revenue))
                 )
+                WALLET_OPERATIONS.inc(op='clearing_deposit', result='ok')
+        if skipped_orders:
+            allocations = [alloc for alloc in allocations if alloc['order_id'] not in skipped_orders]
+        timer.lap('settle')
         
         # КРОК 6: ОНОВЛЕННЯ ІНВЕНТАРЮ УЧАСНИКІВ
         # Після виконання торгів потрібно оновити кількість товару:
@@ -491,32 +636,159 @@ def _execute_clearing_for_auction(conn, auction: Dict, current_time: datetime):
             orders=orders,
             round_number=new_round
         )
+        timer.lap('inventory')
         
         # КРОК 7: СТВОРЕННЯ SNAPSHOT ІНВЕНТАРИЗАЦІЇ
         # Зберігаємо повний стан інвентарю всіх учасників після клірингу
         _create_inventory_snapshot(conn, auction_id, new_round)
+        timer.lap('snapshot')
         
         # КРОК 8: ПРИБИРАЄМО ВІДКРИТІ БОТ-ОРДЕРИ (щоб не висіли після клірингу)
         _cleanup_bot_orders(conn, auction_id)
+        timer.lap('bot_cleanup')
 
         # КРОК 9: ПЛАНУВАННЯ НАСТУПНОГО РАУНДУ
         # Встановлюємо час наступного клірингу (через 5 хвилин)
         _schedule_next_clearing(cursor, auction_id, new_round, current_time)
+        timer.lap('record')
+        
+        # КРОК 10: ЧЕРГА ДОКУМЕНТІВ УГОД
+        # Файли пишуть фонові воркери (document_queue), тут лише завдання
+        _enqueue_round_documents(conn, auction_id, product_name, clearing_price, allocations, orders)
+        timer.lap('documents')
         
         # Фіксуємо всі зміни в базі даних
         conn.commit()
+        timer.lap('commit')
+        CLEARING_SETTLEMENT_SECONDS.observe(time.perf_counter() - settlement_started)
+        CLEARING_MATCHED_ORDERS.inc(len(allocations))
+        wake_document_workers()
+
+        # Тривалість фаз - окремим записом після commit, щоб не впливати на раунд
+        _save_round_timings(conn, auction_id, new_round, len(orders), len(allocations), timer)
         
-        print(f"[CLEARING] Аукціон #{auction_id}, раунд #{new_round} успішно завершено")
+        logger.info(
+            "Раунд клірингу завершено",
+            extra={
+                **log_ctx,
+                "product": product_name,
+                "orders": len(orders),
+                "matched": len(allocations),
+                "price": clearing_price,
+                "volume": clearing_volume,
+            },
+        )
         
-    except Exception as e:
+    except Exception:
         # У разі помилки відміняємо всі зміни
+        # Помилку з traceback логує _process_auctions_for_clearing
         conn.rollback()
-        print(f"[CLEARING ERROR] Аукціон #{auction_id}: {str(e)}")
         raise
+    finally:
+        CLEARING_ROUND_SECONDS.observe(time.perf_counter() - round_started)
+        cursor.close()
+
+
+CLEARING_PHASES = (
+    'expire', 'load_orders', 'compute', 'settle', 'inventory',
+    'snapshot', 'bot_cleanup', 'record', 'documents', 'commit',
+)
+
+
+class _RoundTimer:
+    """
+    Послідовні фази раунду клірингу: lap(name) закриває фазу, що тривала від
+    попереднього lap. Кількість запитів і рядків береться з лічильника
+    query_stats поточного проходу планувальника (або HTTP-запиту).
+    """
+
+    def __init__(self):
+        self.stats = current_query_stats()
+        self.started = self._last = time.perf_counter()
+        self._start_counts = self._last_counts = self._counts()
+        self.phases: Dict[str, float] = {}
+        self.phase_queries: Dict[str, int] = {}
+
+    def _counts(self):
+        if self.stats is None:
+            return 0, 0, 0.0
+        return self.stats.queries, self.stats.rows, self.stats.seconds
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        counts = self._counts()
+        self.phases[name] = self.phases.get(name, 0.0) + (now - self._last)
+        self.phase_queries[name] = self.phase_queries.get(name, 0) + (counts[0] - self._last_counts[0])
+        self._last = now
+        self._last_counts = counts
+
+    def totals(self) -> Dict:
+        counts = self._counts()
+        return {
+            "total_ms": (self._last - self.started) * 1000,
+            "query_count": counts[0] - self._start_counts[0],
+            "row_count": counts[1] - self._start_counts[1],
+            "db_ms": (counts[2] - self._start_counts[2]) * 1000,
+        }
+
+
+def _save_round_timings(conn, auction_id: int, round_number: int, order_count: int,
+                        allocation_count: int, timer: _RoundTimer):
+    """ЗАПИС ТРИВАЛОСТІ ФАЗ РАУНДУ В auction_clearing_timings (помилка не зриває раунд)"""
+    totals = timer.totals()
+    columns = [f"{phase}_ms" for phase in CLEARING_PHASES]
+    values = [round(timer.phases.get(phase, 0.0) * 1000, 3) for phase in CLEARING_PHASES]
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"""
+            REPLACE INTO auction_clearing_timings
+            (auction_id, round_number, order_count, allocation_count, {', '.join(columns)},
+             total_ms, query_count, db_ms, row_count, phase_queries)
+            VALUES (%s, %s, %s, %s, {', '.join(['%s'] * len(columns))}, %s, %s, %s, %s, %s)
+            """,
+            (
+                auction_id, round_number, order_count, allocation_count, *values,
+                round(totals["total_ms"], 3), totals["query_count"], round(totals["db_ms"], 3),
+                totals["row_count"], json.dumps(timer.phase_queries),
+            )
+        )
+        conn.commit()
+    except Exception as e:
+        logger.warning("Не вдалося записати тривалість фаз раунду: %s", e,
+                       extra={"auctionId": auction_id, "round": round_number})
     finally:
         cursor.close()
 
 
+def _enqueue_round_documents(conn, auction_id: int, product: str, clearing_price,
+                             allocations: List[Dict], orders: List[Dict]):
+    """
+    ДОДАВАННЯ ДОКУМЕНТІВ УГОД РАУНДУ В ЧЕРГУ
+    
+    Для кожної виконаної заявки створюється завдання на документ
+    (покупець або продавець) за ціною клірингу.
+    """
+    traders = {o['id']: o['trader_id'] for o in orders}
+    jobs = []
+    for alloc in allocations:
+        cleared_qty = to_decimal(alloc['cleared_qty'])
+        trader_id = traders.get(alloc['order_id'])
+        if trader_id is None or cleared_qty <= Decimal('0'):
+            continue
+        jobs.append({
+            'auction_id': auction_id,
+            'trader_id': trader_id,
+            'role': 'покупець' if alloc['side'] == 'bid' else 'продавець',
+            'product': product,
+            'price': clearing_price,
+            'quantity': cleared_qty,
+        })
+    count = enqueue_trade_documents(conn, jobs)
+    if count:
+        logger.debug("Додано документів угод у чергу: %d", count, extra={"auctionId": auction_id})
+
+
 def _update_inventory_after_clearing(
     conn,
     auction_id: int,
@@ -673,7 +945,7 @@ def _create_inventory_snapshot(conn, auction_id: int, round_number: int):
             (auction_id, round_number, snapshot_json)
         )
         
-        print(f"[INVENTORY] Створено snapshot для аукціону #{auction_id}, раунд #{round_number}")
+        logger.debug("Створено snapshot інвентарю", extra={"auctionId": auction_id, "round": round_number})
         
     finally:
         cursor.close()
@@ -697,7 +969,7 @@ def _cleanup_bot_orders(conn, auction_id: int):
         if not rows:
             return
 
-        print(f"[CLEARING] Прибираємо {len(rows)} відкритих бот-ордерів після клірингу")
+        logger.debug("Прибираємо відкриті бот-ордери: %d", len(rows), extra={"auctionId": auction_id})
         
         for row in rows:
             order_id = row['id']
@@ -746,6 +1018,8 @@ def _close_auction_automatically(conn, auction_id: int, current_time: datetime):
             """,
             (current_time, auction_id)
         )
+        # Оновлюємо денормалізований статус останнього аукціону в лістингу
+        refresh_auction_listing_meta(cursor, auction_id)
         conn.commit()
     finally:
         cursor.close()
@@ -777,7 +1051,10 @@ def _schedule_next_clearing(cursor, auction_id: int, current_round: int, current
         (next_clearing_time, auction_id)
     )
     
-    print(f"[CLEARING] Наступний клірінг для аукціону #{auction_id} заплановано на {next_clearing_time.isoformat()}")
+    logger.debug(
+        "Наступний клірінг заплановано",
+        extra={"auctionId": auction_id, "nextClearingAt": next_clearing_time.isoformat()},
+    )
 
 
 # Експортуємо функції для використання в інших модулях
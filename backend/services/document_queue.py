@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+Фонова черга генерації документів угод (document_jobs)
+
+Кліринг лише додає завдання в таблицю в межах своєї транзакції, а файли
+пишуть воркер-потоки пакетами. Завдання, які зависли в стані 'running'
+(процес впав посеред пакета), повертаються в чергу після DOCUMENT_JOB_STALE_SEC.
+
+Обробка черги окремим процесом (наприклад, якщо DOCUMENT_WORKERS=0):
+    python -m backend.services.document_queue run --root PATH
+"""
+
+import argparse
+import datetime
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from uuid import uuid4
+
+from backend.db import db_connection, ensure_document_jobs, ensure_trade_documents
+from backend.services.documents import write_trade_document
+from backend.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+DOCUMENT_WORKERS = int(os.environ.get('DOCUMENT_WORKERS', '1'))
+DOCUMENT_BATCH_SIZE = int(os.environ.get('DOCUMENT_BATCH_SIZE', '100'))
+DOCUMENT_POLL_SECONDS = float(os.environ.get('DOCUMENT_POLL_SECONDS', '2'))
+DOCUMENT_JOB_MAX_ATTEMPTS = int(os.environ.get('DOCUMENT_JOB_MAX_ATTEMPTS', '5'))
+DOCUMENT_JOB_STALE_SEC = int(os.environ.get('DOCUMENT_JOB_STALE_SEC', '300'))
+
+_workers: List[threading.Thread] = []
+_workers_running = False
+_wake = threading.Event()
+_stats_lock = threading.Lock()
+_stats = {
+    "processed": 0,
+    "failed": 0,
+    "batches": 0,
+    "lastBatchSize": 0,
+    "lastBatchMs": None,
+    "lastBatchAt": None,
+}
+
+
+def enqueue_trade_documents(conn, jobs: Iterable[Dict]) -> int:
+    """Додає завдання на генерацію документів (без commit - фіксує викликач)"""
+    rows = [
+        (job['auction_id'], job['trader_id'], job['role'], job['product'], str(job['price']), str(job['quantity']))
+        for job in jobs
+    ]
+    if not rows:
+        return 0
+    cur = conn.cursor()
+    try:
+        cur.executemany(
+            "INSERT INTO document_jobs (auction_id, trader_id, role, product, price, quantity) "
+            "VALUES (%s,%s,%s,%s,%s,%s)",
+            rows
+        )
+    finally:
+        cur.close()
+    return len(rows)
+
+
+def wake_document_workers() -> None:
+    """Будить воркери цього процесу, не чекаючи наступного опитування"""
+    _wake.set()
+
+
+def requeue_stale_jobs(conn, stale_seconds: int = DOCUMENT_JOB_STALE_SEC) -> int:
+    """Повертає зависні завдання в чергу; ті, що вичерпали спроби (напр. валять воркер), - у 'failed'"""
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "UPDATE document_jobs SET status=IF(attempts >= %s, 'failed', 'pending'), claim_token=NULL, "
+            "last_error=IF(attempts >= %s, 'stale: worker did not finish', last_error) "
+            "WHERE status='running' AND claimed_at < NOW() - INTERVAL %s SECOND",
+            (DOCUMENT_JOB_MAX_ATTEMPTS, DOCUMENT_JOB_MAX_ATTEMPTS, int(stale_seconds))
+        )
+        conn.commit()
+        return max(cur.rowcount, 0)
+    finally:
+        cur.close()
+
+
+def _claim_batch(conn, limit: int) -> List[Dict]:
+    # UPDATE ... LIMIT атомарний, тож кілька процесів не заберуть одне завдання
+    token = uuid4().hex
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            "UPDATE document_jobs SET status='running', claim_token=%s, claimed_at=NOW(), attempts=attempts+1 "
+            "WHERE status='pending' ORDER BY id ASC LIMIT %s",
+            (token, int(limit))
+        )
+        conn.commit()
+        if cur.rowcount <= 0:
+            return []
+        cur.execute(
+            # TIMESTAMP читається в часовому поясі сесії; UNIX_TIMESTAMP дає незалежний від нього час
+            "SELECT id, auction_id, trader_id, role, product, price, quantity, attempts, "
+            "UNIX_TIMESTAMP(created_at) AS created_epoch "
+            "FROM document_jobs WHERE claim_token=%s ORDER BY id ASC",
+            (token,)
+        )
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+
+def process_document_batch(conn, docs_root: str, limit: int = DOCUMENT_BATCH_SIZE) -> int:
+    """Забирає пакет завдань, пише файли та реєструє їх в індексі; повертає розмір пакета"""
+    started = time.monotonic()
+    jobs = _claim_batch(conn, limit)
+    if not jobs:
+        return 0
+    written = []
+    failures = []
+    for job in jobs:
+        try:
+            filename, traded_at = write_trade_document(
+                docs_root,
+                job['auction_id'],
+                job['role'],
+                job['trader_id'],
+                job['quantity'],
+                job['price'],
+                job['product'],
+                traded_at=datetime.datetime.utcfromtimestamp(int(job['created_epoch'])),
+                job_id=job['id'],
+            )
+            written.append((job, filename, traded_at))
+        except Exception as exc:
+            failures.append((job, str(exc)[:255]))
+    cur = conn.cursor()
+    try:
+        if written:
+            cur.executemany(
+                "INSERT IGNORE INTO trade_documents (auction_id, trader_id, role, filename, created_at) "
+                "VALUES (%s,%s,%s,%s,%s)",
+                [(job['auction_id'], job['trader_id'], job['role'], filename, traded_at)
+                 for job, filename, traded_at in written]
+            )
+            cur.executemany(
+                "UPDATE document_jobs SET status='done', filename=%s, claim_token=NULL, finished_at=NOW(), last_error=NULL "
+                "WHERE id=%s",
+                [(filename, job['id']) for job, filename, _ in written]
+            )
+        for job, error in failures:
+            next_status = 'failed' if int(job['attempts']) >= DOCUMENT_JOB_MAX_ATTEMPTS else 'pending'
+            cur.execute(
+                "UPDATE document_jobs SET status=%s, claim_token=NULL, last_error=%s WHERE id=%s",
+                (next_status, error, job['id'])
+            )
+        conn.commit()
+    finally:
+        cur.close()
+    elapsed_ms = (time.monotonic() - started) * 1000.0
+    with _stats_lock:
+        _stats["processed"] += len(written)
+        _stats["failed"] += len(failures)
+        _stats["batches"] += 1
+        _stats["lastBatchSize"] = len(jobs)
+        _stats["lastBatchMs"] = round(elapsed_ms, 2)
+        _stats["lastBatchAt"] = time.time()
+    return len(jobs)
+
+
+def document_queue_stats(conn) -> Dict:
+    """Стан черги: кількість за статусами та затримка найстарішого завдання"""
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute("SELECT status, COUNT(*) AS cnt FROM document_jobs GROUP BY status")
+        counts = {row['status']: int(row['cnt']) for row in cur.fetchall()}
+        cur.execute(
+            "SELECT MIN(created_at) AS oldest, TIMESTAMPDIFF(SECOND, MIN(created_at), NOW()) AS lag "
+            "FROM document_jobs WHERE status IN ('pending','running')"
+        )
+        row = cur.fetchone() or {}
+    finally:
+        cur.close()
+    with _stats_lock:
+        worker_stats = dict(_stats)
+    return {
+        "pending": counts.get('pending', 0),
+        "running": counts.get('running', 0),
+        "done": counts.get('done', 0),
+        "failed": counts.get('failed', 0),
+        "oldestPendingAt": row['oldest'].isoformat() if row.get('oldest') else None,
+        "lagSeconds": int(row['lag']) if row.get('lag') is not None else 0,
+        "workers": len([t for t in _workers if t.is_alive()]),
+        "process": worker_stats,
+    }
+
+
+def _worker_loop(docs_root: str):
+    last_requeue = 0.0
+    while _workers_running:
+        conn = None
+        try:
+            conn = db_connection()
+            if time.monotonic() - last_requeue > DOCUMENT_JOB_STALE_SEC / 2:
+                requeue_stale_jobs(conn)
+                last_requeue = time.monotonic()
+            # Поки пакети повні - черга не порожня, працюємо без паузи
+            while _workers_running and process_document_batch(conn, docs_root) >= DOCUMENT_BATCH_SIZE:
+                pass
+        except Exception as e:
+            logger.error("Помилка воркера черги документів: %s", e, extra={"sample": "document_queue.error"})
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        _wake.wait(DOCUMENT_POLL_SECONDS)
+        _wake.clear()
+
+
+def start_document_workers(docs_root: str, workers: Optional[int] = None):
+    global _workers_running
+    count = DOCUMENT_WORKERS if workers is None else workers
+    if _workers_running or count <= 0:
+        return
+    _workers_running = True
+    for index in range(count):
+        thread = threading.Thread(target=_worker_loop, args=(docs_root,), name=f"document-worker-{index}", daemon=True)
+        thread.start()
+        _workers.append(thread)
+    logger.info("Запущено воркерів черги документів: %d", count)
+
+
+def stop_document_workers():
+    global _workers_running
+    _workers_running = False
+    _wake.set()
+    for thread in _workers:
+        if thread.is_alive():
+            thread.join(timeout=10)
+    _workers.clear()
+
+
+def _default_docs_root() -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'generated_docs')
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Trade document queue")
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help="drain the queue once and exit")
+    run.add_argument('--root', default=_default_docs_root(), help="GENERATED_DOCS_ROOT directory")
+    sub.add_parser('stats', help="print queue statistics")
+    args = parser.parse_args(argv)
+    conn = db_connection()
+    try:
+        ensure_document_jobs(conn)
+        ensure_trade_documents(conn)
+        if args.command == 'stats':
+            print(document_queue_stats(conn))
+            return
+        requeue_stale_jobs(conn)
+        total = 0
+        while True:
+            size = process_document_batch(conn, args.root)
+            total += size
+            if size == 0:
+                break
+    finally:
+        conn.close()
+    print(f"Processed {total} document job(s)")
+
+
+if __name__ == '__main__':
+    main()
+
+
+__all__ = [
+    'enqueue_trade_documents',
+    'wake_document_workers',
+    'requeue_stale_jobs',
+    'process_document_batch',
+    'document_queue_stats',
+    'start_document_workers',
+    'stop_document_workers',
+]
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Індекс документів угод (trade_documents)
+
+Кожен згенерований документ реєструється в таблиці, тому список документів
+трейдера - це індексований запит, а не обхід каталогу GENERATED_DOCS_ROOT.
+
+Разове заповнення індексу для вже існуючих файлів:
+    python -m backend.services.documents backfill [--root PATH]
+"""
+
+import argparse
+import datetime
+import hashlib
+import hmac
+import os
+import re
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from backend.db import db_connection, ensure_trade_documents
+from backend.security import JWT_SECRET
+from backend.services.auction import DECIMAL_QUANT
+
+# auction_{auction_id}_{role}_trader_{trader_id}_{epoch}[_{job_id}].txt
+TRADE_DOC_PATTERN = re.compile(r'^auction_(\d+)_(.+)_trader_(\d+)_(\d+)(?:_(\d+))?\.txt$')
+BACKFILL_BATCH_SIZE = 500
+
+
+def write_trade_document(docs_root: str, auction_id: int, role: str, trader_id: int, amount, price,
+                         product: str, *, traded_at: Optional[datetime.datetime] = None,
+                         job_id: Optional[int] = None) -> Tuple[str, datetime.datetime]:
+    """
+    Записує підписаний документ угоди у docs_root; повертає (ім'я файлу, час угоди).
+    traded_at - наївний час UTC. job_id розрізняє кілька угод трейдера в одному раунді.
+    """
+    base_dir = os.path.join(docs_root, f'auction_{auction_id}')
+    os.makedirs(base_dir, exist_ok=True)
+    now = traded_at or datetime.datetime.utcnow()
+    timestamp_iso = now.isoformat() + 'Z'
+    epoch_ts = int(now.replace(tzinfo=datetime.timezone.utc).timestamp())
+    suffix = f"_{job_id}" if job_id is not None else ''
+    filename = f"auction_{auction_id}_{role}_trader_{trader_id}_{epoch_ts}{suffix}.txt"
+    path = os.path.join(base_dir, filename)
+    op_type = 'Покупка' if role.strip().lower() == 'покупець' else 'Продаж'
+    try:
+        amt = amount if isinstance(amount, Decimal) else Decimal(str(amount))
+    except Exception:
+        amt = Decimal('0')
+    try:
+        prc = price if isinstance(price, Decimal) else Decimal(str(price))
+    except Exception:
+        prc = Decimal('0')
+    total_cost = (prc * amt).quantize(DECIMAL_QUANT)
+    payload = f"{auction_id}|{trader_id}|{op_type}|{product}|{str(prc)}|{str(amt)}|{timestamp_iso}"
+    try:
+        key_bytes = (JWT_SECRET or 'local_dev_secret').encode('utf-8')
+    except Exception:
+        key_bytes = b'local_dev_secret'
+    signature = hmac.new(key_bytes, payload.encode('utf-8'), hashlib.sha256).hexdigest()
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write("=== ПІДТВЕРДЖЕННЯ УГОДИ ===\n")
+        fh.write(f"Аукціон: {product}\n")
+        fh.write(f"Тип операції: {op_type}\n")
+        fh.write(f"Трейдер ID: {trader_id}\n")
+        fh.write(f"Дата угоди: {timestamp_iso}\n")
+        fh.write("\n")
+        fh.write("Деталі угоди:\n")
+        fh.write(f"- Продукт: {product}\n")
+        fh.write(f"- Ціна: {str(prc)}\n")
+        fh.write(f"- Кількість: {str(amt)}\n")
+        fh.write(f"- Загальна вартість: {str(total_cost)}\n")
+        fh.write("\n")
+        fh.write(f"Підпис системи: {signature}\n")
+    return filename, now
+
+
+def register_trade_document(conn, auction_id: int, trader_id: int, role: str, filename: str,
+                            created_at: Optional[datetime.datetime] = None) -> None:
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "INSERT IGNORE INTO trade_documents (auction_id, trader_id, role, filename, created_at) "
+            "VALUES (%s,%s,%s,%s,%s)",
+            (auction_id, trader_id, role, filename, created_at or datetime.datetime.utcnow())
+        )
+    finally:
+        cur.close()
+
+
+def list_trader_documents(conn, trader_id: int, *, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+    sql = (
+        "SELECT auction_id, filename, role, created_at FROM trade_documents "
+        "WHERE trader_id=%s ORDER BY auction_id ASC, filename ASC"
+    )
+    params: list = [trader_id]
+    if limit is not None:
+        sql += " LIMIT %s OFFSET %s"
+        params.extend([limit, offset])
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(sql, tuple(params))
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+
+def count_trader_documents(conn, trader_id: int) -> int:
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COUNT(*) FROM trade_documents WHERE trader_id=%s", (trader_id,))
+        return int(cur.fetchone()[0])
+    finally:
+        cur.close()
+
+
+def _parse_document_name(filename: str):
+    match = TRADE_DOC_PATTERN.match(filename)
+    if not match:
+        return None
+    auction_id, role, trader_id, epoch, _job_id = match.groups()
+    return int(auction_id), role, int(trader_id), datetime.datetime.utcfromtimestamp(int(epoch))
+
+
+def backfill_trade_documents(conn, docs_root: str) -> int:
+    """Реєструє в індексі всі документи, що вже лежать на диску; повертає кількість нових записів"""
+    ensure_trade_documents(conn)
+    if not os.path.isdir(docs_root):
+        return 0
+    inserted = 0
+    batch = []
+    cur = conn.cursor()
+    try:
+        def _flush():
+            nonlocal inserted
+            if not batch:
+                return
+            cur.executemany(
+                "INSERT IGNORE INTO trade_documents (auction_id, trader_id, role, filename, created_at) "
+                "VALUES (%s,%s,%s,%s,%s)",
+                batch
+            )
+            inserted += max(cur.rowcount, 0)
+            conn.commit()
+            batch.clear()
+
+        for folder_name in os.listdir(docs_root):
+            if not folder_name.startswith('auction_'):
+                continue
+            folder = os.path.join(docs_root, folder_name)
+            if not os.path.isdir(folder):
+                continue
+            for file_name in os.listdir(folder):
+                parsed = _parse_document_name(file_name)
+                if not parsed:
+                    continue
+                auction_id, role, trader_id, created_at = parsed
+                batch.append((auction_id, trader_id, role, file_name, created_at))
+                if len(batch) >= BACKFILL_BATCH_SIZE:
+                    _flush()
+        _flush()
+    finally:
+        cur.close()
+    return inserted
+
+
+def _default_docs_root() -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'generated_docs')
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Trade document index maintenance")
+    sub = parser.add_subparsers(dest='command', required=True)
+    backfill = sub.add_parser('backfill', help="index documents already stored on disk")
+    backfill.add_argument('--root', default=_default_docs_root(), help="GENERATED_DOCS_ROOT directory")
+    args = parser.parse_args(argv)
+    conn = db_connection()
+    try:
+        count = backfill_trade_documents(conn, args.root)
+    finally:
+        conn.close()
+    print(f"Indexed {count} document(s) from {args.root}")
+
+
+if __name__ == '__main__':
+    main()
+
+
+__all__ = ['write_trade_document', 'register_trade_document', 'list_trader_documents', 'count_trader_documents', 'backfill_trade_documents']
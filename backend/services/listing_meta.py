@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Денормалізовані дані про аукціони лістингу
+
+listings.auction_count / last_auction_id / last_auction_status / last_auction_created_at
+оновлюються щоразу, коли аукціон створюється або змінює статус, тож сторінки
+лістингів читають їх напряму без корельованих підзапитів до auctions.
+
+Перевірка та виправлення розбіжностей:
+    python -m backend.services.listing_meta repair
+"""
+
+import argparse
+from typing import List
+
+from backend.db import db_connection, ensure_auctions_tables, ensure_listings_table
+
+_LAST_AUCTION = (
+    "SELECT a.{column} FROM auctions a WHERE a.listing_id = listings.id "
+    "ORDER BY a.created_at DESC, a.id DESC LIMIT 1"
+)
+
+_REFRESH_SQL = (
+    "UPDATE listings SET "
+    "auction_count = (SELECT COUNT(*) FROM auctions a WHERE a.listing_id = listings.id), "
+    f"last_auction_id = ({_LAST_AUCTION.format(column='id')}), "
+    f"last_auction_status = ({_LAST_AUCTION.format(column='status')}), "
+    f"last_auction_created_at = ({_LAST_AUCTION.format(column='created_at')}), "
+    "updated_at = updated_at "
+)
+
+REPAIR_BATCH_SIZE = 500
+
+
+def refresh_listing_auction_meta(cur, listing_id) -> None:
+    """Перераховує дані про аукціони для лістингу (без commit)"""
+    if listing_id is None:
+        return
+    cur.execute(_REFRESH_SQL + "WHERE id = %s", (listing_id,))
+
+
+def refresh_auction_listing_meta(cur, auction_id: int) -> None:
+    """Те саме, але за id аукціону - для місць, де listing_id невідомий"""
+    cur.execute(
+        _REFRESH_SQL + "WHERE id = (SELECT listing_id FROM auctions WHERE id = %s)",
+        (auction_id,)
+    )
+
+
+def find_drifted_listings(conn) -> List[int]:
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT listings.id FROM listings WHERE "
+            "listings.auction_count <> (SELECT COUNT(*) FROM auctions a WHERE a.listing_id = listings.id) "
+            f"OR NOT (listings.last_auction_id <=> ({_LAST_AUCTION.format(column='id')})) "
+            f"OR NOT (listings.last_auction_status <=> ({_LAST_AUCTION.format(column='status')})) "
+            f"OR NOT (listings.last_auction_created_at <=> ({_LAST_AUCTION.format(column='created_at')}))"
+        )
+        return [int(row[0]) for row in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+def repair_listing_auction_meta(conn) -> List[int]:
+    """Виправляє лістинги, у яких денормалізовані дані розійшлися з auctions; повертає їх id"""
+    ensure_listings_table(conn)
+    ensure_auctions_tables(conn)
+    drifted = find_drifted_listings(conn)
+    cur = conn.cursor()
+    try:
+        for start in range(0, len(drifted), REPAIR_BATCH_SIZE):
+            chunk = drifted[start:start + REPAIR_BATCH_SIZE]
+            placeholders = ','.join(['%s'] * len(chunk))
+            cur.execute(_REFRESH_SQL + f"WHERE id IN ({placeholders})", tuple(chunk))
+            conn.commit()
+    finally:
+        cur.close()
+    return drifted
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Listing auction metadata maintenance")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('check', help="list listings whose auction metadata is out of date")
+    sub.add_parser('repair', help="recompute auction metadata for out-of-date listings")
+    args = parser.parse_args(argv)
+    conn = db_connection()
+    try:
+        if args.command == 'check':
+            ensure_listings_table(conn)
+            ensure_auctions_tables(conn)
+            drifted = find_drifted_listings(conn)
+            print(f"{len(drifted)} listing(s) out of date: {drifted}")
+        else:
+            repaired = repair_listing_auction_meta(conn)
+            print(f"Repaired {len(repaired)} listing(s): {repaired}")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
+
+
+__all__ = [
+    'refresh_listing_auction_meta',
+    'refresh_auction_listing_meta',
+    'find_drifted_listings',
+    'repair_listing_auction_meta',
+]
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Пошук по лістингах через FULLTEXT-індекс idx_listings_fulltext (title, description)
+
+Кожне слово запиту стає обов'язковим префіксом у BOOLEAN MODE (+слово*), тож
+"пшен" знаходить "пшениця". Слова коротші за ft_min_word_len (MyISAM: 4) в індекс
+не потрапляють - для них лишається LIKE, але вже лише серед рядків, відібраних індексом.
+"""
+
+import os
+import re
+from typing import List, NamedTuple, Optional
+
+LISTINGS_FT_MIN_WORD_LEN = int(os.environ.get('LISTINGS_FT_MIN_WORD_LEN', '4'))
+MAX_SEARCH_TOKENS = 8
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class ListingSearch(NamedTuple):
+    where_sql: str
+    params: List
+    relevance_sql: Optional[str]
+    relevance_params: List
+
+
+def _tokenize(term: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(term or ''):
+        token = token.strip('_')
+        if token and token.lower() not in (t.lower() for t in tokens):
+            tokens.append(token)
+    return tokens[:MAX_SEARCH_TOKENS]
+
+
+def build_listing_search(term: Optional[str], alias: str = 'l') -> Optional[ListingSearch]:
+    """Будує умову WHERE та вираз релевантності для пошукового запиту (None - фільтра немає)"""
+    tokens = _tokenize(term)
+    if not tokens:
+        return None
+    indexed = [t for t in tokens if len(t) >= LISTINGS_FT_MIN_WORD_LEN]
+    short = [t for t in tokens if len(t) < LISTINGS_FT_MIN_WORD_LEN]
+    clauses = []
+    params: List = []
+    relevance_sql = None
+    relevance_params: List = []
+    if indexed:
+        boolean_query = ' '.join(f'+{t}*' for t in indexed)
+        match_sql = f'MATCH({alias}.title, {alias}.description) AGAINST (%s IN BOOLEAN MODE)'
+        clauses.append(match_sql)
+        params.append(boolean_query)
+        relevance_sql = match_sql
+        relevance_params = [boolean_query]
+    for token in short:
+        clauses.append(f'({alias}.title LIKE %s OR {alias}.description LIKE %s)')
+        like_term = f"%{token}%"
+        params.extend([like_term, like_term])
+    return ListingSearch(' AND '.join(clauses), params, relevance_sql, relevance_params)
+
+
+__all__ = ['ListingSearch', 'build_listing_search']
@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+"""
+Безперервний matching engine для ринку orders/trades (ціна-час пріоритет)
+
+Книга заявок тримається в пам'яті: для кожної сторони словник рівнів ціни
+(deque заявок у порядку надходження) та купа цін з лінивим видаленням. Ціни та
+кількості зберігаються цілими (центи та 1e-4 одиниці, як DECIMAL(12,2) /
+DECIMAL(12,4) у таблиці orders), тож зіставлення не торкається Decimal.
+
+Книгу веде лише один процес - той, хто тримає MySQL GET_LOCK(MATCHING_LOCK_NAME).
+Усі процеси просто вставляють заявки в orders, а лідер підхоплює нові рядки за
+id > останнього побаченого (MyISAM видає id під блокуванням таблиці, тож
+пропусків позаду не буває). Угоди та нові залишки записуються пакетами
+(write-behind): спершу багаторядковий INSERT у trades, потім один UPDATE ... CASE
+на orders. MyISAM не має транзакцій, тож відновлення не довіряє remaining_amount:
+при старті або зміні лідера залишок кожної відкритої заявки перераховується як
+amount - SUM(trades). Угоди, що не встигли записатися до падіння процесу, просто
+буде зіставлено повторно, а записані без оновлення orders - не задублюються.
+
+Книга змінюється лише під _state_lock і лише в пам'яті; запити до БД (вибірка
+нових заявок та запис) виконуються поза ним, тож /orders/top та /orders/depth
+не чекають на I/O лідера.
+
+Запуск окремим процесом (наприклад, якщо MATCHING_ENGINE=0 у веб-воркерах):
+    python -m backend.services.matching_engine run
+"""
+
+import argparse
+import heapq
+import os
+import threading
+from collections import deque
+from decimal import Decimal
+from typing import Deque, Dict, List, Optional, Tuple
+
+from backend.db import db_connection, ensure_orders_table, ensure_trades_table
+from backend.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+MATCHING_ENGINE = os.environ.get('MATCHING_ENGINE', '1').lower() not in ('0', 'false', 'no')
+MATCHING_LOCK_NAME = os.environ.get('MATCHING_LOCK_NAME', 'orders_matching_engine')
+MATCHING_POLL_SECONDS = float(os.environ.get('MATCHING_POLL_SECONDS', '0.2'))
+MATCHING_FLUSH_BATCH = int(os.environ.get('MATCHING_FLUSH_BATCH', '1000'))
+MATCHING_INGEST_BATCH = int(os.environ.get('MATCHING_INGEST_BATCH', '5000'))
+
+PRICE_SCALE = 100
+AMOUNT_SCALE = 10000
+
+_state_lock = threading.Lock()
+
+
+def price_to_ticks(value) -> int:
+    return int((Decimal(str(value)) * PRICE_SCALE).to_integral_value())
+
+
+def amount_to_units(value) -> int:
+    return int((Decimal(str(value)) * AMOUNT_SCALE).to_integral_value())
+
+
+class BookOrder:
+    __slots__ = ('id', 'side', 'price', 'amount', 'remaining')
+
+    def __init__(self, order_id: int, side: str, price: int, amount: int, remaining: int):
+        self.id = order_id
+        self.side = side
+        self.price = price
+        self.amount = amount
+        self.remaining = remaining
+
+
+class _BookSide:
+    """Рівні ціни однієї сторони; для bid у купі лежать від'ємні ціни"""
+
+    __slots__ = ('levels', 'totals', 'heap', 'sign')
+
+    def __init__(self, sign: int):
+        self.levels: Dict[int, Deque[BookOrder]] = {}
+        # Сумарний залишок рівня підтримується інкрементально для L1/L2
+        self.totals: Dict[int, int] = {}
+        self.heap: List[int] = []
+        self.sign = sign
+
+    def best_price(self) -> Optional[int]:
+        heap = self.heap
+        levels = self.levels
+        while heap:
+            price = heap[0] * self.sign
+            if price in levels:
+                return price
+            heapq.heappop(heap)
+        return None
+
+    def add(self, order: BookOrder) -> None:
+        level = self.levels.get(order.price)
+        if level is None:
+            level = self.levels[order.price] = deque()
+            self.totals[order.price] = 0
+            heapq.heappush(self.heap, order.price * self.sign)
+        level.append(order)
+        self.totals[order.price] += order.remaining
+
+    def top_levels(self, depth: int) -> List[Tuple[int, int, int]]:
+        """(ціна, сумарний залишок, кількість заявок) найкращих depth рівнів"""
+        if depth == 1:
+            best = self.best_price()
+            prices = [] if best is None else [best * self.sign]
+        else:
+            prices = heapq.nsmallest(depth, (price * self.sign for price in self.levels))
+        result = []
+        for key in prices:
+            price = key * self.sign
+            result.append((price, self.totals[price], len(self.levels[price])))
+        return result
+
+
+class MatchingEngine:
+    """Книга заявок у пам'яті та черга змін для запису в БД"""
+
+    def __init__(self):
+        self.bids = _BookSide(-1)
+        self.asks = _BookSide(1)
+        self.orders: Dict[int, BookOrder] = {}
+        self.dirty: Dict[int, BookOrder] = {}
+        self.trades: List[Tuple[int, int, int, int]] = []
+        self.last_order_id = 0
+        self.stats = {"ordersIn": 0, "trades": 0, "restingOrders": 0}
+
+    def submit(self, order: BookOrder) -> int:
+        """Зіставляє нову заявку з протилежною стороною; повертає кількість угод"""
+        self.last_order_id = max(self.last_order_id, order.id)
+        self.stats["ordersIn"] += 1
+        if order.side == 'buy':
+            opposite, own = self.asks, self.bids
+            crosses = lambda best: best <= order.price
+        else:
+            opposite, own = self.bids, self.asks
+            crosses = lambda best: best >= order.price
+        fills = 0
+        trades = self.trades
+        dirty = self.dirty
+        while order.remaining > 0:
+            best = opposite.best_price()
+            if best is None or not crosses(best):
+                break
+            level = opposite.levels[best]
+            totals = opposite.totals
+            while level and order.remaining > 0:
+                resting = level[0]
+                quantity = min(order.remaining, resting.remaining)
+                resting.remaining -= quantity
+                order.remaining -= quantity
+                totals[best] -= quantity
+                if order.side == 'buy':
+                    trades.append((order.id, resting.id, best, quantity))
+                else:
+                    trades.append((resting.id, order.id, best, quantity))
+                dirty[resting.id] = resting
+                fills += 1
+                if resting.remaining == 0:
+                    level.popleft()
+                    self.orders.pop(resting.id, None)
+            if not level:
+                del opposite.levels[best]
+                del totals[best]
+        if fills:
+            dirty[order.id] = order
+            self.stats["trades"] += fills
+        if order.remaining > 0:
+            own.add(order)
+            self.orders[order.id] = order
+        return fills
+
+    def pending_writes(self) -> int:
+        return len(self.trades) + len(self.dirty)
+
+    def take_writes(self):
+        dirty = list(self.dirty.values())
+        trades = self.trades
+        self.dirty = {}
+        self.trades = []
+        return dirty, trades
+
+    def restore_writes(self, dirty: List[BookOrder], trades: List[Tuple[int, int, int, int]]) -> None:
+        """Повертає незаписані зміни в чергу (перед тими, що накопичилися після take_writes)"""
+        for order in dirty:
+            self.dirty.setdefault(order.id, order)
+        self.trades = trades + self.trades
+
+    def depth(self, depth: int) -> Dict[str, List[Tuple[int, int, int]]]:
+        return {"bids": self.bids.top_levels(depth), "asks": self.asks.top_levels(depth)}
+
+
+def _order_status(order: BookOrder) -> str:
+    if order.remaining <= 0:
+        return 'filled'
+    if order.remaining < order.amount:
+        return 'partial'
+    return 'open'
+
+
+def _row_to_order(row) -> BookOrder:
+    order_id, side, cost, amount, remaining = row
+    return BookOrder(int(order_id), side, price_to_ticks(cost), amount_to_units(amount), amount_to_units(remaining))
+
+
+def flush_writes(conn, engine: MatchingEngine) -> int:
+    """Записує накопичені угоди та залишки заявок; повертає кількість угод"""
+    with _state_lock:
+        dirty, trades = engine.take_writes()
+    if not dirty and not trades:
+        return 0
+    written = 0
+    cur = conn.cursor()
+    try:
+        # Спершу угоди: якщо процес впаде до UPDATE, залишки відновляться з trades
+        for start in range(0, len(trades), MATCHING_FLUSH_BATCH):
+            chunk = trades[start:start + MATCHING_FLUSH_BATCH]
+            params = []
+            for buy_id, sell_id, price, quantity in chunk:
+                params.extend([buy_id, sell_id, str(Decimal(price) / PRICE_SCALE), str(Decimal(quantity) / AMOUNT_SCALE)])
+            cur.execute(
+                "INSERT INTO trades (buy_order_id, sell_order_id, price, amount) VALUES "
+                + ','.join(['(%s,%s,%s,%s)'] * len(chunk)),
+                tuple(params)
+            )
+            written += len(chunk)
+        for start in range(0, len(dirty), MATCHING_FLUSH_BATCH):
+            chunk = dirty[start:start + MATCHING_FLUSH_BATCH]
+            remaining_case = ' '.join(['WHEN %s THEN %s'] * len(chunk))
+            status_case = ' '.join(['WHEN %s THEN %s'] * len(chunk))
+            params: List = []
+            for order in chunk:
+                params.extend([order.id, str(Decimal(order.remaining) / AMOUNT_SCALE)])
+            for order in chunk:
+                params.extend([order.id, _order_status(order)])
+            params.extend(order.id for order in chunk)
+            cur.execute(
+                f"UPDATE orders SET remaining_amount = CASE id {remaining_case} END, "
+                f"status = CASE id {status_case} END "
+                f"WHERE id IN ({','.join(['%s'] * len(chunk))})",
+                tuple(params)
+            )
+        conn.commit()
+    except Exception:
+        # Записані пакети угод не повторюємо; UPDATE залишків ідемпотентний
+        with _state_lock:
+            engine.restore_writes(dirty, trades[written:])
+        raise
+    finally:
+        cur.close()
+    return len(trades)
+
+
+def recover_engine(conn) -> MatchingEngine:
+    """Будує книгу з відкритих заявок у БД (у порядку надходження)"""
+    engine = MatchingEngine()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT o.id, o.type, o.cost, o.amount, o.remaining_amount, "
+            "(SELECT COALESCE(SUM(t.amount), 0) FROM trades t WHERE t.buy_order_id = o.id) "
+            "+ (SELECT COALESCE(SUM(t.amount), 0) FROM trades t WHERE t.sell_order_id = o.id) "
+            "FROM orders o WHERE o.status IN ('open','partial') ORDER BY o.id"
+        )
+        for row in cur.fetchall():
+            order = _row_to_order(row[:5])
+            stored = order.remaining
+            # Угоди могли записатися без оновлення orders (падіння між INSERT та UPDATE)
+            order.remaining = max(0, min(stored, order.amount - amount_to_units(row[5])))
+            if order.remaining < stored:
+                engine.dirty[order.id] = order
+            if order.remaining > 0:
+                engine.submit(order)
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM orders")
+        engine.last_order_id = max(engine.last_order_id, int(cur.fetchone()[0] or 0))
+    finally:
+        cur.close()
+    # Якщо у БД лишилися перехресні заявки (engine ще не працював), зіставляємо їх одразу
+    flush_writes(conn, engine)
+    engine.stats["ordersIn"] = 0
+    return engine
+
+
+def ingest_new_orders(conn, engine: MatchingEngine) -> int:
+    """Підхоплює заявки, вставлені після останнього побаченого id"""
+    total = 0
+    while True:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "SELECT id, type, cost, amount, remaining_amount FROM orders "
+                "WHERE id > %s AND status IN ('open','partial') ORDER BY id LIMIT %s",
+                (engine.last_order_id, MATCHING_INGEST_BATCH)
+            )
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        with _state_lock:
+            for row in rows:
+                engine.submit(_row_to_order(row))
+        flush_writes(conn, engine)
+        total += len(rows)
+        if len(rows) < MATCHING_INGEST_BATCH:
+            break
+    return total
+
+
+_engine: Optional[MatchingEngine] = None
+_engine_thread: Optional[threading.Thread] = None
+_engine_running = False
+_wake = threading.Event()
+_stop = threading.Event()
+
+
+def current_engine() -> Optional[MatchingEngine]:
+    """Книга цього процесу, якщо він лідер (інакше None)"""
+    return _engine
+
+
+def wake_matching_engine() -> None:
+    _wake.set()
+
+
+def _acquire_leadership(conn) -> bool:
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT GET_LOCK(%s, 0)", (MATCHING_LOCK_NAME,))
+        row = cur.fetchone()
+        return bool(row and row[0] == 1)
+    finally:
+        cur.close()
+
+
+def _engine_loop():
+    global _engine
+    while _engine_running:
+        lock_conn = None
+        work_conn = None
+        try:
+            lock_conn = db_connection()
+            if not _acquire_leadership(lock_conn):
+                lock_conn.close()
+                lock_conn = None
+                _stop.wait(timeout=5)
+                continue
+            work_conn = db_connection()
+            ensure_orders_table(work_conn)
+            ensure_trades_table(work_conn)
+            engine = recover_engine(work_conn)
+            with _state_lock:
+                _engine = engine
+            logger.info("Рушій зіставлення став лідером", extra={"restingOrders": len(engine.orders)})
+            while _engine_running:
+                ingest_new_orders(work_conn, engine)
+                with _state_lock:
+                    engine.stats["restingOrders"] = len(engine.orders)
+                # GET_LOCK тримається з'єднанням: перевіряємо, що воно живе
+                lock_conn.ping(reconnect=False)
+                _wake.wait(timeout=MATCHING_POLL_SECONDS)
+                _wake.clear()
+        except Exception as e:
+            logger.error("Помилка рушія зіставлення: %s", e, extra={"sample": "matching_engine.error"})
+            _stop.wait(timeout=1)
+        finally:
+            with _state_lock:
+                _engine = None
+            for conn in (work_conn, lock_conn):
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+def start_matching_engine():
+    global _engine_thread, _engine_running
+    if _engine_running or not MATCHING_ENGINE:
+        return
+    _engine_running = True
+    _stop.clear()
+    _engine_thread = threading.Thread(target=_engine_loop, name="matching-engine", daemon=True)
+    _engine_thread.start()
+
+
+def stop_matching_engine():
+    global _engine_running
+    _engine_running = False
+    _stop.set()
+    _wake.set()
+    if _engine_thread and _engine_thread.is_alive():
+        _engine_thread.join(timeout=10)
+
+
+def _level_entry(level: Tuple[int, int, int]) -> Dict:
+    price, quantity, count = level
+    return {
+        "price": Decimal(price) / PRICE_SCALE,
+        "quantity": Decimal(quantity) / AMOUNT_SCALE,
+        "orders": count,
+    }
+
+
+def engine_depth(depth: int) -> Optional[Dict[str, List[Dict]]]:
+    """Найкращі depth рівнів з книги в пам'яті або None, якщо процес не лідер"""
+    with _state_lock:
+        engine = _engine
+        if engine is None:
+            return None
+        book = engine.depth(depth)
+    return {side: [_level_entry(level) for level in levels] for side, levels in book.items()}
+
+
+def matching_engine_stats() -> Dict:
+    with _state_lock:
+        engine = _engine
+        if engine is None:
+            return {"leader": False, "enabled": MATCHING_ENGINE}
+        return {
+            "leader": True,
+            "enabled": MATCHING_ENGINE,
+            "lastOrderId": engine.last_order_id,
+            "restingOrders": len(engine.orders),
+            "bidLevels": len(engine.bids.levels),
+            "askLevels": len(engine.asks.levels),
+            "ordersIn": engine.stats["ordersIn"],
+            "trades": engine.stats["trades"],
+        }
+
+
+def main(argv=None) -> None:
+    global _engine_running
+    parser = argparse.ArgumentParser(description="Orders matching engine")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('run', help="run the engine in the foreground (waits for leadership)")
+    parser.parse_args(argv)
+    _engine_running = True
+    try:
+        _engine_loop()
+    except KeyboardInterrupt:
+        _engine_running = False
+
+
+if __name__ == '__main__':
+    main()
+
+
+__all__ = [
+    'BookOrder',
+    'MatchingEngine',
+    'price_to_ticks',
+    'amount_to_units',
+    'recover_engine',
+    'ingest_new_orders',
+    'flush_writes',
+    'current_engine',
+    'engine_depth',
+    'wake_matching_engine',
+    'start_matching_engine',
+    'stop_matching_engine',
+    'matching_engine_stats',
+]
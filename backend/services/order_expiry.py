@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Термін дії заявок аукціону та фонове прибирання прострочених
+
+Заявка може мати expires_at (UTC) та/або expires_after_round - останній раунд
+клірингу, в якому вона бере участь. Прострочені за часом заявки знімає потік
+sweeper пакетами по ORDER_EXPIRY_CHUNK рядків (індекс status, expires_at), а за
+раундами - сам кліринг перед вибіркою заявок. Статус стає 'rejected', резерви
+повертаються однією операцією гаманця на трейдера в межах пакета.
+
+Разовий прохід окремим процесом:
+    python -m backend.services.order_expiry sweep
+"""
+
+import argparse
+import os
+import threading
+import time
+import uuid
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from backend.db import db_connection, ensure_auctions_tables
+from backend.services.wallet import wallet_release
+from backend.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+ORDER_EXPIRY_SWEEP_SECONDS = float(os.environ.get('ORDER_EXPIRY_SWEEP_SECONDS', '30'))
+ORDER_EXPIRY_CHUNK = int(os.environ.get('ORDER_EXPIRY_CHUNK', '500'))
+
+_RESERVE_QUANT = Decimal('0.000001')
+
+_sweeper_thread: Optional[threading.Thread] = None
+_sweeper_running = False
+
+
+def release_cancel_batch(conn, batch: str, meta: Dict) -> Tuple[int, Decimal]:
+    """
+    Повертає резерви bid-заявок, позначених cancel_batch = batch:
+    одна сума на трейдера. Повертає (кількість трейдерів, загальна сума).
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            """
+            SELECT trader_id,
+                   -- не більше за price * quantity: у старих частково виконаних заявках
+                   -- reserved_amount лишався повним початковим резервом
+                   SUM(LEAST(COALESCE(reserved_amount, ROUND(price * quantity, 6)),
+                             ROUND(price * quantity, 6))) AS reserved_total,
+                   COUNT(*) AS bid_count
+            FROM auction_orders
+            WHERE cancel_batch = %s AND side = 'bid'
+            GROUP BY trader_id
+            """,
+            (batch,)
+        )
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+    released_total = Decimal('0')
+    for trader_id, reserved_total, bid_count in rows:
+        amount = Decimal(str(reserved_total or 0)).quantize(_RESERVE_QUANT)
+        if amount > 0:
+            wallet_release(conn, trader_id, amount, meta={**meta, "cancelBatch": batch, "orders": int(bid_count)})
+            released_total += amount
+    return len(rows), released_total
+
+
+def _expire_chunk(conn, where_sql: str, params: List, meta: Dict) -> int:
+    batch = uuid.uuid4().hex
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "UPDATE auction_orders SET status='rejected', cancel_batch=%s "
+            f"WHERE status='open' AND {where_sql} LIMIT {int(ORDER_EXPIRY_CHUNK)}",
+            tuple([batch, *params])
+        )
+        expired = cur.rowcount
+    finally:
+        cur.close()
+    if expired:
+        release_cancel_batch(conn, batch, meta)
+    conn.commit()
+    return expired
+
+
+def expire_orders_by_time(conn) -> int:
+    """
+    Знімає всі заявки з expires_at у минулому; повертає кількість.
+    Аукціони, яким настав час клірингу, пропускаються: їхні заявки знімає сам
+    раунд (expire_orders_for_round), і sweeper не змагається з розрахунками раунду.
+    """
+    total = 0
+    while True:
+        expired = _expire_chunk(
+            conn,
+            "expires_at IS NOT NULL AND expires_at <= UTC_TIMESTAMP() "
+            "AND auction_id NOT IN (SELECT id FROM auctions WHERE next_clearing_at <= UTC_TIMESTAMP())",
+            [],
+            {"action": "expire"},
+        )
+        total += expired
+        if expired < ORDER_EXPIRY_CHUNK:
+            return total
+
+
+def expire_orders_for_round(conn, auction_id: int, round_number: int) -> int:
+    """Перед клірингом раунду round_number знімає заявки аукціону, строк яких вийшов"""
+    total = 0
+    while True:
+        expired = _expire_chunk(
+            conn,
+            "auction_id = %s AND ("
+            "(expires_after_round IS NOT NULL AND expires_after_round < %s) "
+            "OR (expires_at IS NOT NULL AND expires_at <= UTC_TIMESTAMP()))",
+            [auction_id, round_number],
+            {"action": "expire", "auctionId": auction_id, "round": round_number},
+        )
+        total += expired
+        if expired < ORDER_EXPIRY_CHUNK:
+            return total
+
+
+def _sweeper_loop():
+    while _sweeper_running:
+        conn = None
+        try:
+            conn = db_connection()
+            expired = expire_orders_by_time(conn)
+            if expired:
+                logger.info("Знято прострочених заявок: %d", expired)
+        except Exception as e:
+            logger.error("Помилка прибирання прострочених заявок: %s", e, extra={"sample": "order_expiry.error"})
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        deadline = time.monotonic() + ORDER_EXPIRY_SWEEP_SECONDS
+        while _sweeper_running and time.monotonic() < deadline:
+            time.sleep(1)
+
+
+def start_order_expiry_sweeper():
+    global _sweeper_thread, _sweeper_running
+    if _sweeper_running or ORDER_EXPIRY_SWEEP_SECONDS <= 0:
+        return
+    _sweeper_running = True
+    _sweeper_thread = threading.Thread(target=_sweeper_loop, name="order-expiry-sweeper", daemon=True)
+    _sweeper_thread.start()
+    logger.info("Прибирання прострочених заявок запущено", extra={"intervalSeconds": ORDER_EXPIRY_SWEEP_SECONDS})
+
+
+def stop_order_expiry_sweeper():
+    global _sweeper_running
+    _sweeper_running = False
+    if _sweeper_thread and _sweeper_thread.is_alive():
+        _sweeper_thread.join(timeout=10)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Auction order expiry")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('sweep', help="expire all orders past their expires_at and exit")
+    parser.parse_args(argv)
+    conn = db_connection()
+    try:
+        ensure_auctions_tables(conn)
+        print(f"Expired orders: {expire_orders_by_time(conn)}")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
+
+
+__all__ = [
+    'release_cancel_batch',
+    'expire_orders_by_time',
+    'expire_orders_for_round',
+    'start_order_expiry_sweeper',
+    'stop_order_expiry_sweeper',
+]
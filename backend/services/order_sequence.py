@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Черговість (iteration) заявок аукціону
+
+Замість SELECT MAX(iteration) на кожну заявку номер видається з рядка-лічильника
+auction_order_sequences одним атомарним UPDATE з LAST_INSERT_ID(expr): значення
+прив'язане до з'єднання, тож паралельні запити ніколи не отримають однаковий номер.
+Номери, видані запиту, який потім відкотився, просто пропускаються - для
+пріоритету за часом важлива лише монотонність, а не відсутність пропусків.
+"""
+
+_ALLOCATE_SQL = (
+    "UPDATE auction_order_sequences "
+    "SET last_iteration = LAST_INSERT_ID(last_iteration + %s) "
+    "WHERE auction_id = %s"
+)
+
+# Перший виклик для аукціону продовжує вже наявні номери заявок
+_SEED_SQL = (
+    "INSERT INTO auction_order_sequences (auction_id, last_iteration) "
+    "SELECT %s, COALESCE(MAX(iteration), 0) FROM auction_orders WHERE auction_id = %s "
+    "ON DUPLICATE KEY UPDATE auction_id = auction_id"
+)
+
+
+def allocate_order_iterations(conn, auction_id: int, count: int = 1) -> int:
+    """Резервує count послідовних номерів і повертає перший з них"""
+    if count < 1:
+        raise ValueError("count must be positive")
+    cur = conn.cursor()
+    try:
+        cur.execute(_ALLOCATE_SQL, (count, auction_id))
+        if cur.rowcount == 0:
+            cur.execute(_SEED_SQL, (auction_id, auction_id))
+            cur.execute(_ALLOCATE_SQL, (count, auction_id))
+        cur.execute("SELECT LAST_INSERT_ID()")
+        last_iteration = int(cur.fetchone()[0])
+        return last_iteration - count + 1
+    finally:
+        cur.close()
+
+
+__all__ = ['allocate_order_iterations']
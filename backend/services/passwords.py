@@ -0,0 +1,154 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Optional
+from passlib.hash import pbkdf2_sha256
+try:
+    from passlib.hash import bcrypt as bcrypt_hash
+except Exception:
+    bcrypt_hash = None
+from backend.errors import AppError
+
+# Хешування паролів виконується в окремому пулі процесів, щоб сплеск логінів
+# не займав gthread-воркери, які обслуговують решту API.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '32'))
+PASSWORD_HASH_TIMEOUT_SEC = float(os.environ.get('PASSWORD_HASH_TIMEOUT_SEC', '10'))
+PASSWORD_PBKDF2_ROUNDS = int(os.environ.get('PASSWORD_PBKDF2_ROUNDS', '29000'))
+AUTH_MAX_CONCURRENT_PER_ACCOUNT = int(os.environ.get('AUTH_MAX_CONCURRENT_PER_ACCOUNT', '2'))
+AUTH_MAX_CONCURRENT_PER_IP = int(os.environ.get('AUTH_MAX_CONCURRENT_PER_IP', '8'))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(max(1, PASSWORD_HASH_MAX_PENDING))
+_inflight_lock = threading.Lock()
+_inflight: dict = {}
+
+
+def _hash_job(password: str, rounds: int) -> str:
+    return pbkdf2_sha256.using(rounds=rounds).hash(password)
+
+
+def _verify_job(password: str, stored_hash: str) -> bool:
+    try:
+        if stored_hash.startswith("$pbkdf2-sha256$") and pbkdf2_sha256.verify(password, stored_hash):
+            return True
+    except Exception:
+        pass
+    # Старі bcrypt-хеші, якщо модуль доступний
+    if bcrypt_hash and stored_hash.startswith("$2"):
+        try:
+            return bcrypt_hash.verify(password, stored_hash)
+        except Exception:
+            pass
+    try:
+        return pbkdf2_sha256.verify(password, stored_hash)
+    except Exception:
+        return False
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if PASSWORD_HASH_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # Не fork: у воркері вже працюють потоки (планувальник, черги, логер), і
+            # дочірній процес може успадкувати чужий захоплений lock та зависнути.
+            # Процеси пулу форкаються з однопотокового forkserver з уже імпортованим passlib.
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('forkserver')
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context('spawn')
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, mp_context=context)
+        return _executor
+
+
+def _reset_executor() -> None:
+    global _executor
+    with _executor_lock:
+        broken = _executor
+        _executor = None
+    if broken is not None:
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(fn, *args):
+    if not _pending.acquire(blocking=False):
+        raise AppError("Authentication service is busy, retry later", statuscode=503)
+    try:
+        executor = _get_executor()
+        future = executor.submit(fn, *args) if executor is not None else None
+    except BrokenProcessPool:
+        _pending.release()
+        _reset_executor()
+        raise AppError("Authentication service unavailable, retry later", statuscode=503)
+    except BaseException:
+        _pending.release()
+        raise
+    if future is None:
+        try:
+            return fn(*args)
+        finally:
+            _pending.release()
+    # Слот звільняється, коли задача справді завершилась у пулі, а не коли ми перестали чекати
+    future.add_done_callback(lambda _future: _pending.release())
+    try:
+        return future.result(timeout=PASSWORD_HASH_TIMEOUT_SEC)
+    except FutureTimeoutError:
+        raise AppError("Authentication service timed out, retry later", statuscode=503)
+    except BrokenProcessPool:
+        _reset_executor()
+        raise AppError("Authentication service unavailable, retry later", statuscode=503)
+
+
+def hash_password(password: str) -> str:
+    return _run(_hash_job, password, PASSWORD_PBKDF2_ROUNDS)
+
+
+def verify_password(password: str, stored_hash: str) -> bool:
+    if not stored_hash:
+        return False
+    return bool(_run(_verify_job, password, stored_hash))
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """Чи потрібно перехешувати пароль під поточні параметри pbkdf2"""
+    if not stored_hash or not stored_hash.startswith("$pbkdf2-sha256$"):
+        return True
+    try:
+        return pbkdf2_sha256.from_string(stored_hash).rounds != PASSWORD_PBKDF2_ROUNDS
+    except Exception:
+        return True
+
+
+@contextmanager
+def auth_slot(account: Optional[str], client_ip: Optional[str]):
+    """Обмежує кількість одночасних перевірок пароля на акаунт та на IP"""
+    keys = []
+    if account:
+        keys.append((('account', account.lower()), AUTH_MAX_CONCURRENT_PER_ACCOUNT))
+    keys.append((('ip', client_ip or 'unknown'), AUTH_MAX_CONCURRENT_PER_IP))
+    with _inflight_lock:
+        for key, limit in keys:
+            if _inflight.get(key, 0) >= max(1, limit):
+                raise AppError("Too many concurrent authentication attempts", statuscode=429)
+        for key, _ in keys:
+            _inflight[key] = _inflight.get(key, 0) + 1
+    try:
+        yield
+    finally:
+        with _inflight_lock:
+            for key, _ in keys:
+                remaining = _inflight.get(key, 0) - 1
+                if remaining > 0:
+                    _inflight[key] = remaining
+                else:
+                    _inflight.pop(key, None)
+
+
+__all__ = ['hash_password', 'verify_password', 'needs_rehash', 'auth_slot']
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Кеш статичних файлів фронтенду в пам'яті
+
+Під час старту всі файли з frontend/ читаються один раз, для текстових
+створюються gzip (та brotli, якщо встановлено модуль brotli) варіанти.
+Кожен не-HTML файл отримує псевдонім з хешем вмісту (style.3f9a1c2b7d.css),
+а посилання src/href у HTML переписуються на ці псевдоніми - такі відповіді
+кешуються браузером назавжди (immutable). HTML та ES-модулі, які імпортуються
+за звичайними іменами, віддаються з ETag і перевіряються при кожному запиті.
+
+STATIC_ASSET_CACHE=0 вимикає кеш (зручно під час розробки фронтенду).
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from typing import Dict, NamedTuple, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_ASSET_CACHE = os.environ.get('STATIC_ASSET_CACHE', '1').lower() not in ('0', 'false', 'no')
+HASH_LENGTH = 10
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+COMPRESS_MIN_SIZE = 512
+COMPRESSIBLE_EXTENSIONS = {'.html', '.js', '.mjs', '.css', '.svg', '.json', '.txt', '.map', '.ico'}
+
+_HTML_REF_RE = re.compile(r'''(?P<attr>\b(?:src|href))=(?P<quote>["'])(?P<url>[^"'#?]+)(?P<query>\?[^"'#]*)?(?P=quote)''')
+_HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{%d}(?=\.[^./]+$)' % HASH_LENGTH)
+
+
+class StaticAsset(NamedTuple):
+    path: str
+    mimetype: str
+    body: bytes
+    gzip_body: Optional[bytes]
+    br_body: Optional[bytes]
+    etag: str
+    hashed_path: Optional[str]
+
+
+def _hashed_name(path: str, digest: str) -> str:
+    root, ext = posixpath.splitext(path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def _make_asset(path: str, body: bytes, hashed_path: Optional[str]) -> StaticAsset:
+    digest = hashlib.sha256(body).hexdigest()
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if path.endswith(('.js', '.mjs')):
+        mimetype = 'text/javascript'
+    gzip_body = None
+    br_body = None
+    ext = posixpath.splitext(path)[1].lower()
+    if ext in COMPRESSIBLE_EXTENSIONS and len(body) >= COMPRESS_MIN_SIZE:
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            gzip_body = compressed
+        if brotli is not None:
+            compressed = brotli.compress(body)
+            if len(compressed) < len(body):
+                br_body = compressed
+    return StaticAsset(path, mimetype, body, gzip_body, br_body, f'"{digest[:32]}"', hashed_path)
+
+
+class StaticAssetCache:
+    def __init__(self, root: str):
+        self.root = root
+        self.assets: Dict[str, StaticAsset] = {}
+        self.hashed: Dict[str, StaticAsset] = {}
+
+    def build(self) -> 'StaticAssetCache':
+        raw: Dict[str, bytes] = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                with open(full_path, 'rb') as fh:
+                    raw[rel_path] = fh.read()
+        hashed_paths = {}
+        for rel_path, body in raw.items():
+            if rel_path.endswith('.html'):
+                continue
+            hashed_path = _hashed_name(rel_path, hashlib.sha256(body).hexdigest())
+            hashed_paths[rel_path] = hashed_path
+            asset = _make_asset(rel_path, body, hashed_path)
+            self.assets[rel_path] = asset
+            self.hashed[hashed_path] = asset
+        for rel_path, body in raw.items():
+            if not rel_path.endswith('.html'):
+                continue
+            body = self._rewrite_html(rel_path, body, hashed_paths)
+            self.assets[rel_path] = _make_asset(rel_path, body, None)
+        return self
+
+    @staticmethod
+    def _rewrite_html(rel_path: str, body: bytes, hashed_paths: Dict[str, str]) -> bytes:
+        try:
+            text = body.decode('utf-8')
+        except UnicodeDecodeError:
+            return body
+        base_dir = posixpath.dirname(rel_path)
+
+        def replace(match):
+            url = match.group('url')
+            if '://' in url or url.startswith(('//', 'data:', 'mailto:', '/api/')):
+                return match.group(0)
+            target = url.lstrip('/') if url.startswith('/') else posixpath.normpath(posixpath.join(base_dir, url))
+            hashed_path = hashed_paths.get(target)
+            if not hashed_path:
+                return match.group(0)
+            new_url = posixpath.join(posixpath.dirname(url), posixpath.basename(hashed_path))
+            quote = match.group('quote')
+            return f"{match.group('attr')}={quote}{new_url}{quote}"
+
+        return _HTML_REF_RE.sub(replace, text).encode('utf-8')
+
+    def lookup(self, path: str):
+        """Повертає (asset, immutable) або (None, False)"""
+        path = path.lstrip('/')
+        asset = self.hashed.get(path)
+        if asset is not None:
+            return asset, True
+        asset = self.assets.get(path)
+        if asset is not None:
+            return asset, False
+        # Застарілий хеш після деплою - віддаємо актуальний файл, але без immutable
+        stripped = _HASHED_NAME_RE.sub('', path)
+        if stripped != path:
+            return self.assets.get(stripped), False
+        return None, False
+
+
+def _accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    accepted = {}
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+    return accepted
+
+
+def asset_response(response_class, asset: StaticAsset, immutable: bool, accept_encoding: Optional[str],
+                   if_none_match: Optional[str]):
+    accepted = _accepted_encodings(accept_encoding)
+    body = asset.body
+    encoding = None
+    if asset.br_body is not None and accepted.get('br', 0) > 0:
+        body, encoding = asset.br_body, 'br'
+    elif asset.gzip_body is not None and accepted.get('gzip', 0) > 0:
+        body, encoding = asset.gzip_body, 'gzip'
+    # Окремий ETag для кожного варіанта стиснення
+    etag = asset.etag if encoding is None else f'{asset.etag[:-1]}-{encoding}"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        'Vary': 'Accept-Encoding',
+    }
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+        return response_class(status=304, headers=headers)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return response_class(body, mimetype=asset.mimetype, headers=headers)
+
+
+__all__ = ['STATIC_ASSET_CACHE', 'StaticAsset', 'StaticAssetCache', 'asset_response']
@@ -1,8 +1,26 @@
 import json
 from decimal import Decimal
+from functools import wraps
 from typing import Optional, Tuple
 from backend.errors import AppError, OrderDataError
 from backend.db import ensure_wallet_tables
+from backend.metrics import counter
+
+WALLET_OPERATIONS = counter('wallet_operations_total', 'Wallet operations by type and result', ('op', 'result'))
+
+def _counted(op: str):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                WALLET_OPERATIONS.inc(op=op, result='error')
+                raise
+            WALLET_OPERATIONS.inc(op=op, result='ok')
+            return result
+        return wrapper
+    return decorator
 
 def _ensure_wallet_row(conn, user_id: int):
     ensure_wallet_tables(conn)
@@ -37,11 +55,13 @@ def _log_tx(conn, user_id: int, tx_type: str, amount: Decimal, available: Decima
     finally:
         cur.close()
 
+@_counted('balance')
 def wallet_balance(conn, user_id: int):
     _ensure_wallet_row(conn, user_id)
     available, reserved = _get_balances(conn, user_id)
     return {'available': available, 'reserved': reserved, 'total': available + reserved}
 
+@_counted('deposit')
 def wallet_deposit(conn, user_id: int, amount: Decimal, meta: Optional[dict] = None):
     if amount <= 0:
         raise OrderDataError("Deposit amount must be positive")
@@ -55,6 +75,7 @@ def wallet_deposit(conn, user_id: int, amount: Decimal, meta: Optional[dict] = N
     tx_id = _log_tx(conn, user_id, 'deposit', amount, available, meta)
     return {'available': available, 'reserved': reserved, 'txId': tx_id}
 
+@_counted('withdraw')
 def wallet_withdraw(conn, user_id: int, amount: Decimal, meta: Optional[dict] = None):
     if amount <= 0:
         raise OrderDataError("Withdraw amount must be positive")
@@ -71,6 +92,7 @@ def wallet_withdraw(conn, user_id: int, amount: Decimal, meta: Optional[dict] =
     tx_id = _log_tx(conn, user_id, 'withdraw', -amount, available, meta)
     return {'available': available, 'reserved': reserved, 'txId': tx_id}
 
+@_counted('reserve')
 def wallet_reserve(conn, user_id: int, amount: Decimal, meta: Optional[dict] = None):
     if amount <= 0:
         raise OrderDataError("Reserve amount must be positive")
@@ -91,6 +113,7 @@ def wallet_reserve(conn, user_id: int, amount: Decimal, meta: Optional[dict] = N
     tx_id = _log_tx(conn, user_id, 'reserve', -amount, available, meta)
     return {'available': available, 'reserved': reserved, 'txId': tx_id}
 
+@_counted('release')
 def wallet_release(conn, user_id: int, amount: Decimal, meta: Optional[dict] = None):
     if amount <= 0:
         balances = wallet_balance(conn, user_id)
@@ -112,6 +135,7 @@ def wallet_release(conn, user_id: int, amount: Decimal, meta: Optional[dict] = N
     tx_id = _log_tx(conn, user_id, 'release', amount, available, meta)
     return {'available': available, 'reserved': reserved, 'txId': tx_id}
 
+@_counted('spend')
 def wallet_spend(conn, user_id: int, amount: Decimal, meta: Optional[dict] = None):
     if amount <= 0:
         balances = wallet_balance(conn, user_id)
@@ -0,0 +1,228 @@
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, Optional, Tuple
+from flask import Flask, g, request
+
+# Структуровані логи замість print(). Записи з потоків запитів і планувальника
+# лише кладуться в чергу (без блокування на stdout), а окремий потік
+# QueueListener форматує їх у JSON-рядок і пише в stdout.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json').lower()
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+# Повторювані записи з однаковим sample-ключем - не частіше ніж раз на вікно
+LOG_SAMPLE_SECONDS = float(os.environ.get('LOG_SAMPLE_SECONDS', '60'))
+REQUEST_ID_HEADER = 'X-Request-ID'
+ROOT_LOGGER = 'backend'
+
+_correlation_id: 'contextvars.ContextVar[Optional[str]]' = contextvars.ContextVar('correlation_id', default=None)
+_REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+# Поля, які ставлять наші фільтри; у JSON вони виводяться окремо або не виводяться
+_INTERNAL_ATTRS = {'correlation_id', 'sample', 'suppressed'}
+
+_configure_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_dropped = 0
+
+
+def new_correlation_id(prefix: str = '') -> str:
+    return f"{prefix}{uuid.uuid4().hex[:16]}"
+
+
+def current_correlation_id() -> Optional[str]:
+    return _correlation_id.get()
+
+
+@contextmanager
+def correlation(correlation_id: Optional[str] = None, prefix: str = '') -> Iterator[str]:
+    """Усі записи всередині блоку отримують один correlationId (напр. раунд клірингу)"""
+    value = correlation_id or new_correlation_id(prefix)
+    token = _correlation_id.set(value)
+    try:
+        yield value
+    finally:
+        _correlation_id.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """Прикріплює correlationId потоку, що логує (виконується до постановки в чергу)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = _correlation_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускає не більше одного запису на sample-ключ за вікно LOG_SAMPLE_SECONDS.
+    Ключ задається через extra={'sample': '...'}; кількість пропущених записів
+    додається до наступного виведеного як поле suppressed.
+    """
+
+    def __init__(self, window: float = LOG_SAMPLE_SECONDS):
+        super().__init__()
+        self.window = window
+        self._lock = threading.Lock()
+        self._state: Dict[str, Tuple[float, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, 'sample', None)
+        if not key or self.window <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._state.get(key, (0.0, 0))
+            if last and now - last < self.window:
+                self._state[key] = (last, suppressed + 1)
+                return False
+            self._state[key] = (now, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        correlation_id = getattr(record, 'correlation_id', None)
+        if correlation_id:
+            entry["correlationId"] = correlation_id
+        suppressed = getattr(record, 'suppressed', None)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and key not in _INTERNAL_ATTRS and key not in entry:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s [%(correlation_id)s] %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, 'correlation_id', None) is None:
+            record.correlation_id = '-'
+        return super().format(record)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler, що відкидає записи при переповненій черзі замість блокування"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Повідомлення й traceback рендеримо тут: args можуть змінитися після повернення
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global _dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped += 1
+
+
+def configure_logging() -> None:
+    """Одноразове налаштування логера backend: черга + потік-записувач у stdout"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        log_queue: 'queue.Queue[logging.LogRecord]' = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter() if LOG_FORMAT == 'json' else TextFormatter())
+        handler = _NonBlockingQueueHandler(log_queue)
+        handler.addFilter(CorrelationFilter())
+        handler.addFilter(SamplingFilter())
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(LOG_LEVEL)
+        root.handlers = [handler]
+        root.propagate = False
+        _listener = QueueListener(log_queue, stream, respect_handler_level=False)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Дописує чергу та зупиняє потік-записувач"""
+    global _listener
+    with _configure_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    configure_logging()
+    return logging.getLogger(name if name.startswith(ROOT_LOGGER) else f"{ROOT_LOGGER}.{name}")
+
+
+def dropped_records() -> int:
+    return _dropped
+
+
+def _start_request_correlation() -> None:
+    incoming = request.headers.get(REQUEST_ID_HEADER, '')
+    request_id = incoming if _REQUEST_ID_RE.match(incoming) else new_correlation_id('req-')
+    g.request_id = request_id
+    g.request_id_token = _correlation_id.set(request_id)
+
+
+def _add_request_id(response):
+    request_id = g.get('request_id')
+    if request_id:
+        response.headers[REQUEST_ID_HEADER] = request_id
+    return response
+
+
+def _reset_request_correlation(_exc=None) -> None:
+    token = g.pop('request_id_token', None)
+    if token is not None:
+        try:
+            _correlation_id.reset(token)
+        except ValueError:
+            _correlation_id.set(None)
+
+
+def register_request_logging(app: Flask) -> None:
+    configure_logging()
+    app.before_request(_start_request_correlation)
+    app.after_request(_add_request_id)
+    app.teardown_request(_reset_request_correlation)
+
+
+__all__ = [
+    'REQUEST_ID_HEADER',
+    'configure_logging',
+    'shutdown_logging',
+    'get_logger',
+    'correlation',
+    'current_correlation_id',
+    'new_correlation_id',
+    'dropped_records',
+    'register_request_logging',
+]
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+Мікробенчмарки алгоритмів клірингу (backend/services/auction.py)
+
+    python -m benchmarks.clearing --sizes 1000,10000 --json results.json
+    python -m benchmarks.clearing --compare results.json
+"""
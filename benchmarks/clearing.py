@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк compute_k_double_clearing / compute_call_market_clearing
+
+Для кожної комбінації (алгоритм, форма книги, розмір) вимірюються:
+  - wallSeconds: min / median / max за --repeat прогонів (без tracemalloc);
+  - peakBytes: пікова пам'ять одного прогону за tracemalloc;
+  - allocatedBlocks: кількість блоків пам'яті, виділених під час прогону,
+    які ще живі на момент його завершення (результат та проміжні структури).
+Якщо розмір для якоїсь пари (алгоритм, форма) перевищив --max-seconds,
+більші розміри цієї пари позначаються skipped.
+
+    python -m benchmarks.clearing
+    python -m benchmarks.clearing --sizes 1000,10000 --shapes uniform,clustered --json out.json
+    python -m benchmarks.clearing --sizes 1000,10000 --compare out.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+from backend.services.auction import compute_call_market_clearing, compute_k_double_clearing
+from benchmarks.generators import GENERATORS
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def _algorithms(k: Decimal) -> Dict[str, Callable[[List[Dict]], Dict]]:
+    return {
+        "k_double": lambda orders: compute_k_double_clearing(orders, k),
+        "call_market": compute_call_market_clearing,
+    }
+
+
+def _timed_run(func, orders) -> float:
+    gc.collect()
+    started = time.perf_counter()
+    func(orders)
+    return time.perf_counter() - started
+
+
+def _memory_run(func, orders) -> Dict[str, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = func(orders)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    del result
+    return {"peakBytes": peak, "allocatedBlocks": blocks}
+
+
+def run_benchmarks(sizes: List[int], shapes: List[str], algorithms: List[str], *, k: Decimal,
+                   repeat: int, max_seconds: float, seed: int, memory: bool = True) -> List[Dict]:
+    available = _algorithms(k)
+    results = []
+    for algorithm in algorithms:
+        func = available[algorithm]
+        for shape in shapes:
+            too_slow = False
+            for size in sizes:
+                entry = {"algorithm": algorithm, "shape": shape, "size": size}
+                if too_slow:
+                    entry["skipped"] = True
+                    results.append(entry)
+                    continue
+                orders = GENERATORS[shape](size, seed=seed)
+                timings = []
+                for _ in range(repeat):
+                    timings.append(_timed_run(func, orders))
+                    if timings[-1] > max_seconds:
+                        break
+                entry["wallSeconds"] = {
+                    "min": min(timings),
+                    "median": statistics.median(timings),
+                    "max": max(timings),
+                    "runs": len(timings),
+                }
+                if memory and min(timings) <= max_seconds:
+                    entry.update(_memory_run(func, orders))
+                result = func(orders) if min(timings) <= max_seconds else None
+                if result is not None:
+                    entry["volume"] = str(result.get("volume"))
+                    entry["price"] = str(result.get("price"))
+                if min(timings) > max_seconds:
+                    too_slow = True
+                results.append(entry)
+                print(
+                    f"{algorithm:12} {shape:15} {size:>9}  median {entry['wallSeconds']['median']:.4f}s",
+                    file=sys.stderr,
+                )
+                del orders
+    return results
+
+
+def compare(current: List[Dict], baseline: List[Dict]) -> List[Dict]:
+    """Відношення медіан поточного прогону до базового (менше 1 - швидше)"""
+    base_index = {(item["algorithm"], item["shape"], item["size"]): item for item in baseline}
+    rows = []
+    for item in current:
+        base = base_index.get((item["algorithm"], item["shape"], item["size"]))
+        if not base or "wallSeconds" not in item or "wallSeconds" not in base:
+            continue
+        base_median = base["wallSeconds"]["median"]
+        ratio = item["wallSeconds"]["median"] / base_median if base_median else None
+        row = {
+            "algorithm": item["algorithm"],
+            "shape": item["shape"],
+            "size": item["size"],
+            "baselineMedian": base_median,
+            "currentMedian": item["wallSeconds"]["median"],
+            "ratio": ratio,
+        }
+        if "peakBytes" in item and "peakBytes" in base and base["peakBytes"]:
+            row["peakBytesRatio"] = item["peakBytes"] / base["peakBytes"]
+        rows.append(row)
+    return rows
+
+
+def _csv_list(value: str) -> List[str]:
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Clearing algorithm micro-benchmarks")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated book sizes")
+    parser.add_argument('--shapes', default=','.join(GENERATORS), help="comma-separated book shapes")
+    parser.add_argument('--algorithms', default='k_double,call_market', help="k_double,call_market")
+    parser.add_argument('--k', default='0.5', help="k coefficient for k_double")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-seconds', type=float, default=60.0,
+                        help="skip larger sizes once a run exceeds this")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--json', dest='json_path', help="write results to this file instead of stdout")
+    parser.add_argument('--compare', dest='baseline_path', help="baseline JSON from a previous run")
+    args = parser.parse_args(argv)
+
+    shapes = _csv_list(args.shapes)
+    algorithms = _csv_list(args.algorithms)
+    unknown = [shape for shape in shapes if shape not in GENERATORS]
+    unknown += [name for name in algorithms if name not in ('k_double', 'call_market')]
+    if unknown:
+        parser.error(f"unknown shapes/algorithms: {', '.join(unknown)}")
+
+    results = run_benchmarks(
+        [int(size) for size in _csv_list(args.sizes)],
+        shapes,
+        algorithms,
+        k=Decimal(args.k),
+        repeat=max(1, args.repeat),
+        max_seconds=args.max_seconds,
+        seed=args.seed,
+        memory=not args.no_memory,
+    )
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "k": args.k,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.baseline_path:
+        with open(args.baseline_path, 'r', encoding='utf-8') as fh:
+            report["comparison"] = compare(results, json.load(fh).get("results", []))
+    output = json.dumps(report, indent=2)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as fh:
+            fh.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Генератори синтетичних книг заявок у форматі, який приймають
+compute_k_double_clearing та compute_call_market_clearing.
+
+Усі генератори детерміновані для заданого seed, тож результати запусків
+можна порівнювати між собою.
+"""
+
+import datetime
+import random
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+BASE_PRICE = 100.0
+_BASE_TIME = datetime.datetime(2024, 1, 1)
+_PRICE_QUANT = Decimal('0.01')
+_QTY_QUANT = Decimal('0.0001')
+
+
+def _order(order_id: int, side: str, price: float, quantity: float) -> Dict:
+    return {
+        "id": order_id,
+        "trader_id": order_id % 997 + 1,
+        "side": side,
+        "price": Decimal(repr(max(price, 0.01))).quantize(_PRICE_QUANT),
+        "quantity": Decimal(repr(max(quantity, 0.0001))).quantize(_QTY_QUANT),
+        "iteration": order_id,
+        "created_at": _BASE_TIME + datetime.timedelta(microseconds=order_id),
+    }
+
+
+def uniform(size: int, seed: int = 1) -> List[Dict]:
+    """Ціни рівномірно в ±10% навколо BASE_PRICE, сторони навпіл"""
+    rng = random.Random(seed)
+    return [
+        _order(i + 1, 'bid' if i % 2 == 0 else 'ask',
+               rng.uniform(BASE_PRICE * 0.9, BASE_PRICE * 1.1), rng.uniform(1, 100))
+        for i in range(size)
+    ]
+
+
+def clustered(size: int, seed: int = 1) -> List[Dict]:
+    """Кілька десятків дискретних рівнів ціни, багато заявок на кожному"""
+    rng = random.Random(seed)
+    levels = [BASE_PRICE + step * 0.5 for step in range(-20, 21)]
+    return [
+        _order(i + 1, 'bid' if i % 2 == 0 else 'ask', rng.choice(levels), rng.uniform(1, 100))
+        for i in range(size)
+    ]
+
+
+def heavy_marginal(size: int, seed: int = 1) -> List[Dict]:
+    """Половина заявок стоїть на одній граничній ціні - навантаження на пропорційний розподіл"""
+    rng = random.Random(seed)
+    orders = []
+    for i in range(size):
+        side = 'bid' if i % 2 == 0 else 'ask'
+        if i % 4 < 2:
+            price = BASE_PRICE
+        else:
+            price = rng.uniform(BASE_PRICE * 0.95, BASE_PRICE * 1.05)
+        orders.append(_order(i + 1, side, price, rng.uniform(1, 100)))
+    return orders
+
+
+def one_sided(size: int, seed: int = 1) -> List[Dict]:
+    """Лише bid-заявки: швидкий вихід без клірингу"""
+    rng = random.Random(seed)
+    return [
+        _order(i + 1, 'bid', rng.uniform(BASE_PRICE * 0.9, BASE_PRICE * 1.1), rng.uniform(1, 100))
+        for i in range(size)
+    ]
+
+
+def uncrossed(size: int, seed: int = 1) -> List[Dict]:
+    """Усі bid нижчі за всі ask: книга без перетину, обсяг нульовий"""
+    rng = random.Random(seed)
+    orders = []
+    for i in range(size):
+        if i % 2 == 0:
+            orders.append(_order(i + 1, 'bid', rng.uniform(BASE_PRICE * 0.8, BASE_PRICE * 0.99), rng.uniform(1, 100)))
+        else:
+            orders.append(_order(i + 1, 'ask', rng.uniform(BASE_PRICE * 1.01, BASE_PRICE * 1.2), rng.uniform(1, 100)))
+    return orders
+
+
+GENERATORS: Dict[str, Callable[..., List[Dict]]] = {
+    "uniform": uniform,
+    "clustered": clustered,
+    "heavy_marginal": heavy_marginal,
+    "one_sided": one_sided,
+    "uncrossed": uncrossed,
+}
+
+__all__ = ['GENERATORS', 'uniform', 'clustered', 'heavy_marginal', 'one_sided', 'uncrossed']
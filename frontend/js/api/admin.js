@@ -1,4 +1,4 @@
-import { authorizedFetch } from './http.js';
+import { authorizedFetch, authorizedFetchAllPages } from './http.js';
 
 export async function createAuction({ product, type, k } = {}) {
     const body = { product, type, k };
@@ -34,9 +34,7 @@ export async function clearAuction(auctionId) {
 }
 
 export async function listParticipantsAdmin(auctionId) {
-    const res = await authorizedFetch(`/api/admin/auctions/${auctionId}/participants`);
-    if (!res.ok) throw new Error(`Не вдалося отримати список учасників: ${res.status}`);
-    return res.json();
+    return authorizedFetchAllPages(`/api/admin/auctions/${auctionId}/participants`, 'Не вдалося отримати список учасників');
 }
 
 export async function approveParticipant(auctionId, participantId) {
@@ -60,9 +58,7 @@ export async function listAuctionDocuments(auctionId) {
 }
 
 export async function listAdminUsers() {
-    const res = await authorizedFetch('/api/admin/users');
-    if (!res.ok) throw new Error(`Не вдалося отримати список користувачів: ${res.status}`);
-    return res.json();
+    return authorizedFetchAllPages('/api/admin/users', 'Не вдалося отримати список користувачів');
 }
 
 export async function promoteUser(userId) {
@@ -184,6 +180,15 @@ export async function getClearingHistory(auctionId) {
     return res.json();
 }
 
+export async function getClearingTimings(auctionId, limit = 100) {
+    const res = await authorizedFetch(`/api/admin/auctions/${auctionId}/clearing-timings?limit=${limit}`);
+    if (!res.ok) {
+        const txt = await res.text();
+        throw new Error(`Не вдалося отримати тривалість фаз: ${res.status} ${txt}`);
+    }
+    return res.json();
+}
+
 export async function getPendingAuctions() {
     const res = await authorizedFetch('/api/admin/auctions/pending');
     if (!res.ok) {
@@ -10,3 +10,18 @@ export async function authorizedFetch(url, options = {}) {
     }
     return fetch(resolvedUrl, { ...options, headers });
 }
+
+// Списки з keyset-пагінацією: йдемо за X-Next-Cursor, доки сервер його повертає
+export async function authorizedFetchAllPages(url, errorMessage) {
+    const items = [];
+    let cursor = null;
+    do {
+        const separator = url.includes('?') ? '&' : '?';
+        const pageUrl = cursor ? `${url}${separator}cursor=${encodeURIComponent(cursor)}` : url;
+        const res = await authorizedFetch(pageUrl);
+        if (!res.ok) throw new Error(`${errorMessage}: ${res.status}`);
+        items.push(...await res.json());
+        cursor = res.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return items;
+}
@@ -1,9 +1,7 @@
-import { authorizedFetch } from './http.js';
+import { authorizedFetch, authorizedFetchAllPages } from './http.js';
 
 export async function listResourceTransactions() {
-    const res = await authorizedFetch('/api/resources/transactions');
-    if (!res.ok) throw new Error(`Не вдалося отримати список транзакцій: ${res.status}`);
-    return res.json();
+    return authorizedFetchAllPages('/api/resources/transactions', 'Не вдалося отримати список транзакцій');
 }
 
 export async function addResourceTransaction({ type, quantity, notes }) {
@@ -20,9 +18,7 @@ export async function listResourceDocuments(options = {}) {
     const params = new URLSearchParams();
     if (options.traderId) params.set('traderId', options.traderId);
     const suffix = params.toString() ? `?${params.toString()}` : '';
-    const res = await authorizedFetch(`/api/resources/documents${suffix}`);
-    if (!res.ok) throw new Error(`Не вдалося отримати список документів ресурсів: ${res.status}`);
-    return res.json();
+    return authorizedFetchAllPages(`/api/resources/documents${suffix}`, 'Не вдалося отримати список документів ресурсів');
 }
 
 export async function uploadResourceDocument({ file, note }) {
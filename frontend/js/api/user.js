@@ -1,4 +1,4 @@
-import { authorizedFetch } from './http.js';
+import { authorizedFetch, authorizedFetchAllPages } from './http.js';
 
 export async function getMyProfile() {
     const res = await authorizedFetch('/api/me/profile');
@@ -7,9 +7,7 @@ export async function getMyProfile() {
 }
 
 export async function meAuctionOrders() {
-    const res = await authorizedFetch('/api/me/auction-orders');
-    if (!res.ok) throw new Error(`Мої замовлення не вдалися: ${res.status}`);
-    return res.json();
+    return authorizedFetchAllPages('/api/me/auction-orders', 'Мої замовлення не вдалися');
 }
 
 export async function meAuctions() {
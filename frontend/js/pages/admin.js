@@ -23,6 +23,7 @@ import {
   batchApproveAuctionOrders,
   batchRejectAuctionOrders,
   getClearingHistory,
+  getClearingTimings,
   getPendingAuctions,
   approveAuction,
   rejectAuction,
@@ -286,6 +287,14 @@ function auctionCard(a) {
         },
         "Історія раундів",
       );
+      const btnTimings = el(
+        "button",
+        {
+          className: "btn btn-ghost btn-compact",
+          onclick: () => loadClearingTimings(a.id, card),
+        },
+        "Фази клірингу",
+      );
       if (a.status === "collecting")
         actions.append(
           el(
@@ -308,7 +317,7 @@ function auctionCard(a) {
             "Закрити",
           ),
         );
-      actions.append(btnView, btnDocs, btnHistory);
+      actions.append(btnView, btnDocs, btnHistory, btnTimings);
       return actions;
     })(),
   );
@@ -356,6 +365,68 @@ async function loadClearingHistory(auctionId, host) {
   }
 }
 
+const PHASE_COLORS = {
+  expire: "#9e9e9e",
+  load_orders: "#42a5f5",
+  compute: "#ab47bc",
+  settle: "#ef5350",
+  inventory: "#ffa726",
+  snapshot: "#26a69a",
+  bot_cleanup: "#8d6e63",
+  record: "#78909c",
+  documents: "#d4e157",
+  commit: "#5c6bc0",
+};
+
+async function loadClearingTimings(auctionId, host) {
+  let wrap = host.querySelector(".clearing-timings-wrap");
+  if (!wrap) {
+    wrap = el("div", { className: "data-list clearing-timings-wrap" });
+    host.appendChild(wrap);
+  }
+  wrap.hidden = false;
+  wrap.textContent = "Завантаження…";
+  try {
+    const data = await getClearingTimings(auctionId);
+    const rounds = data.rounds || [];
+    if (!rounds.length) {
+      wrap.textContent = "Немає даних про тривалість раундів";
+      return;
+    }
+    wrap.innerHTML = "";
+    const phases = data.phases || [];
+    const maxTotal = Math.max(...rounds.map(r => r.totalMs), 1);
+    const legend = el("div", { style: "display:flex;flex-wrap:wrap;gap:8px;font-size:0.65rem;margin-bottom:6px;" });
+    phases.forEach(p => {
+      const s = data.summary?.[p] || {};
+      const perK = s.msPer1kOrders != null ? `, ${s.msPer1kOrders} мс/1k заявок` : "";
+      legend.appendChild(el("span", {},
+        el("span", { style: `display:inline-block;width:8px;height:8px;margin-right:3px;background:${PHASE_COLORS[p] || "#bbb"};` }),
+        `${p}: медіана ${s.medianMs != null ? s.medianMs.toFixed(1) : "—"} мс${perK}`,
+      ));
+    });
+    wrap.appendChild(legend);
+    // Горизонтальна стовпчикова діаграма: один рядок на раунд, сегменти - фази
+    rounds.slice().reverse().forEach(r => {
+      const bar = el("div", { style: `display:flex;height:10px;width:${Math.max(2, (r.totalMs / maxTotal) * 100)}%;` });
+      phases.forEach(p => {
+        const ms = r.phasesMs?.[p] || 0;
+        if (ms <= 0) return;
+        bar.appendChild(el("div", {
+          title: `${p}: ${ms.toFixed(1)} мс, запитів: ${r.phaseQueries?.[p] ?? 0}`,
+          style: `flex:${ms} 0 0;background:${PHASE_COLORS[p] || "#bbb"};`,
+        }));
+      });
+      wrap.appendChild(el("div", { style: "display:grid;grid-template-columns:150px 1fr;gap:6px;align-items:center;font-size:0.65rem;margin:2px 0;" },
+        el("span", { style: "white-space:nowrap;" }, `#${r.round} · ${r.orders} зав. · ${r.totalMs.toFixed(0)} мс · ${r.queries} SQL`),
+        bar,
+      ));
+    });
+  } catch (e) {
+    wrap.textContent = `Помилка: ${e?.message || "невідома"}`;
+  }
+}
+
 async function loadParticipants(auctionId, host) {
   let wrap = host.querySelector(".participants-wrap");
   if (!wrap) {
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+Наскрізне навантажувальне тестування HTTP API
+
+Піднімає тимчасовий MySQL/MariaDB (або бере наданий сервер і створює в ньому
+окрему базу), запускає backend.app:app під gunicorn, засіває адміністратора,
+трейдерів з коштами та аукціони, а потім ганяє суміш запитів зі сценарію.
+
+    python -m loadtest.run --scenario loadtest/scenarios/default.json --json after.json
+    python -m loadtest.run --db-host 127.0.0.1 --db-user root --compare before.json
+
+Звіт: p50/p95/p99 на кожну дію, помилки, RPS та кількість SQL-запитів на
+запит кожного типу (окрема послідовна фаза заміру за лічильником Questions).
+"""
@@ -0,0 +1,508 @@
+# -*- coding: utf-8 -*-
+"""
+Запуск сценарію навантаження
+
+Етапи:
+  1. тимчасова БД (LocalMySQL або --db-host) та gunicorn з backend.app:app;
+  2. засів: адміністратор, трейдери з коштами на гаманці, аукціони (через API);
+  3. фаза заміру: кожна дія виконується --probe послідовно, різниця лічильника
+     Questions (мінус фоновий темп, виміряний у простої) дає SQL-запитів на запит;
+  4. навантаження: concurrency потоків виконують дії за вагами зі сценарію,
+     окремий потік запускає раунди клірингу планувальника кожні clearingIntervalSeconds.
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import random
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+import mysql.connector
+import requests
+
+from loadtest.standin import ExistingMySQL, LocalMySQL, free_port
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SCENARIO = os.path.join(REPO_ROOT, 'loadtest', 'scenarios', 'default.json')
+
+SCENARIO_DEFAULTS = {
+    "name": "custom",
+    "durationSeconds": 60,
+    "warmupSeconds": 5,
+    "concurrency": 16,
+    "traders": 50,
+    "auctions": 3,
+    "depositPerTrader": 1000000,
+    "priceCenter": 100,
+    "priceSpreadPct": 5,
+    "quantityMin": 1,
+    "quantityMax": 10,
+    "batchSize": 20,
+    "clearingIntervalSeconds": 15,
+    "probeRequests": 20,
+    "mix": {"place_order": 40, "cancel_order": 10, "poll_book": 35, "wallet_read": 15},
+}
+
+
+def load_scenario(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as fh:
+        scenario = {**SCENARIO_DEFAULTS, **json.load(fh)}
+    unknown = [name for name in scenario['mix'] if name not in ACTIONS]
+    if unknown:
+        raise SystemExit(f"Unknown actions in scenario mix: {', '.join(unknown)}")
+    return scenario
+
+
+class Fixture:
+    """Засіяні дані та відкриті заявки трейдерів (спільні для потоків)"""
+
+    def __init__(self, base_url: str, scenario: Dict):
+        self.base_url = base_url
+        self.scenario = scenario
+        self.admin_token = None
+        self.traders: List[Dict] = []
+        self.auction_ids: List[int] = []
+        self.open_orders: Dict[int, List] = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def remember(self, trader_id: int, auction_id: int, order_id: int) -> None:
+        with self.lock:
+            self.open_orders[trader_id].append((auction_id, order_id))
+
+    def take_order(self, trader_id: int):
+        with self.lock:
+            orders = self.open_orders.get(trader_id)
+            if not orders:
+                return None
+            return orders.pop(random.randrange(len(orders)))
+
+    def peek_order(self, trader_id: int):
+        with self.lock:
+            orders = self.open_orders.get(trader_id)
+            return random.choice(orders) if orders else None
+
+    def forget_auction(self, trader_id: int, auction_id: int) -> None:
+        with self.lock:
+            self.open_orders[trader_id] = [item for item in self.open_orders[trader_id] if item[0] != auction_id]
+
+
+def _random_order(scenario: Dict) -> Dict:
+    side = random.choice(('bid', 'ask'))
+    center = float(scenario['priceCenter'])
+    spread = center * float(scenario['priceSpreadPct']) / 100.0
+    # bid трохи нижче центру, ask трохи вище - книга частково перетинається
+    price = center + random.uniform(-spread, spread / 2) if side == 'bid' else center + random.uniform(-spread / 2, spread)
+    quantity = random.uniform(float(scenario['quantityMin']), float(scenario['quantityMax']))
+    return {"side": side, "price": round(price, 2), "quantity": round(quantity, 4)}
+
+
+# Кожна дія: (session, fixture, trader) -> (назва ендпоінта для звіту, response)
+
+def _place_order(session, fixture, trader):
+    auction_id = random.choice(fixture.auction_ids)
+    response = session.post(f"{fixture.base_url}/api/auctions/{auction_id}/orders",
+                            json=_random_order(fixture.scenario), headers=trader['headers'])
+    if response.status_code == 201:
+        fixture.remember(trader['id'], auction_id, response.json()['id'])
+    return 'POST /auctions/:id/orders', response
+
+
+def _place_batch(session, fixture, trader):
+    auction_id = random.choice(fixture.auction_ids)
+    orders = [_random_order(fixture.scenario) for _ in range(int(fixture.scenario['batchSize']))]
+    response = session.post(f"{fixture.base_url}/api/auctions/{auction_id}/orders/batch",
+                            json={"orders": orders, "mode": "partial"}, headers=trader['headers'])
+    if response.status_code == 201:
+        for item in response.json().get('accepted', []):
+            fixture.remember(trader['id'], auction_id, item['id'])
+    return 'POST /auctions/:id/orders/batch', response
+
+
+def _amend_order(session, fixture, trader):
+    target = fixture.peek_order(trader['id'])
+    if target is None:
+        return _place_order(session, fixture, trader)
+    auction_id, order_id = target
+    change = _random_order(fixture.scenario)
+    response = session.patch(f"{fixture.base_url}/api/auctions/{auction_id}/orders/{order_id}",
+                             json={"quantity": change['quantity']}, headers=trader['headers'])
+    return 'PATCH /auctions/:id/orders/:oid', response
+
+
+def _cancel_order(session, fixture, trader):
+    target = fixture.take_order(trader['id'])
+    if target is None:
+        return _place_order(session, fixture, trader)
+    auction_id, order_id = target
+    response = session.delete(f"{fixture.base_url}/api/auctions/{auction_id}/orders/{order_id}",
+                              headers=trader['headers'])
+    return 'DELETE /auctions/:id/orders/:oid', response
+
+
+def _cancel_all(session, fixture, trader):
+    auction_id = random.choice(fixture.auction_ids)
+    response = session.delete(f"{fixture.base_url}/api/auctions/{auction_id}/orders", headers=trader['headers'])
+    if response.status_code == 200:
+        fixture.forget_auction(trader['id'], auction_id)
+    return 'DELETE /auctions/:id/orders', response
+
+
+def _poll_book(session, fixture, trader):
+    auction_id = random.choice(fixture.auction_ids)
+    response = session.get(f"{fixture.base_url}/api/auctions/{auction_id}/book",
+                           headers={**trader['headers'], 'Accept-Encoding': 'gzip'})
+    return 'GET /auctions/:id/book', response
+
+
+def _orders_depth(session, fixture, trader):
+    return 'GET /orders/depth', session.get(f"{fixture.base_url}/api/orders/depth?levels=10")
+
+
+def _wallet_read(session, fixture, trader):
+    return 'GET /me/wallet', session.get(f"{fixture.base_url}/api/me/wallet/", headers=trader['headers'])
+
+
+def _list_auctions(session, fixture, trader):
+    return 'GET /auctions', session.get(f"{fixture.base_url}/api/auctions")
+
+
+ACTIONS: Dict[str, Callable] = {
+    "place_order": _place_order,
+    "place_batch": _place_batch,
+    "amend_order": _amend_order,
+    "cancel_order": _cancel_order,
+    "cancel_all": _cancel_all,
+    "poll_book": _poll_book,
+    "orders_depth": _orders_depth,
+    "wallet_read": _wallet_read,
+    "list_auctions": _list_auctions,
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        with self.lock:
+            self.samples[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    # nearest-rank
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(recorder: Recorder, duration: float) -> Dict[str, Dict]:
+    summary = {}
+    for name, values in sorted(recorder.samples.items()):
+        ordered = sorted(values)
+        summary[name] = {
+            "count": len(ordered),
+            "errors": recorder.errors.get(name, 0),
+            "rps": round(len(ordered) / duration, 2) if duration else None,
+            "meanMs": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p50Ms": round(_percentile(ordered, 0.50) * 1000, 2),
+            "p95Ms": round(_percentile(ordered, 0.95) * 1000, 2),
+            "p99Ms": round(_percentile(ordered, 0.99) * 1000, 2),
+        }
+    return summary
+
+
+def _questions(conn) -> int:
+    cur = conn.cursor()
+    try:
+        cur.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+        return int(cur.fetchone()[1])
+    finally:
+        cur.close()
+
+
+def _start_server(db: Dict, port: int, workers: int, threads: int, extra_env: Dict) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        'DB_HOST': db['host'],
+        'DB_PORT': str(db['port']),
+        'DB_USER': db['user'],
+        'DB_PASSWORD': db['password'],
+        'DB_NAME': db['database'],
+        **extra_env,
+    }
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-k', 'gthread', '--threads', str(threads),
+         '-b', f'127.0.0.1:{port}', 'backend.app:app'],
+        cwd=REPO_ROOT,
+        env=env,
+    )
+
+
+def _wait_for_http(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/api/auctions", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("backend did not become ready")
+
+
+def seed(fixture: Fixture, scenario: Dict) -> None:
+    """Адміністратор і трейдери - напряму в БД (один хеш пароля), аукціони - через API"""
+    from backend.db import db_connection
+    from backend.security import create_token
+    from backend.services.passwords import hash_password
+    from backend.services.wallet import wallet_deposit
+
+    run_tag = secrets.token_hex(3)
+    pwd_hash = hash_password(secrets.token_urlsafe(12))
+    conn = db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "INSERT INTO users (username, password_hash, is_admin) VALUES (%s,%s,1)",
+            (f"lt_admin_{run_tag}", pwd_hash)
+        )
+        admin = {"id": cur.lastrowid, "username": f"lt_admin_{run_tag}", "is_admin": 1}
+        fixture.admin_token = create_token(admin)
+        deposit = Decimal(str(scenario['depositPerTrader']))
+        for index in range(int(scenario['traders'])):
+            username = f"lt_trader_{run_tag}_{index}"
+            cur.execute("INSERT INTO users (username, password_hash, is_admin) VALUES (%s,%s,0)", (username, pwd_hash))
+            user_id = cur.lastrowid
+            cur.execute(
+                "INSERT INTO traders_profile (user_id, first_name, last_name) VALUES (%s,%s,%s)",
+                (user_id, 'Load', f'Trader{index}')
+            )
+            wallet_deposit(conn, user_id, deposit, meta={"action": "loadtest_seed"})
+            token = create_token({"id": user_id, "username": username, "is_admin": 0})
+            fixture.traders.append({"id": user_id, "headers": {"Authorization": f"Bearer {token}"}})
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+    admin_headers = {"Authorization": f"Bearer {fixture.admin_token}"}
+    for index in range(int(scenario['auctions'])):
+        response = requests.post(
+            f"{fixture.base_url}/api/admin/auctions",
+            json={"product": f"Load test product {run_tag}-{index}", "type": "open", "k": 0.5},
+            headers=admin_headers,
+        )
+        response.raise_for_status()
+        fixture.auction_ids.append(response.json()['id'])
+
+
+def run_clearing_round(auction_ids: List[int]) -> None:
+    """Один прохід планувальника клірингу з примусово настиглим next_clearing_at"""
+    from backend.db import db_connection
+    from backend.services.clearing_scheduler import CLEARING_INTERVAL_SECONDS, _process_auctions_for_clearing
+
+    conn = db_connection()
+    cur = conn.cursor()
+    try:
+        # last_clearing_at теж зсуваємо назад: інакше планувальник відкладає аукціон,
+        # кліринг якого був менше ніж CLEARING_INTERVAL_SECONDS тому, і раунд порожній
+        cur.execute(
+            f"UPDATE auctions SET next_clearing_at = UTC_TIMESTAMP() - INTERVAL 1 SECOND, "
+            f"last_clearing_at = UTC_TIMESTAMP() - INTERVAL {CLEARING_INTERVAL_SECONDS + 1} SECOND "
+            f"WHERE id IN ({','.join(['%s'] * len(auction_ids))})",
+            tuple(auction_ids)
+        )
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+    _process_auctions_for_clearing(datetime.datetime.utcnow())
+
+
+def probe_queries(fixture: Fixture, stats_conn, scenario: Dict) -> Dict[str, float]:
+    """SQL-запитів на один запит кожної дії (послідовно, з поправкою на фонові потоки сервера)"""
+    idle_started = time.monotonic()
+    idle_before = _questions(stats_conn)
+    time.sleep(2)
+    idle_rate = (_questions(stats_conn) - idle_before - 1) / (time.monotonic() - idle_started)
+    result = {}
+    session = requests.Session()
+    repeats = max(1, int(scenario['probeRequests']))
+    for action_name in scenario['mix']:
+        action = ACTIONS[action_name]
+        counts: Dict[str, int] = defaultdict(int)
+        started = time.monotonic()
+        before = _questions(stats_conn)
+        for attempt in range(repeats):
+            name, _ = action(session, fixture, fixture.traders[attempt % len(fixture.traders)])
+            counts[name] += 1
+        elapsed = time.monotonic() - started
+        total = _questions(stats_conn) - before - 1 - idle_rate * elapsed
+        name = max(counts, key=counts.get)
+        result[name] = round(max(total, 0) / repeats, 2)
+    return result
+
+
+def run_load(fixture: Fixture, scenario: Dict, recorder: Recorder) -> float:
+    names = list(scenario['mix'])
+    weights = [float(scenario['mix'][name]) for name in names]
+    stop = threading.Event()
+    measuring = threading.Event()
+
+    def worker():
+        session = requests.Session()
+        while not stop.is_set():
+            trader = random.choice(fixture.traders)
+            action = ACTIONS[random.choices(names, weights)[0]]
+            started = time.perf_counter()
+            try:
+                name, response = action(session, fixture, trader)
+                ok = response.status_code < 400
+            except requests.RequestException:
+                name, ok = action.__name__.lstrip('_'), False
+            if measuring.is_set():
+                recorder.record(name, time.perf_counter() - started, ok)
+
+    def clearing():
+        interval = float(scenario['clearingIntervalSeconds'])
+        while interval > 0 and not stop.wait(interval):
+            started = time.perf_counter()
+            try:
+                run_clearing_round(fixture.auction_ids)
+                ok = True
+            except Exception as error:
+                print(f"[LOADTEST] clearing round failed: {error}", file=sys.stderr)
+                ok = False
+            if measuring.is_set():
+                recorder.record('scheduler clearing round', time.perf_counter() - started, ok)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(int(scenario['concurrency']))]
+    threads.append(threading.Thread(target=clearing, daemon=True))
+    for thread in threads:
+        thread.start()
+    time.sleep(float(scenario['warmupSeconds']))
+    measuring.set()
+    started = time.monotonic()
+    time.sleep(float(scenario['durationSeconds']))
+    measuring.clear()
+    duration = time.monotonic() - started
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=30)
+    return duration
+
+
+def compare(current: Dict, baseline: Dict) -> Dict[str, Dict]:
+    rows = {}
+    for name, item in current.get('endpoints', {}).items():
+        base = baseline.get('endpoints', {}).get(name)
+        if not base:
+            continue
+        row = {}
+        for key in ('p50Ms', 'p95Ms', 'p99Ms', 'rps'):
+            if base.get(key):
+                row[key + 'Ratio'] = round(item[key] / base[key], 3)
+        base_queries = baseline.get('queriesPerRequest', {}).get(name)
+        queries = current.get('queriesPerRequest', {}).get(name)
+        if base_queries and queries is not None:
+            row['queriesRatio'] = round(queries / base_queries, 3)
+        rows[name] = row
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="End-to-end HTTP load test")
+    parser.add_argument('--scenario', default=DEFAULT_SCENARIO)
+    parser.add_argument('--duration', type=float, help="override durationSeconds")
+    parser.add_argument('--concurrency', type=int, help="override concurrency")
+    parser.add_argument('--db-host', help="use an existing MySQL server instead of a local stand-in")
+    parser.add_argument('--db-port', type=int, default=3306)
+    parser.add_argument('--db-user', default='root')
+    parser.add_argument('--db-password', default='')
+    parser.add_argument('--keep-db', action='store_true', help="do not drop the temporary database")
+    parser.add_argument('--server-workers', type=int, default=2)
+    parser.add_argument('--server-threads', type=int, default=8)
+    parser.add_argument('--server-env', action='append', default=[], metavar='KEY=VALUE',
+                        help="extra environment for the backend (repeatable)")
+    parser.add_argument('--json', dest='json_path', help="write the report to this file")
+    parser.add_argument('--compare', dest='baseline_path', help="previous report to compare against")
+    args = parser.parse_args(argv)
+
+    scenario = load_scenario(args.scenario)
+    if args.duration is not None:
+        scenario['durationSeconds'] = args.duration
+    if args.concurrency is not None:
+        scenario['concurrency'] = args.concurrency
+    random.seed(scenario.get('seed', 1))
+
+    standin = (
+        ExistingMySQL(args.db_host, args.db_port, args.db_user, args.db_password, keep=args.keep_db)
+        if args.db_host else LocalMySQL()
+    )
+    server_env = dict(item.split('=', 1) for item in args.server_env)
+    server_env.setdefault('JWT_SECRET', secrets.token_hex(16))
+    server_env.setdefault('STATIC_ASSET_CACHE', '0')
+    with standin as db:
+        # Цей процес засіває дані та запускає кліринг - йому потрібна та сама БД і секрет JWT
+        os.environ.update({
+            'DB_HOST': db['host'], 'DB_PORT': str(db['port']), 'DB_USER': db['user'],
+            'DB_PASSWORD': db['password'], 'DB_NAME': db['database'], 'JWT_SECRET': server_env['JWT_SECRET'],
+        })
+        sys.path.insert(0, REPO_ROOT)
+        port = int(server_env.pop('PORT', 0)) or free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = _start_server(db, port, args.server_workers, args.server_threads, server_env)
+        try:
+            _wait_for_http(base_url)
+            fixture = Fixture(base_url, scenario)
+            seed(fixture, scenario)
+            stats_conn = mysql.connector.connect(**{key: db[key] for key in ('host', 'port', 'user', 'password')})
+            try:
+                queries = probe_queries(fixture, stats_conn, scenario)
+                recorder = Recorder()
+                questions_before = _questions(stats_conn)
+                duration = run_load(fixture, scenario, recorder)
+                questions_total = _questions(stats_conn) - questions_before
+            finally:
+                stats_conn.close()
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    endpoints = summarize(recorder, duration)
+    requests_total = sum(item['count'] for item in endpoints.values())
+    report = {
+        "scenario": scenario,
+        "durationSeconds": round(duration, 2),
+        "requests": requests_total,
+        "rps": round(requests_total / duration, 2) if duration else None,
+        "endpoints": endpoints,
+        "queriesPerRequest": queries,
+        "dbQuestionsPerRequest": round(questions_total / requests_total, 2) if requests_total else None,
+    }
+    if args.baseline_path:
+        with open(args.baseline_path, 'r', encoding='utf-8') as fh:
+            report["comparison"] = compare(report, json.load(fh))
+    output = json.dumps(report, indent=2)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as fh:
+            fh.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
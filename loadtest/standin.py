@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Тимчасовий MySQL/MariaDB для навантажувальних тестів
+
+LocalMySQL ініціалізує порожній datadir у тимчасовому каталозі, запускає
+mariadbd/mysqld на вільному порту лише для 127.0.0.1 і прибирає все після
+себе. ExistingMySQL натомість створює в уже запущеному сервері окрему базу
+loadtest_<random> і видаляє її наприкінці.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import uuid
+from typing import Dict, Optional
+
+import mysql.connector
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _find_binary(*names: str) -> Optional[str]:
+    for name in names:
+        path = shutil.which(name)
+        if path:
+            return path
+    for directory in ('/usr/sbin', '/usr/local/sbin', '/usr/local/mysql/bin'):
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def _wait_for_server(config: Dict, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    last_error = None
+    while time.monotonic() < deadline:
+        try:
+            conn = mysql.connector.connect(**config)
+            conn.close()
+            return
+        except mysql.connector.Error as error:
+            last_error = error
+            time.sleep(0.5)
+    raise RuntimeError(f"MySQL stand-in did not start: {last_error}")
+
+
+class LocalMySQL:
+    """Власний екземпляр mariadbd/mysqld у тимчасовому datadir"""
+
+    def __init__(self, database: str = 'loadtest', startup_timeout: float = 60.0):
+        self.database = database
+        self.startup_timeout = startup_timeout
+        self.workdir = None
+        self.process = None
+        self.port = None
+
+    def _initialize(self, server: str, datadir: str) -> None:
+        install_db = _find_binary('mariadb-install-db', 'mysql_install_db')
+        if install_db and 'mariadb' in os.path.basename(server):
+            cmd = [install_db, '--no-defaults', f'--datadir={datadir}',
+                   '--auth-root-authentication-method=normal', '--skip-test-db']
+        else:
+            cmd = [server, '--no-defaults', '--initialize-insecure', f'--datadir={datadir}']
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    def start(self) -> Dict:
+        server = _find_binary('mariadbd', 'mysqld')
+        if server is None:
+            raise RuntimeError("mariadbd/mysqld not found; pass --db-host to use an existing server")
+        self.workdir = tempfile.mkdtemp(prefix='dbauc-loadtest-')
+        datadir = os.path.join(self.workdir, 'data')
+        os.makedirs(datadir)
+        self._initialize(server, datadir)
+        self.port = free_port()
+        self.process = subprocess.Popen(
+            [
+                server, '--no-defaults', f'--datadir={datadir}',
+                f'--socket={os.path.join(self.workdir, "mysql.sock")}',
+                f'--port={self.port}', '--bind-address=127.0.0.1',
+                f'--pid-file={os.path.join(self.workdir, "mysqld.pid")}',
+                '--max-connections=1000', '--skip-log-bin',
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=open(os.path.join(self.workdir, 'mysqld.err'), 'wb'),
+        )
+        config = {'host': '127.0.0.1', 'port': self.port, 'user': 'root', 'password': ''}
+        _wait_for_server(config, self.startup_timeout)
+        conn = mysql.connector.connect(**config)
+        try:
+            cur = conn.cursor()
+            cur.execute(f"CREATE DATABASE IF NOT EXISTS `{self.database}` CHARACTER SET utf8mb4")
+            cur.close()
+        finally:
+            conn.close()
+        return {**config, 'database': self.database}
+
+    def stop(self) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class ExistingMySQL:
+    """Окрема тимчасова база в уже запущеному сервері"""
+
+    def __init__(self, host: str, port: int, user: str, password: str, keep: bool = False):
+        self.config = {'host': host, 'port': port, 'user': user, 'password': password}
+        self.database = f"loadtest_{uuid.uuid4().hex[:8]}"
+        self.keep = keep
+
+    def _execute(self, sql: str) -> None:
+        conn = mysql.connector.connect(**self.config)
+        try:
+            cur = conn.cursor()
+            cur.execute(sql)
+            cur.close()
+        finally:
+            conn.close()
+
+    def __enter__(self):
+        _wait_for_server(self.config, 10)
+        self._execute(f"CREATE DATABASE `{self.database}` CHARACTER SET utf8mb4")
+        return {**self.config, 'database': self.database}
+
+    def __exit__(self, *exc):
+        if not self.keep:
+            self._execute(f"DROP DATABASE IF EXISTS `{self.database}`")
+
+
+__all__ = ['LocalMySQL', 'ExistingMySQL', 'free_port']
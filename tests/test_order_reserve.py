@@ -0,0 +1,44 @@
+import unittest
+from decimal import Decimal
+
+from backend.services.auction import bid_reserve, open_bid_reserve
+
+
+class PartialFillThenAmendTest(unittest.TestCase):
+    """Резерв bid-заявки після часткового виконання та подальшої зміни кількості"""
+
+    def setUp(self):
+        # bid 10 x 10 => резерв 100, кліринг виконав 6 одиниць
+        self.order = {'price': Decimal('10'), 'quantity': Decimal('10'), 'reserved_amount': Decimal('100')}
+        self.filled = Decimal('6')
+
+    def _after_partial_fill(self, order):
+        # Те, що записує кліринг для частково виконаної bid-заявки
+        remaining = order['quantity'] - self.filled
+        return {**order, 'quantity': remaining, 'reserved_amount': bid_reserve(order['price'], remaining)}
+
+    def test_partial_fill_keeps_reserve_of_remainder(self):
+        order = self._after_partial_fill(self.order)
+        self.assertEqual(order['reserved_amount'], Decimal('40'))
+        # Частина резерву, яку кліринг списує/повертає, плюс залишок = початковий резерв
+        self.assertEqual(bid_reserve(self.order['price'], self.filled) + order['reserved_amount'], Decimal('100'))
+
+    def test_amend_after_partial_fill_releases_only_the_difference(self):
+        order = self._after_partial_fill(self.order)
+        delta = bid_reserve(order['price'], Decimal('3')) - open_bid_reserve(order)
+        self.assertEqual(delta, Decimal('-10'))
+
+    def test_stale_reserved_amount_is_capped_by_open_quantity(self):
+        # Рядок, частково виконаний до виправлення: reserved_amount лишився повним
+        stale = {**self.order, 'quantity': Decimal('4')}
+        self.assertEqual(open_bid_reserve(stale), Decimal('40'))
+        delta = bid_reserve(stale['price'], Decimal('3')) - open_bid_reserve(stale)
+        self.assertEqual(delta, Decimal('-10'))
+
+    def test_missing_reserved_amount_falls_back_to_price_times_quantity(self):
+        legacy = {'price': '2.5', 'quantity': '4', 'reserved_amount': None}
+        self.assertEqual(open_bid_reserve(legacy), Decimal('10'))
+
+
+if __name__ == '__main__':
+    unittest.main()